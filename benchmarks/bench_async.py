@@ -0,0 +1,87 @@
+"""
+AsyncExecutor: the cost of pure computation compared with Executor, and
+how many I/O-bound sessions one event loop serves.
+
+Each session reads `--lines` lines, which arrive one per millisecond, and
+echoes them back.
+
+Usage:
+    python benchmarks/bench_async.py [--sessions N] [--lines N]
+"""
+
+import argparse
+import asyncio
+import time
+
+from mojito import Executor, stdlib
+from mojito.aio import AsyncExecutor
+
+
+COMPUTE = """
+: fact dup 1 > [dup 1 - fact *] [drop 1] if ;
+0 20000 [1 + 10 fact drop] times
+"""
+
+
+class Writer:
+    def write(self, data):
+        pass
+
+    async def drain(self):
+        pass
+
+
+async def feed(stream, lines):
+    for i in range(lines):
+        await asyncio.sleep(0.001)
+        stream.feed_data(f"{i}\n".encode())
+    stream.feed_eof()
+
+
+async def serve(sessions, lines):
+    tasks = []
+    for _ in range(sessions):
+        stream = asyncio.StreamReader()
+        ex = AsyncExecutor(stdlib.vocab, stream, Writer())
+        tasks.append(ex.run(f"{lines} [get .] times"))
+        tasks.append(feed(stream, lines))
+    start = time.perf_counter()
+    await asyncio.gather(*tasks)
+    return time.perf_counter() - start
+
+
+async def compute_async():
+    ex = AsyncExecutor(stdlib.vocab, None, Writer())
+    start = time.perf_counter()
+    await ex.run(COMPUTE)
+    return time.perf_counter() - start
+
+
+def compute_sync():
+    ex = Executor(stdlib.vocab)
+    start = time.perf_counter()
+    ex.run(COMPUTE)
+    return time.perf_counter() - start
+
+
+def main():
+    args = argparse.ArgumentParser()
+    args.add_argument("--sessions", type=int, default=1_000)
+    args.add_argument("--lines", type=int, default=10)
+    opts = args.parse_args()
+
+    sync = min(compute_sync() for _ in range(3))
+    async_ = min(asyncio.run(compute_async()) for _ in range(3))
+    print(
+        f"compute: Executor {sync * 1000:.1f} ms, AsyncExecutor {async_ * 1000:.1f} ms"
+    )
+
+    elapsed = asyncio.run(serve(opts.sessions, opts.lines))
+    print(
+        f"{opts.sessions} sessions x {opts.lines} lines: {elapsed * 1000:.1f} ms "
+        f"(serially at least {opts.sessions * opts.lines} ms)"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+"""
+Cold vs warm start of a large prelude through `mojito.cache`.
+
+Cold: tokenize, parse, compile and write the cache entry.
+Warm: load the compiled code from `__mojitocache__`.
+
+Usage:
+    python benchmarks/bench_cache.py [--definitions N]
+"""
+
+import argparse
+import pathlib
+import shutil
+import tempfile
+import time
+
+from mojito import Executor, cache, stdlib
+
+
+def generate(definitions: int) -> str:
+    lines = []
+    for i in range(definitions):
+        lines.append(f": word{i}")
+        lines.append(f"  dup {i} > [dup 1 - {i} * +] [drop {i} 2.5 *] if")
+        lines.append(f'  "word number {i}" drop')
+        lines.append(";")
+    return "\n".join(lines) + "\n"
+
+
+def start(path: pathlib.Path) -> tuple[float, float]:
+    begin = time.perf_counter()
+    code = cache.compile_file(path)
+    loaded = time.perf_counter()
+    Executor(stdlib.vocab.offspring()).run_code(code)
+    return loaded - begin, time.perf_counter() - begin
+
+
+def main():
+    args = argparse.ArgumentParser()
+    args.add_argument("--definitions", type=int, default=5000)
+    opts = args.parse_args()
+
+    workdir = pathlib.Path(tempfile.mkdtemp())
+    try:
+        path = workdir / "prelude.mojito"
+        path.write_text(generate(opts.definitions))
+        size = path.stat().st_size / 1024
+
+        print(f"-- {opts.definitions} definitions, {size:.0f} KiB")
+        load, total = start(path)
+        print(f"cold  load {load * 1000:8.1f} ms  total {total * 1000:8.1f} ms")
+        load, total = start(path)
+        print(f"warm  load {load * 1000:8.1f} ms  total {total * 1000:8.1f} ms")
+    finally:
+        shutil.rmtree(workdir)
+
+
+if __name__ == "__main__":
+    main()
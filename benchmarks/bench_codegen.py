@@ -0,0 +1,80 @@
+"""
+Straight-line numeric words run by the interpreter (opt level 2) and
+translated into Python (opt level 3), against the same code written in
+Python by hand.
+
+Usage:
+    python benchmarks/bench_codegen.py [--n N] [--repeat N]
+"""
+
+import argparse
+import time
+
+from mojito import Executor, stdlib
+
+
+PRELUDE = """
+: poly ( x:num -- y:num ) dup dup * swap 3 * + 1 + 1000 mod ;
+: poly8 ( x:num -- y:num ) poly poly poly poly poly poly poly poly ;
+: clamp ( x:num -- y:num ) dup 500 > [drop 500] when ;
+: work ( x:num -- y:num ) poly8 clamp poly8 clamp ;
+"""
+
+
+def python_poly(x):
+    return (x * x + x * 3 + 1) % 1000
+
+
+def python_work(x):
+    for _ in range(2):
+        for _ in range(8):
+            x = python_poly(x)
+        if x > 500:
+            x = 500
+    return x
+
+
+def measure_mojito(opt_level, n, repeat):
+    ex = Executor(stdlib.vocab, opt_level=opt_level)
+    ex.run(PRELUDE)
+    program = f"0 {n} [work] times drop"
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        ex.run(program)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def measure_python(n, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        x = 0
+        for _ in range(n):
+            x = python_work(x)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    args = argparse.ArgumentParser()
+    args.add_argument("--n", type=int, default=20_000)
+    args.add_argument("--repeat", type=int, default=3)
+    opts = args.parse_args()
+
+    timings = {
+        "interpreted": measure_mojito(2, opts.n, opts.repeat),
+        "translated": measure_mojito(3, opts.n, opts.repeat),
+        "python": measure_python(opts.n, opts.repeat),
+    }
+    print(f"{'run':<12} {'ms':>9} {'us/call':>8} {'vs python':>10}")
+    for name, seconds in timings.items():
+        print(
+            f"{name:<12} {seconds * 1000:9.2f} {seconds / opts.n * 1e6:8.2f} "
+            f"{seconds / timings['python']:9.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""
+Time saved by running the unchecked variants of builtins where stack-effect
+inference proved the types of their inputs.
+
+Usage:
+    python benchmarks/bench_effects.py [--repeat N]
+"""
+
+import argparse
+import time
+
+from mojito import Executor, compiler, stdlib, types
+
+
+PROGRAMS = {
+    "arith": (
+        ": poly ( x:num -- y:num ) dup dup * swap 3 * + 1 + ; "
+        ": loop dup 0 > [dup poly drop 1 - loop] [drop] if ;",
+        "50000 loop",
+    ),
+    "swaps": (
+        ": shuffle ( a b -- b a ) swap swap swap ; "
+        ": loop dup 0 > [1 2 shuffle drop drop 1 - loop] [drop] if ;",
+        "50000 loop",
+    ),
+}
+
+
+def checked(name, target):
+    return target
+
+
+def measure(prelude, program, proofs, repeat):
+    # A resolve hook makes call sites ignore their proofs.
+    compiler.resolve_hook = None if proofs else checked
+    types.Vocab.version += 1
+    try:
+        ex = Executor(stdlib.vocab.offspring())
+        ex.run(prelude)
+        best = float("inf")
+        for _ in range(repeat):
+            start = time.perf_counter()
+            ex.run(program)
+            best = min(best, time.perf_counter() - start)
+        return best
+    finally:
+        compiler.resolve_hook = None
+        types.Vocab.version += 1
+
+
+def main():
+    args = argparse.ArgumentParser()
+    args.add_argument("--repeat", type=int, default=5)
+    opts = args.parse_args()
+
+    print(f"{'program':<8} {'checked ms':>11} {'proven ms':>10} {'speedup':>8}")
+    for name, (prelude, program) in PROGRAMS.items():
+        slow = measure(prelude, program, False, opts.repeat)
+        fast = measure(prelude, program, True, opts.repeat)
+        print(f"{name:<8} {slow * 1000:11.2f} {fast * 1000:10.2f} {slow / fast:7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
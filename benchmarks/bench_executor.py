@@ -0,0 +1,54 @@
+"""
+Executor throughput on recursive mojito code.
+
+Usage:
+    python benchmarks/bench_executor.py [--repeat N]
+"""
+
+import argparse
+import pathlib
+import time
+
+from mojito import Executor, stdlib
+
+
+EXAMPLES = pathlib.Path(__file__).resolve().parent.parent / "examples"
+
+PROGRAMS = {
+    "fact 20 (x200)": (
+        (EXAMPLES / "factorial.mojito").read_text(),
+        "20 fact drop " * 200,
+    ),
+    "fib 18": (
+        ": fib dup 1 > [dup 1 - fib swap 2 - fib +] when ;",
+        "18 fib drop",
+    ),
+    "countdown 100000": (
+        ": countdown dup 0 > [1 - countdown] [drop] if ;",
+        "100000 countdown",
+    ),
+}
+
+
+def measure(name, prelude, program, repeat):
+    ex = Executor(stdlib.vocab.offspring())
+    ex.run(prelude)
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        ex.run(program)
+        best = min(best, time.perf_counter() - start)
+    print(f"{name:<16} {best * 1000:10.2f} ms")
+
+
+def main():
+    args = argparse.ArgumentParser()
+    args.add_argument("--repeat", type=int, default=5)
+    opts = args.parse_args()
+
+    for name, (prelude, program) in PROGRAMS.items():
+        measure(name, prelude, program, opts.repeat)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""
+Booting a worker from an image versus running its prelude source again.
+
+Usage:
+    python benchmarks/bench_image.py [--words N] [--repeat N]
+"""
+
+import argparse
+import pathlib
+import tempfile
+import time
+
+from mojito import Executor, image, stdlib
+
+
+def prelude(words):
+    # Words of a few lines each, every one calling the one before.
+    lines = [": word-0 ( x:num -- y:num ) dup * 1 + ;"]
+    for i in range(1, words):
+        lines.append(
+            f": word-{i} ( x:num -- y:num ) "
+            f"dup 0 > [word-{i - 1} 2 *] [drop 0] if 3 mod ;"
+        )
+    return "\n".join(lines)
+
+
+def best_of(repeat, boot):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        ex = boot()
+        best = min(best, time.perf_counter() - start)
+    # Check that the boot left a working executor.
+    ex.run("5 word-0 drop")
+    return best
+
+
+def main():
+    args = argparse.ArgumentParser()
+    args.add_argument("--words", type=int, default=500)
+    args.add_argument("--repeat", type=int, default=5)
+    opts = args.parse_args()
+
+    source = prelude(opts.words)
+
+    def from_source():
+        ex = Executor(stdlib.vocab)
+        ex.run(source)
+        return ex
+
+    snapshot = from_source().snapshot()
+
+    def from_snapshot():
+        ex = Executor(stdlib.vocab)
+        ex.restore(snapshot)
+        return ex
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = pathlib.Path(tmp) / "prelude.image"
+        image.save(snapshot, path)
+        size = path.stat().st_size
+
+        def from_image():
+            ex = Executor(stdlib.vocab)
+            ex.restore(image.load(path))
+            return ex
+
+        timings = {
+            "source": best_of(opts.repeat, from_source),
+            "image": best_of(opts.repeat, from_image),
+            "snapshot": best_of(opts.repeat, from_snapshot),
+        }
+
+    print(f"{opts.words} words, image of {size / 1024:.0f} KiB")
+    print(f"{'boot':<10} {'ms':>9} {'speedup':>8}")
+    for name, seconds in timings.items():
+        speedup = timings["source"] / seconds
+        print(f"{name:<10} {seconds * 1000:9.3f} {speedup:7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+"""
+Cost of factoring code into small words, with and without inlining them
+into their call sites.
+
+Usage:
+    python benchmarks/bench_inliner.py [--repeat N]
+"""
+
+import argparse
+import time
+
+from mojito import Executor, stdlib
+
+
+PRELUDE = """
+: sq dup * ;
+: inc 1 + ;
+: dec 1 - ;
+: positive? 0 > ;
+: step sq inc drop ;
+"""
+
+PROGRAMS = {
+    "monolithic": (
+        ": loop dup 0 > [dup dup * 1 + drop 1 - loop] [drop] if ;",
+        "50000 loop",
+    ),
+    "factored": (
+        ": loop dup positive? [dup step dec loop] [drop] if ;",
+        "50000 loop",
+    ),
+}
+
+
+def measure(prelude, program, opt_level, repeat):
+    ex = Executor(stdlib.vocab.offspring(), opt_level)
+    ex.run(PRELUDE)
+    ex.run(prelude)
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        ex.run(program)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    args = argparse.ArgumentParser()
+    args.add_argument("--repeat", type=int, default=5)
+    opts = args.parse_args()
+
+    print(f"{'program':<12} {'-O1 ms':>10} {'-O2 ms':>10} {'speedup':>8}")
+    for name, (prelude, program) in PROGRAMS.items():
+        o1 = measure(prelude, program, 1, opts.repeat)
+        o2 = measure(prelude, program, 2, opts.repeat)
+        print(f"{name:<12} {o1 * 1000:10.2f} {o2 * 1000:10.2f} {o1 / o2:7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
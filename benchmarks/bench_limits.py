@@ -0,0 +1,68 @@
+"""
+Overhead of running with every execution limit enabled, compared with
+running without limits.
+
+Usage:
+    python benchmarks/bench_limits.py [--n N] [--repeat N]
+"""
+
+import argparse
+import time
+
+from mojito import Executor, Limits, stdlib
+
+
+PRELUDE = """
+: count-down dup 0 > [1 - count-down] [drop] if ;
+: poly ( x:num -- y:num ) dup dup * swap 3 * + 1 + ;
+"""
+
+PROGRAMS = {
+    "recursion": "{n} count-down",
+    "times": "0 {n} [1 +] times drop",
+    "arith": "0 {n} [dup poly drop] times drop",
+}
+
+LIMITS = Limits(
+    instructions=10**12,
+    stack_depth=10**6,
+    call_depth=10**6,
+    timeout=3600.0,
+    values=10**9,
+)
+
+
+def executor(limits):
+    ex = Executor(stdlib.vocab, limits=limits)
+    ex.run(PRELUDE)
+    return ex
+
+
+def measure(program, repeat):
+    # Runs alternate between the two executors, so that both see the same
+    # machine load.
+    executors = [executor(None), executor(LIMITS)]
+    best = [float("inf")] * len(executors)
+    for _ in range(repeat):
+        for i, ex in enumerate(executors):
+            start = time.perf_counter()
+            ex.run(program)
+            best[i] = min(best[i], time.perf_counter() - start)
+    return best
+
+
+def main():
+    args = argparse.ArgumentParser()
+    args.add_argument("--n", type=int, default=100_000)
+    args.add_argument("--repeat", type=int, default=5)
+    opts = args.parse_args()
+
+    print(f"{'program':<10} {'free ms':>9} {'limited ms':>11} {'overhead':>9}")
+    for name, program in PROGRAMS.items():
+        free, limited = measure(program.format(n=opts.n), opts.repeat)
+        overhead = (limited / free - 1) * 100
+        print(f"{name:<10} {free * 1000:9.2f} {limited * 1000:11.2f} {overhead:8.1f}%")
+
+
+if __name__ == "__main__":
+    main()
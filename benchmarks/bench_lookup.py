@@ -0,0 +1,68 @@
+"""
+Word lookup cost under deeply nested `:` definitions.
+
+Every nested `:` runs its body in a fresh child vocab, so words used by the
+innermost definitions resolve builtins through the whole parent chain. The
+innermost level runs a counting loop to show per-word cost at each depth.
+
+Usage:
+    python benchmarks/bench_lookup.py [--depths N ...] [--doublings N] [--repeat N]
+"""
+
+import argparse
+import time
+
+from mojito import Executor, stdlib
+
+
+SPIN = 100
+# Words executed per `spin` iteration: dup 0 > [..] [..] if 1 - spin
+WORDS_PER_ITERATION = 9
+
+
+def nested_program(depth: int, doublings: int, repeat: int) -> str:
+    inner = ": spin dup 0 > [1 - spin] [drop] if ; "
+    inner += f": r0 {SPIN} spin ; "
+    for i in range(1, doublings + 1):
+        inner += f": r{i} r{i - 1} r{i - 1} ; "
+    inner += f"{repeat} [r{doublings}] timed"
+    for level in reversed(range(depth)):
+        inner = f": level{level} {inner} ; level{level}"
+    return inner
+
+
+def run(depth: int, doublings: int, repeat: int) -> float:
+    """
+    Returns the best time of `repeat` calls made from the innermost level.
+    """
+    times = []
+
+    # Times the calls themselves, leaving out the definitions around them.
+    def timed(word, state, vocab, read_word, execute):
+        q = state.pop()
+        for _ in range(state.pop()):
+            start = time.perf_counter()
+            execute(q)
+            times.append(time.perf_counter() - start)
+
+    ex = Executor(stdlib.vocab)
+    ex.vocab.define("timed", timed)
+    ex.run(nested_program(depth, doublings, repeat))
+    return min(times)
+
+
+def main():
+    args = argparse.ArgumentParser()
+    args.add_argument("--depths", type=int, nargs="+", default=[1, 10, 50, 200])
+    args.add_argument("--doublings", type=int, default=8)
+    args.add_argument("--repeat", type=int, default=5)
+    opts = args.parse_args()
+
+    executed = 2**opts.doublings * SPIN * WORDS_PER_ITERATION
+    for depth in opts.depths:
+        elapsed = run(depth, opts.doublings, opts.repeat)
+        print(f"depth {depth:>4}  {elapsed * 1e9 / executed:8.1f} ns/word")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+"""
+Counting loops written as recursive words versus the native loop
+combinators.
+
+Usage:
+    python benchmarks/bench_loops.py [--n N] [--repeat N]
+"""
+
+import argparse
+import time
+
+from mojito import Executor, stdlib
+
+
+PRELUDE = """
+: count-down dup 0 > [1 - count-down] [drop] if ;
+: count-down-while [dup 0 >] [1 -] while drop ;
+"""
+
+PROGRAMS = {
+    "recursion": "{n} count-down",
+    "times": "0 {n} [1 +] times drop",
+    "while": "{n} count-down-while",
+    "fold": "seq 0 [+] fold drop",
+}
+
+
+def measure(program, n, repeat):
+    ex = Executor(stdlib.vocab.offspring())
+    ex.run(PRELUDE)
+    ex.run(": seq [" + " ".join(map(str, range(n))) + "] ;")
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        ex.run(program)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    args = argparse.ArgumentParser()
+    args.add_argument("--n", type=int, default=200_000)
+    args.add_argument("--repeat", type=int, default=3)
+    opts = args.parse_args()
+
+    print(f"{'loop':<10} {'ms':>10} {'ns/iter':>8}")
+    for name, program in PROGRAMS.items():
+        best = measure(program.format(n=opts.n), opts.n, opts.repeat)
+        print(f"{name:<10} {best * 1000:10.2f} {best / opts.n * 1e9:8.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+"""
+Naive recursive fib, plain and memoized with `MEMO:`.
+
+The plain word makes an exponential number of calls; the memoized one
+computes each fib once, and on later runs answers from its cache.
+
+Usage:
+    python benchmarks/bench_memo.py [--n N] [--repeat N]
+"""
+
+import argparse
+import time
+
+from mojito import Executor, stdlib
+
+
+BODY = "( n -- f ) dup 2 < [] [dup 1 - {name} swap 2 - {name} +] if ;"
+
+WORDS = {
+    "plain": ": fib " + BODY.format(name="fib"),
+    "memo": "MEMO: fib " + BODY.format(name="fib"),
+}
+
+
+def measure(prelude, n, repeat):
+    ex = Executor(stdlib.vocab)
+    ex.run(prelude)
+    start = time.perf_counter()
+    ex.run(f"{n} fib drop")
+    first = time.perf_counter() - start
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        ex.run(f"{n} fib drop")
+        best = min(best, time.perf_counter() - start)
+    return first, best
+
+
+def main():
+    args = argparse.ArgumentParser()
+    args.add_argument("--n", type=int, default=25)
+    args.add_argument("--repeat", type=int, default=3)
+    opts = args.parse_args()
+
+    print(f"fib {opts.n}")
+    print(f"{'word':<8} {'first run':>12} {'later runs':>12}")
+    for name, prelude in WORDS.items():
+        first, later = measure(prelude, opts.n, opts.repeat)
+        print(f"{name:<8} {first * 1e6:10.0f}us {later * 1e6:10.0f}us")
+
+
+if __name__ == "__main__":
+    main()
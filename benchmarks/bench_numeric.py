@@ -0,0 +1,59 @@
+"""
+Allocation and time of numeric mojito code.
+
+`bytes/result` leaves many arithmetic results on the stack and reports the
+traced memory each one holds on to, its stack slot included. `loop` times an arithmetic counting loop.
+
+Usage:
+    python benchmarks/bench_numeric.py [--results N] [--iterations N]
+"""
+
+import argparse
+import time
+import tracemalloc
+
+from mojito import Executor, stdlib
+
+
+LOOP = ": loop dup 0 > [1 - dup dup * 3 + drop loop] [drop] if ;"
+
+
+def bytes_per_result(results: int) -> float:
+    ex = Executor(stdlib.vocab.offspring())
+    ex.run(": f " + "1.5 2 + " * results + " ;")
+    # Run once so that compiling and caching lookups don't count.
+    ex.run("f")
+    ex.stack.data.clear()
+
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    ex.execute(ex.vocab.lookup("f"))
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return (after - before) / results
+
+
+def loop_time(iterations: int, repeat: int = 5) -> float:
+    ex = Executor(stdlib.vocab.offspring())
+    ex.run(LOOP)
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        ex.run(f"{iterations} loop")
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    args = argparse.ArgumentParser()
+    args.add_argument("--results", type=int, default=10000)
+    args.add_argument("--iterations", type=int, default=100000)
+    opts = args.parse_args()
+
+    print(f"bytes/result  {bytes_per_result(opts.results):8.1f}")
+    elapsed = loop_time(opts.iterations)
+    print(f"loop          {elapsed * 1000:8.1f} ms  ({opts.iterations} iterations)")
+
+
+if __name__ == "__main__":
+    main()
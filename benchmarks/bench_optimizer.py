@@ -0,0 +1,58 @@
+"""
+Effect of constant folding and peephole optimizations on words that compute
+with literals, run at each optimization level.
+
+Usage:
+    python benchmarks/bench_optimizer.py [--repeat N]
+"""
+
+import argparse
+import time
+
+from mojito import Executor, stdlib
+
+
+PROGRAMS = {
+    # Enough arithmetic on literals to outweigh the loop around it.
+    "literal arithmetic": (
+        ": area 60 60 * 24 * 7 * 2 / 3 + 5 * 100 - 7 mod 9 + 3 * 11 + 2 * + ; "
+        ": loop dup 0 > [0 area drop 1 - loop] [drop] if ;",
+        "50000 loop",
+    ),
+    "shuffles": (
+        ": loop dup 0 > [dup drop swap swap 1 - loop] [drop] if ;",
+        "7 50000 loop",
+    ),
+    "constant branch": (
+        ': debug 0 ["debug" .] when ; '
+        ": loop dup 0 > [debug 1 [1 -] [0] if loop] [drop] if ;",
+        "50000 loop",
+    ),
+}
+
+
+def measure(prelude, program, opt_level, repeat):
+    ex = Executor(stdlib.vocab.offspring(), opt_level)
+    ex.run(prelude)
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        ex.run(program)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    args = argparse.ArgumentParser()
+    args.add_argument("--repeat", type=int, default=5)
+    opts = args.parse_args()
+
+    print(f"{'program':<20} {'-O0 ms':>10} {'-O1 ms':>10} {'speedup':>8}")
+    for name, (prelude, program) in PROGRAMS.items():
+        o0 = measure(prelude, program, 0, opts.repeat)
+        o1 = measure(prelude, program, 1, opts.repeat)
+        print(f"{name:<20} {o0 * 1000:10.2f} {o1 * 1000:10.2f} {o0 / o1:7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+"""
+Scaling of `pmap` with the number of worker processes, on CPU-bound work
+per element, against plain `map`.
+
+Usage:
+    python benchmarks/bench_parallel.py [--n N] [--work N] [--max-workers N]
+"""
+
+import argparse
+import os
+import time
+
+from mojito import Executor, parallel, stdlib
+
+
+PRELUDE = """
+: count-down [dup 0 >] [1 -] while drop ;
+"""
+
+
+def measure(program):
+    ex = Executor(stdlib.vocab.offspring())
+    ex.run(PRELUDE)
+    start = time.perf_counter()
+    ex.run(program)
+    return time.perf_counter() - start
+
+
+def main():
+    args = argparse.ArgumentParser()
+    args.add_argument("--n", type=int, default=64)
+    args.add_argument("--work", type=int, default=5_000)
+    args.add_argument("--max-workers", type=int, default=os.cpu_count() or 1)
+    opts = args.parse_args()
+
+    work = f"0 {opts.n} range [drop {opts.work} count-down 1]"
+    serial = measure(f"{work} map drop")
+    print(f"{'workers':<8} {'ms':>10} {'speedup':>8}")
+    print(f"{'map':<8} {serial * 1000:10.2f} {1:7.2f}x")
+    for workers in range(1, opts.max_workers + 1):
+        parallel.workers = workers
+        # Start the pool outside of the measurement.
+        measure(f"{work} pmap drop")
+        best = min(measure(f"{work} pmap drop") for _ in range(3))
+        print(f"{workers:<8} {best * 1000:10.2f} {serial / best:7.2f}x")
+    parallel.shutdown()
+
+
+if __name__ == "__main__":
+    main()
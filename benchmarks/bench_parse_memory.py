@@ -0,0 +1,69 @@
+"""
+Memory used to parse a generated 100k-word program.
+
+`retained` is the traced memory still held by the parsed program, `peak` the
+highest traced memory while parsing (source text excluded).
+
+Usage:
+    python benchmarks/bench_parse_memory.py [--words N]
+"""
+
+import argparse
+import random
+import time
+import tracemalloc
+
+from mojito import parser
+
+
+def generate(words: int, seed: int = 0) -> str:
+    rnd = random.Random(seed)
+    vocabulary = ["dup", "drop", "swap", "+", "-", "*", "if", "apply", "fact"]
+    terms = []
+    for i in range(words):
+        choice = rnd.random()
+        if choice < 0.6:
+            terms.append(rnd.choice(vocabulary))
+        elif choice < 0.85:
+            terms.append(str(rnd.randint(0, 10000)))
+        elif choice < 0.9:
+            terms.append('"text"')
+        else:
+            terms.append(rnd.choice(["[", "]"]) if i % 2 else "1.5")
+        if i % 12 == 11:
+            terms.append("\n")
+    # Close whatever quotations are left open.
+    depth = 0
+    balanced = []
+    for term in terms:
+        if term == "]" and not depth:
+            continue
+        depth += {"[": 1, "]": -1}.get(term, 0)
+        balanced.append(term)
+    balanced.extend("]" * depth)
+    return " ".join(balanced)
+
+
+def main():
+    args = argparse.ArgumentParser()
+    args.add_argument("--words", type=int, default=100_000)
+    opts = args.parse_args()
+
+    source = generate(opts.words)
+    tracemalloc.start()
+    base = tracemalloc.get_traced_memory()[0]
+    start = time.perf_counter()
+    program = parser.parse(source)
+    elapsed = time.perf_counter() - start
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    print(f"-- {opts.words} words, {len(source) / 1024:.0f} KiB of source")
+    print(f"retained  {(current - base) / 2**20:8.2f} MiB")
+    print(f"peak      {(peak - base) / 2**20:8.2f} MiB")
+    print(f"time      {elapsed:8.2f} s (traced)")
+    assert len(program)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+"""
+Throughput of `ExecutorPool`, in scripts per second, for small scripts
+defining and calling their own words.
+
+Usage:
+    python benchmarks/bench_pool.py [--scripts N] [--workers N]
+"""
+
+import argparse
+import os
+import time
+
+from mojito import ExecutorPool
+
+
+SCRIPT = """
+: sq dup * ;
+: fact dup 1 > [dup 1 - fact *] [drop 1] if ;
+0 {i} 100 mod range [sq] map sum {i} 10 mod fact +
+"""
+
+
+def measure(scripts, workers, processes):
+    with ExecutorPool(workers=workers, processes=processes) as pool:
+        # Start the workers outside of the measurement.
+        pool.run(scripts[:workers])
+        start = time.perf_counter()
+        results = pool.run(scripts)
+        elapsed = time.perf_counter() - start
+    assert all(result.ok for result in results)
+    return elapsed
+
+
+def main():
+    args = argparse.ArgumentParser()
+    args.add_argument("--scripts", type=int, default=2_000)
+    args.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    opts = args.parse_args()
+
+    scripts = [SCRIPT.format(i=i) for i in range(opts.scripts)]
+    print(f"{'pool':<10} {'workers':>8} {'scripts/s':>10}")
+    for processes in (False, True):
+        kind = "processes" if processes else "threads"
+        for workers in sorted({1, opts.workers}):
+            elapsed = measure(scripts, workers, processes)
+            print(f"{kind:<10} {workers:8} {len(scripts) / elapsed:10.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""
+Memory and time spent pushing quotation literals, with each literal's
+closure cached (the default) and with a fresh closure made on every push.
+
+`bytes/push` is the memory tracemalloc finds held by a stack of `--n`
+pushes of the same literal: with the cache, it is only the stack slot.
+
+Usage:
+    python benchmarks/bench_quotations.py [--n N] [--repeat N]
+"""
+
+import argparse
+import time
+import tracemalloc
+
+from mojito import Executor, compiler, stdlib, types
+
+
+PRELUDE = """
+: fact dup 1 > [dup 1 - fact *] [drop 1] if ;
+"""
+
+
+def uncached(self, vocab):
+    # Never remembers the vocab, so that every push misses.
+    return types.Closure(self.body, vocab, self.code)
+
+
+def measure(n, repeat, cached):
+    original = compiler.QuotationLiteral.closure_in
+    if not cached:
+        compiler.QuotationLiteral.closure_in = uncached
+    try:
+        ex = Executor(stdlib.vocab)
+        ex.run(PRELUDE)
+        ex.run("0 [[1]] times")
+
+        tracemalloc.start()
+        ex.run(f"{n} [[1]] times")
+        held, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        ex.stack.data.clear()
+
+        program = f"{n // 20} [20 fact drop] times"
+        best = float("inf")
+        for _ in range(repeat):
+            start = time.perf_counter()
+            ex.run(program)
+            best = min(best, time.perf_counter() - start)
+        return held / n, best
+    finally:
+        compiler.QuotationLiteral.closure_in = original
+
+
+def main():
+    args = argparse.ArgumentParser()
+    args.add_argument("--n", type=int, default=100_000)
+    args.add_argument("--repeat", type=int, default=5)
+    opts = args.parse_args()
+
+    print(f"{'closures':<10} {'bytes/push':>10} {'fact ms':>9}")
+    for name, cached in (("fresh", False), ("cached", True)):
+        per_push, seconds = measure(opts.n, opts.repeat, cached)
+        print(f"{name:<10} {per_push:10.1f} {seconds * 1000:9.2f}")
+
+
+if __name__ == "__main__":
+    main()
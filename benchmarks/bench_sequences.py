@@ -0,0 +1,49 @@
+"""
+A numeric pipeline (sum of the squares of the even numbers below N) run
+element by element through the interpreter versus on whole sequences.
+
+Usage:
+    python benchmarks/bench_sequences.py [--n N] [--repeat N]
+"""
+
+import argparse
+import time
+
+from mojito import Executor, stdlib
+from mojito.types import sequence
+
+
+PROGRAMS = {
+    "per element": "0 0 {half} [dup dup * swap [+] dip 2 +] times drop",
+    "combinators": "0 {half} range [2 *] map [dup *] map 0 [+] fold",
+    "sequences": "0 {half} range 2 v* dup v* sum",
+}
+
+
+def measure(program, repeat):
+    ex = Executor(stdlib.vocab.offspring())
+    best = float("inf")
+    for _ in range(repeat):
+        ex.stack.data.clear()
+        start = time.perf_counter()
+        ex.run(program)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    args = argparse.ArgumentParser()
+    args.add_argument("--n", type=int, default=100_000)
+    args.add_argument("--repeat", type=int, default=3)
+    opts = args.parse_args()
+
+    backend = "numpy" if sequence.numpy is not None else "array"
+    print(f"sequence backend: {backend}")
+    print(f"{'pipeline':<12} {'ms':>10} {'ns/elem':>8}")
+    for name, program in PROGRAMS.items():
+        best = measure(program.format(n=opts.n, half=opts.n // 2), opts.repeat)
+        print(f"{name:<12} {best * 1000:10.2f} {best / opts.n * 1e9:8.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+"""
+Dispatch counts and wall time of the executor without superinstructions,
+with the default fusion table and with a table trained on the benchmark
+itself.
+
+Dispatches are counted in a separate, traced run of each program.
+
+Usage:
+    python benchmarks/bench_superinstructions.py [--repeat N]
+"""
+
+import argparse
+import inspect
+import pathlib
+import sys
+import time
+
+from mojito import Executor, compiler, executor, optimizer, parser, stdlib
+from mojito import superinstructions
+
+
+EXAMPLES = pathlib.Path(__file__).resolve().parent.parent / "examples"
+
+PROGRAMS = {
+    "fact 20 (x200)": (
+        (EXAMPLES / "factorial.mojito").read_text(),
+        "20 fact drop " * 200,
+    ),
+    "fib 18": (
+        ": fib dup 1 > [dup 1 - fib swap 2 - fib +] when ;",
+        "18 fib drop",
+    ),
+    "squares 20000": (
+        ": squares dup 0 > [dup dup * drop 1 - squares] [drop] if ;",
+        "20000 squares",
+    ),
+}
+
+
+def dispatch_line():
+    lines, start = inspect.getsourcelines(executor.Executor._run)
+    for offset, line in enumerate(lines):
+        if line.strip() == "op = ops[ip]":
+            return start + offset
+    raise LookupError("dispatch line not found in Executor._run")
+
+
+def count_dispatches(ex, code):
+    line = dispatch_line()
+    count = 0
+
+    def trace(frame, event, arg):
+        nonlocal count
+        if frame.f_code is not executor.Executor._run.__code__:
+            return None
+        if event == "line" and frame.f_lineno == line:
+            count += 1
+        return trace
+
+    sys.settrace(trace)
+    try:
+        ex.run_code(code)
+    finally:
+        sys.settrace(None)
+    return count
+
+
+def compile_program(source):
+    code = compiler.compile_quotation(parser.parse(source))
+    optimizer.optimize(code)
+    return code
+
+
+def measure(prelude, program, table, repeat):
+    superinstructions.table = table
+    ex = Executor(stdlib.vocab.offspring())
+    ex.run(prelude)
+
+    dispatches = count_dispatches(ex, compile_program(program))
+    best = float("inf")
+    for _ in range(repeat):
+        code = compile_program(program)
+        start = time.perf_counter()
+        ex.run_code(code)
+        best = min(best, time.perf_counter() - start)
+    return dispatches, best
+
+
+def train(prelude, program):
+    superinstructions.table = set()
+    ex = Executor(stdlib.vocab.offspring())
+    ex.run(prelude)
+    code = compile_program(program)
+    with superinstructions.Trainer() as trainer:
+        ex.run_code(code)
+    return set(trainer.patterns([code], ex.vocab))
+
+
+def main():
+    args = argparse.ArgumentParser()
+    args.add_argument("--repeat", type=int, default=5)
+    opts = args.parse_args()
+
+    print(f"{'program':<16} {'table':<8} {'dispatches':>12} {'ms':>10}")
+    for name, (prelude, program) in PROGRAMS.items():
+        tables = {
+            "none": set(),
+            "default": set(superinstructions.DEFAULT_TABLE),
+            "trained": set(superinstructions.DEFAULT_TABLE) | train(prelude, program),
+        }
+        for table_name, table in tables.items():
+            dispatches, best = measure(prelude, program, table, opts.repeat)
+            print(f"{name:<16} {table_name:<8} {dispatches:>12} {best * 1000:10.2f}")
+    superinstructions.table = set(superinstructions.DEFAULT_TABLE)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""
+Tokenizer throughput on large generated `.mojito` sources.
+
+Compares the master-regex scanner used by `mojito.tokenizer` with the old
+strategy of trying every rule with `re.match` on a slice of the line.
+
+Usage:
+    python benchmarks/bench_tokenizer.py [--size-kb N] [--line-words N]
+"""
+
+import argparse
+import random
+import re
+import time
+
+import mojito.tokenizer as t
+from mojito import types
+
+
+WORDS = ["dup", "drop", "swap", "+", "-", "*", ">", "if", "fact", "apply"]
+
+
+def generate(size_kb: int, line_words: int, seed: int = 0) -> str:
+    rnd = random.Random(seed)
+    lines = []
+    size = 0
+    while size < size_kb * 1024:
+        terms = []
+        for _ in range(line_words):
+            choice = rnd.random()
+            if choice < 0.5:
+                terms.append(rnd.choice(WORDS))
+            elif choice < 0.7:
+                terms.append(str(rnd.randint(-1000, 1000)))
+            elif choice < 0.8:
+                terms.append(f"{rnd.random():.3f}")
+            elif choice < 0.9:
+                terms.append('"some text"')
+            else:
+                terms.append(rnd.choice(["[", "]"]))
+        line = " ".join(terms) + "  // trailing comment"
+        lines.append(line)
+        size += len(line) + 1
+    return "\n".join(lines)
+
+
+def slice_tokenize(s: str, rules):
+    # The pre-master-regex algorithm: slice the rest of the line and try
+    # each uncompiled rule in turn.
+    index = 0
+    while index < len(s):
+        for rule in rules:
+            match = re.match(rule.regex_rule, s[index:])
+            if match:
+                if rule.kind is not None:
+                    yield rule.kind, match.group()
+                index += match.end()
+                break
+        else:
+            raise t.NoMatchingRuleFoundError(index)
+
+
+def mojito_rules():
+    rules = []
+    tokenizer = t.mojito_tokenizer()
+    for rule in tokenizer._RegexTokenizer__rules:
+        rules.append(types.TokenRule(rule.regex_rule, rule.kind))
+    return rules
+
+
+def measure(name, text, tokenize_line):
+    lines = text.splitlines()
+    start = time.perf_counter()
+    count = 0
+    for line in lines:
+        for _ in tokenize_line(line):
+            count += 1
+    elapsed = time.perf_counter() - start
+    mb = len(text.encode()) / (1024 * 1024)
+    print(f"{name:<14} {count:>9} tokens  {elapsed:8.3f} s  {mb / elapsed:8.2f} MB/s")
+
+
+def main():
+    args = argparse.ArgumentParser()
+    args.add_argument("--size-kb", type=int, default=2048)
+    args.add_argument("--line-words", type=int, nargs="+", default=[10, 100, 1000])
+    opts = args.parse_args()
+
+    rules = mojito_rules()
+    tokenizer = t.mojito_tokenizer()
+    for line_words in opts.line_words:
+        text = generate(opts.size_kb, line_words)
+        print(f"-- {opts.size_kb} KiB, {line_words} words per line")
+        measure("slice+re.match", text, lambda line: slice_tokenize(line, rules))
+        measure("master regex", text, tokenizer)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,9 @@
+__version__ = "0.1.0"
+
 from mojito.executor import Executor
+from mojito.limits import LimitExceeded, Limits
+from mojito.pool import ExecutorPool
 from mojito.types import Vocab
 
 
-__all__ = ["Executor", "Vocab"]
+__all__ = ["Executor", "ExecutorPool", "LimitExceeded", "Limits", "Vocab"]
@@ -0,0 +1,131 @@
+"""
+An executor for asyncio programs.
+
+`AsyncExecutor` runs mojito code from a coroutine. Its I/O words, `.`,
+`put` and `get`, are async: while one of them waits, other tasks of the
+event loop run, e.g. the sessions of other network clients:
+
+    async def session(reader, writer):
+        ex = AsyncExecutor(stdlib.vocab, reader, writer)
+        await ex.run('"name?" . get .')
+
+Every other word runs on the same synchronous dispatch loop as in
+`Executor`, which only hands control back to the event loop when an async
+word is called.
+"""
+
+import asyncio
+import sys
+
+from mojito import compiler
+from mojito import effects
+from mojito import executor
+from mojito import optimizer
+from mojito import parser
+from mojito import types
+from mojito.limits import Limits
+from mojito.types import runtime
+from mojito.types.stack_effect import declare
+
+
+class Streams:
+    """
+    The async I/O words of an executor, bound to its streams.
+
+    Args:
+        reader: Where `get` reads lines from, e.g. an
+            `asyncio.StreamReader`, or None for stdin.
+        writer: Where `.` writes to, e.g. an `asyncio.StreamWriter`, or
+            None for stdout.
+    """
+
+    def __init__(self, reader=None, writer=None):
+        self.reader = reader
+        self.writer = writer
+
+    @declare("( x -- )")
+    async def println(self, word, state, vocab, read_word, execute):
+        try:
+            value = state.pop()
+        except IndexError:
+            loc = word.location
+            raise RuntimeError(
+                f"{loc}: '{word.name}' expected a value on top of the stack"
+            )
+        line = runtime.as_string(value) + "\n"
+        if self.writer is None:
+            sys.stdout.write(line)
+            return
+        self.writer.write(line.encode())
+        await self.writer.drain()
+
+    @declare("( -- s:str )")
+    async def get(self, word, state, vocab, read_word, execute):
+        if self.reader is None:
+            loop = asyncio.get_running_loop()
+            line = await loop.run_in_executor(None, sys.stdin.readline)
+        else:
+            line = (await self.reader.readline()).decode()
+        state.push(line.rstrip("\n"))
+
+
+class AsyncExecutor(executor.Executor):
+    """
+    Runs mojito code from a coroutine, awaiting its async words.
+
+    Args:
+        vocab: See `Executor`. The async I/O words are defined in an
+            offspring of it.
+        reader, writer: The streams of the I/O words, see `Streams`.
+        opt_level, limits: See `Executor`. Time spent awaiting counts
+            towards `limits.timeout`.
+    """
+
+    suspendable = True
+
+    def __init__(
+        self,
+        vocab: types.Vocab,
+        reader=None,
+        writer=None,
+        opt_level=2,
+        limits: Limits | None = None,
+    ):
+        super().__init__(vocab.offspring(), opt_level, limits)
+        self.streams = Streams(reader, writer)
+        # Like `Vocab.define_builtin`, but without bumping `Vocab.version`:
+        # no call site can have resolved a word in this new vocab yet, and
+        # the caches of every other session stay valid.
+        self.vocab.builtins = {
+            **self.vocab.builtins,
+            ".": self.streams.println,
+            "put": self.streams.println,
+            "get": self.streams.get,
+        }
+
+    async def run(self, source):
+        code = compiler.compile_quotation(parser.parse(source))
+        optimizer.optimize(code, self.opt_level)
+        await self.run_code(code)
+
+    async def run_code(self, code: compiler.Code):
+        """
+        See `Executor.run_code`.
+        """
+        effects.check_program(code, self.vocab, self.stack, self.opt_level)
+        self.start_budget()
+        closure = types.Closure(types.Quotation(code.nodes), self.vocab, code)
+        await self.execute_async(closure)
+
+    async def execute_async(self, closure: types.Closure):
+        """
+        Runs a closure, awaiting the async words it calls.
+        """
+        code = executor.code_of(closure, self.opt_level)
+        if code.checks is not None:
+            effects.check_entry(code.checks, self.stack)
+        suspended = self._run(executor.Frame(code, closure.vocab))
+        while suspended is not None:
+            awaitable, frames = suspended
+            await awaitable
+            suspended = self._run(frames.pop(), frames)
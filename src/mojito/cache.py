@@ -0,0 +1,97 @@
+"""
+On-disk cache of compiled source files, similar to `__pycache__`.
+
+`foo.mojito` is cached in `__mojitocache__/foo.<tag>.pickle` next to it,
+where the tag names the interpreter version, or in
+`foo.<tag>.opt-<level>.pickle` for optimized code. The cache file also
+records a hash of the source, and of the superinstruction table used to
+optimize it, so editing either invalidates the entry.
+"""
+
+import gc
+import hashlib
+import os
+import pathlib
+import pickle
+import sys
+
+import mojito
+from mojito import compiler
+from mojito import optimizer
+from mojito import parser
+from mojito import superinstructions
+
+
+CACHE_DIR = "__mojitocache__"
+
+# Bump whenever the layout of `compiler.Code` or of the AST changes.
+FORMAT_VERSION = 8
+
+TAG = f"mojito-{mojito.__version__}-{FORMAT_VERSION}.{sys.implementation.cache_tag}"
+
+
+def cache_path(source_path, opt_level=1) -> pathlib.Path:
+    source_path = pathlib.Path(source_path)
+    opt = f".opt-{opt_level}" if opt_level else ""
+    return source_path.parent / CACHE_DIR / f"{source_path.stem}.{TAG}{opt}.pickle"
+
+
+def compile_file(source_path, opt_level=1) -> compiler.Code:
+    """
+    Returns the compiled code of a source file, loading it from the cache
+    when the cached entry matches the current contents of the file, and
+    parsing and caching it otherwise.
+
+    Args:
+        source_path: Path to a mojito source file.
+        opt_level: Optimization level, see `mojito.optimizer`.
+
+    Returns:
+        Compiled code that has not been executed yet.
+    """
+    source = pathlib.Path(source_path).read_bytes()
+    hasher = hashlib.sha256(source)
+    if opt_level:
+        hasher.update(repr(sorted(superinstructions.table)).encode())
+    digest = hasher.hexdigest()
+    path = cache_path(source_path, opt_level)
+
+    code = load(path, digest)
+    if code is None:
+        code = compiler.compile_quotation(parser.parse(source.decode()))
+        optimizer.optimize(code, opt_level)
+        store(path, digest, code)
+    return code
+
+
+def load(path: pathlib.Path, digest: str):
+    # Unpickling allocates lots of small containers, which would otherwise
+    # trigger many pointless garbage collection passes.
+    gc_was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        with path.open("rb") as file:
+            cached_digest, code = pickle.load(file)
+    except Exception:
+        # Missing, truncated or written by something else: just a miss.
+        return None
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+
+    if cached_digest != digest:
+        return None
+    return code
+
+
+def store(path: pathlib.Path, digest: str, code: compiler.Code):
+    # Like Python with `__pycache__`, carry on silently if the cache cannot
+    # be written, e.g. in a read-only directory.
+    tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+    try:
+        path.parent.mkdir(exist_ok=True)
+        with tmp_path.open("wb") as file:
+            pickle.dump((digest, code), file, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, path)
+    except (OSError, RecursionError):
+        tmp_path.unlink(missing_ok=True)
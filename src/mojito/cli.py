@@ -1,19 +1,64 @@
 import argparse
 import pathlib
+import sys
 
+import mojito
 from mojito import (
+    cache,
+    compiler,
     executor,
+    optimizer,
+    parser as mojito_parser,
     stdlib,
+    superinstructions,
 )
 
 
-MOJITO_VERSION = "mojito 0.1.0"
+MOJITO_VERSION = f"mojito {mojito.__version__}"
 
 
 def parse_args():
     parser = argparse.ArgumentParser()
-    parser.add_argument("input_file", nargs="?")
+    parser.add_argument("input_file", nargs="?", help="'-' reads from stdin")
     parser.add_argument("--version", action="store_true")
+    parser.add_argument(
+        "--stream",
+        action="store_true",
+        help="execute top-level terms as soon as they are read",
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help=f"neither read nor write {cache.CACHE_DIR}",
+    )
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="print per-word call counts and timings to stderr",
+    )
+    parser.add_argument(
+        "--profile-stacks",
+        metavar="FILE",
+        help="write profiled call stacks in the collapsed flamegraph format",
+    )
+    parser.add_argument(
+        "--opt-level",
+        type=int,
+        choices=(0, 1, 2, 3),
+        default=2,
+        help="0 disables optimizations, 1 only folds constants, 2 also "
+        "inlines small words, 3 also translates words to Python",
+    )
+    parser.add_argument(
+        "--fusion-table",
+        metavar="FILE",
+        help="also fuse the word sequences listed in FILE",
+    )
+    parser.add_argument(
+        "--train-fusion",
+        metavar="FILE",
+        help="write the word sequences worth fusing in this run to FILE",
+    )
     args = parser.parse_args()
     return args
 
@@ -39,10 +84,59 @@ def repl():
             break
 
 
-def run_file(file_path):
-    ex = executor.Executor(stdlib.vocab)
-    text = pathlib.Path(file_path).read_text()
-    ex.run(text)
+def run_file(
+    file_path,
+    stream=False,
+    use_cache=True,
+    profile=False,
+    profile_stacks=None,
+    opt_level=2,
+    fusion_table=None,
+    train_fusion=None,
+):
+    ex = executor.Executor(stdlib.vocab, opt_level)
+    if fusion_table:
+        superinstructions.table.update(superinstructions.load(fusion_table))
+    if train_fusion:
+        train_file(ex, file_path, train_fusion)
+        return
+    if not (profile or profile_stacks):
+        execute_file(ex, file_path, stream, use_cache)
+        return
+
+    prof = ex.profile()
+    prof.start()
+    try:
+        execute_file(ex, file_path, stream, use_cache)
+    finally:
+        prof.stop()
+        if profile:
+            print(prof.table(), file=sys.stderr)
+        if profile_stacks:
+            pathlib.Path(profile_stacks).write_text(prof.collapsed_stacks())
+
+
+def train_file(ex, file_path, output):
+    code = compiler.compile_quotation(
+        mojito_parser.parse(pathlib.Path(file_path).read_text())
+    )
+    optimizer.optimize(code, ex.opt_level)
+    with superinstructions.Trainer() as trainer:
+        ex.run_code(code)
+    superinstructions.save(trainer.patterns([code], ex.vocab), output)
+
+
+def execute_file(ex, file_path, stream, use_cache):
+    if file_path == "-":
+        ex.run_stream(sys.stdin)
+    elif stream:
+        with open(file_path) as file:
+            ex.run_stream(file)
+    elif use_cache:
+        ex.run_code(cache.compile_file(file_path, ex.opt_level))
+    else:
+        text = pathlib.Path(file_path).read_text()
+        ex.run(text)
 
 
 def main():
@@ -51,7 +145,16 @@ def main():
     if args.version:
         print(MOJITO_VERSION)
     elif args.input_file:
-        run_file(args.input_file)
+        run_file(
+            args.input_file,
+            stream=args.stream,
+            use_cache=not args.no_cache,
+            profile=args.profile,
+            profile_stacks=args.profile_stacks,
+            opt_level=args.opt_level,
+            fusion_table=args.fusion_table,
+            train_fusion=args.train_fusion,
+        )
     else:
         repl()
 
@@ -0,0 +1,440 @@
+"""
+Translation of user-defined words into Python functions.
+
+At opt level 3, when a call site resolves to a word defined with `:`, the
+executor tries to translate the word into Python source, compiles it, and
+calls the resulting function in place of the word, like a builtin. Given
+
+    : poly ( x:num -- y:num ) dup dup * swap 3 * + 1 + ;
+
+the body of `poly` becomes
+
+    def body(state, execute, x0):
+        t0 = x0 * x0
+        t1 = x0 * 3
+        t2 = t0 + t1
+        t3 = t2 + 1
+        return t3
+
+along with an `entry` function moving the inputs from the stack and the
+outputs back. Stack slots are local variables: the stack effect of the
+word tells how many values it takes and leaves. Stack shuffles, arithmetic
+on values known to be numbers, and `if`, `when` and `apply` on quotation
+literals become Python code; other builtins of `stdlib.vocab` are called
+directly on the stack; words translated themselves are called as Python
+functions.
+
+Only words with a known stack effect that neither loop nor recurse are
+translated, so that a call always runs a bounded amount of code, which
+keeps `mojito.limits` enforceable. Other words are left to the interpreter,
+and so are calls whose inputs are not of the types the word expects.
+
+Like inlined words, a translation is guarded by the words it was resolved
+from, and is redone once any of them resolves to something else. Compiled
+Python code is cached by source, which is the same for a definition in
+any vocab.
+"""
+
+import math
+
+from mojito import compiler
+from mojito import effects
+from mojito import stdlib
+from mojito import superinstructions
+from mojito import types
+from mojito.types import stack_effect
+
+
+ANY = stack_effect.ANY
+NUM = stack_effect.NUM
+STR = stack_effect.STR
+QUOT = stack_effect.QUOT
+
+# Builtins written as Python expressions when applied to two numbers.
+OPERATORS = {
+    stdlib.add: "{} + {}",
+    stdlib.sub: "{} - {}",
+    stdlib.mul: "{} * {}",
+    stdlib.lt: "int({} < {})",
+    stdlib.gt: "int({} > {})",
+}
+
+# Same, only when dividing by a nonzero constant: the builtins report
+# divisions by zero.
+DIVISIONS = {
+    stdlib.div: "{} / {}",
+    stdlib.mod: "{} % {}",
+}
+
+# Compiled Python code, by source.
+_compiled = {}
+
+
+class CannotTranslate(Exception):
+    pass
+
+
+class Slot:
+    """
+    A stack slot of the word being translated.
+
+    Attributes:
+        expr: The Python expression of its value, a local or a constant.
+        type: Its stack effect type.
+        literal: The `compiler.QuotationLiteral` it holds, if any: such slots
+            have no value, they are only consumed by `if`, `when` and `apply`.
+        constant: Its value, if it is a constant.
+    """
+
+    __slots__ = ("expr", "type", "literal", "constant")
+
+    def __init__(self, expr, type_, literal=None, constant=None):
+        self.expr = expr
+        self.type = type_
+        self.literal = literal
+        self.constant = constant
+
+    def same(self, other) -> bool:
+        return self.expr == other.expr and self.literal is other.literal
+
+
+def no_words():
+    return None
+
+
+def native(closure: types.Closure, opt_level: int = 3):
+    """
+    Returns the function standing for `closure`, a builtin taking its inputs
+    from the stack, or None if the closure cannot be translated.
+
+    The function has the attributes `body`, the generated function taking
+    the inputs as arguments and returning the outputs, `effect`, `guards`
+    and `source`.
+    """
+    return translate(closure, opt_level, set())
+
+
+def translate(closure, opt_level, expanding):
+    code = effects.code_of(closure, opt_level)
+    entry = code.native
+    if entry == types.Vocab.version:
+        # Could not be translated, and no word has been defined since.
+        return None
+    if callable(entry) and guards_hold(entry.guards):
+        return entry
+    if id(closure) in expanding:
+        # A recursive word.
+        return None
+
+    expanding.add(id(closure))
+    try:
+        entry = Translator(closure, opt_level, expanding).translate()
+    except CannotTranslate:
+        code.native = types.Vocab.version
+        return None
+    finally:
+        expanding.discard(id(closure))
+    code.native = entry
+    return entry
+
+
+def guards_hold(guards) -> bool:
+    return all(vocab.lookup(name) is target for name, vocab, target in guards)
+
+
+class Translator:
+    """
+    Generates the Python source of a single word.
+    """
+
+    def __init__(self, closure, opt_level, expanding):
+        self.closure = closure
+        self.vocab = closure.vocab
+        self.opt_level = opt_level
+        self.expanding = expanding
+        self.namespace = {
+            "closure": closure,
+            "vocab": closure.vocab,
+            "no_words": no_words,
+        }
+        self.refs = {}
+        self.guards = []
+        self.lines = []
+        self.locals = 0
+        self.uses_data = False
+
+    def translate(self):
+        effect = effects.effect_of(self.closure, self.opt_level)
+        if effect is None:
+            raise CannotTranslate
+        code = effects.code_of(self.closure, self.opt_level)
+        inputs = [Slot(f"x{i}", type_) for i, (_, type_) in enumerate(effect.inputs)]
+        stack = self.run(code, list(inputs), 1)
+        if len(stack) != len(effect.outputs):
+            raise CannotTranslate
+        if any(slot.literal is not None for slot in stack):
+            raise CannotTranslate
+        if stack:
+            self.emit("return " + ", ".join(slot.expr for slot in stack), 1)
+
+        params = "".join(f", {slot.expr}" for slot in inputs)
+        lines = [f"def body(state, execute{params}):"]
+        if self.uses_data:
+            lines.append("    data = state.data")
+        lines.extend(self.lines or ["    pass"])
+        lines.append("")
+        lines.extend(self.entry(effect, inputs))
+        source = "\n".join(lines) + "\n"
+
+        compiled = _compiled.get(source)
+        if compiled is None:
+            compiled = compile(source, "<mojito codegen>", "exec")
+            _compiled[source] = compiled
+        namespace = self.namespace
+        exec(compiled, namespace)
+        entry = namespace["entry"]
+        entry.body = namespace["body"]
+        entry.effect = effect
+        entry.guards = tuple(self.guards)
+        entry.source = source
+        return entry
+
+    def entry(self, effect, inputs) -> list:
+        # Falls back on the closure when the inputs are missing or are not
+        # of the types the body was translated for.
+        n = len(inputs)
+        m = len(effect.outputs)
+        args = "".join(f", {slot.expr}" for slot in inputs)
+        call = f"body(state, execute{args})"
+        lines = [
+            "def entry(word, state, vocab, read_word, execute):",
+            "    data = state.data",
+        ]
+        if n:
+            lines.append(f"    if len(data) < {n}:")
+            lines.append("        return closure")
+            names = ", ".join(slot.expr for slot in inputs)
+            if n == 1:
+                lines.append(f"    {names} = data[-1]")
+            else:
+                lines.append(f"    {names} = data[-{n}:]")
+            checks = [
+                f"isinstance({slot.expr}, "
+                f"{self.ref(stack_effect.PYTHON_TYPES[slot.type], 'k')})"
+                for slot in inputs
+                if slot.type != ANY
+            ]
+            if checks:
+                lines.append(f"    if not ({' and '.join(checks)}):")
+                lines.append("        return closure")
+        if n == 1 and m == 1:
+            lines.append(f"    data[-1] = {call}")
+            return lines
+        if n:
+            lines.append(f"    del data[-{n}:]")
+        if m == 0:
+            lines.append(f"    {call}")
+        elif m == 1:
+            lines.append(f"    data.append({call})")
+        else:
+            lines.append(f"    data.extend({call})")
+        return lines
+
+    def emit(self, line, indent):
+        self.lines.append("    " * indent + line)
+
+    def ref(self, obj, prefix) -> str:
+        # Names an object for the generated code. Names only depend on the
+        # order objects are met in, so the source does not depend on them.
+        name = self.refs.get(id(obj))
+        if name is None:
+            name = f"{prefix}{len(self.refs)}"
+            self.refs[id(obj)] = name
+            self.namespace[name] = obj
+        return name
+
+    def new_local(self) -> str:
+        name = f"t{self.locals}"
+        self.locals += 1
+        return name
+
+    def pop(self, stack) -> Slot:
+        if not stack:
+            # The word would take more values than its stack effect says.
+            raise CannotTranslate
+        return stack.pop()
+
+    def pop_values(self, stack, count) -> list:
+        values = [self.pop(stack) for _ in range(count)]
+        if any(slot.literal is not None for slot in values):
+            raise CannotTranslate
+        values.reverse()
+        return values
+
+    def run(self, code, stack, indent) -> list:
+        """
+        Translates `code`, starting with `stack`.
+
+        Returns:
+            The stack the code ends with.
+        """
+        for ip in range(len(code)):
+            op, arg = superinstructions.original_instruction(code, ip)
+            if op == compiler.PUSH_CONST:
+                stack.append(self.constant(arg))
+            elif op == compiler.MAKE_CLOSURE:
+                stack.append(Slot(None, QUOT, literal=arg))
+            elif op == compiler.CALL_WORD:
+                self.call(arg.word, stack, indent)
+            else:
+                raise CannotTranslate
+        return stack
+
+    def constant(self, value) -> Slot:
+        if isinstance(value, str):
+            return Slot(repr(value), STR, constant=value)
+        if isinstance(value, int):
+            return Slot(repr(value), NUM, constant=value)
+        if isinstance(value, float):
+            # `repr` of infinities and NaN is no Python expression.
+            expr = repr(value) if math.isfinite(value) else self.ref(value, "c")
+            return Slot(expr, NUM, constant=value)
+        raise CannotTranslate
+
+    def call(self, word, stack, indent):
+        name = word.name
+        target = self.vocab.lookup(name)
+        if target is None:
+            raise CannotTranslate
+        self.guards.append((name, self.vocab, target))
+
+        if isinstance(target, types.Closure):
+            self.call_word(target, stack, indent)
+        elif target is stdlib.if_combinator:
+            self.branch(stack, indent, 2)
+        elif target is stdlib.when:
+            self.branch(stack, indent, 1)
+        elif target is stdlib.apply:
+            quotation = self.pop(stack)
+            if quotation.literal is None:
+                raise CannotTranslate
+            self.run(quotation.literal.code, stack, indent)
+        elif target is stdlib.dup:
+            slot = self.pop(stack)
+            stack += [slot, slot]
+        elif target is stdlib.drop:
+            self.pop(stack)
+        elif target is stdlib.swap:
+            b, a = self.pop(stack), self.pop(stack)
+            stack += [b, a]
+        else:
+            self.call_builtin(word, target, stack, indent)
+
+    def call_builtin(self, word, target, stack, indent):
+        if stdlib.vocab.builtins.get(word.name) is not target:
+            raise CannotTranslate
+        effect = getattr(target, "effect", None)
+        if effect is None or stdlib.needs_frame(target) or target in effects.RULES:
+            raise CannotTranslate
+
+        template = OPERATORS.get(target)
+        if template is None and target in DIVISIONS and stack and stack[-1].constant:
+            template = DIVISIONS[target]
+        numbers = len(stack) >= 2 and stack[-2].type == stack[-1].type == NUM
+        if template is not None and numbers:
+            b, a = stack.pop(), stack.pop()
+            result = self.new_local()
+            self.emit(f"{result} = {template.format(a.expr, b.expr)}", indent)
+            stack.append(Slot(result, NUM))
+            return
+
+        # Any other builtin runs on the stack: its inputs are pushed, and
+        # its outputs popped back into locals.
+        values = self.pop_values(stack, len(effect.inputs))
+        self.uses_data = True
+        if len(values) == 1:
+            self.emit(f"data.append({values[0].expr})", indent)
+        elif values:
+            self.emit(f"data.extend(({', '.join(v.expr for v in values)}))", indent)
+        builtin = self.ref(target, "b")
+        self.emit(
+            f"{builtin}({self.ref(word, 'w')}, state, vocab, no_words, execute)",
+            indent,
+        )
+        results = [self.new_local() for _ in effect.outputs]
+        if len(results) == 1:
+            self.emit(f"{results[0]} = data.pop()", indent)
+        elif results:
+            self.emit(f"{', '.join(results)} = data[-{len(results)}:]", indent)
+            self.emit(f"del data[-{len(results)}:]", indent)
+        self.push_outputs(stack, effect, values, results)
+
+    def call_word(self, closure, stack, indent):
+        callee = translate(closure, self.opt_level, self.expanding)
+        if callee is None:
+            raise CannotTranslate
+        self.guards.extend(callee.guards)
+        effect = callee.effect
+        values = self.pop_values(stack, len(effect.inputs))
+        for slot, (_, type_) in zip(values, effect.inputs):
+            if type_ != ANY and type_ != slot.type:
+                raise CannotTranslate
+
+        args = "".join(f", {slot.expr}" for slot in values)
+        call = f"{self.ref(callee.body, 'n')}(state, execute{args})"
+        results = [self.new_local() for _ in effect.outputs]
+        if results:
+            self.emit(f"{', '.join(results)} = {call}", indent)
+        else:
+            self.emit(call, indent)
+        self.push_outputs(stack, effect, values, results)
+
+    def push_outputs(self, stack, effect, values, results):
+        # An output named like an input is that input, of the same type.
+        types_by_name = {
+            name: slot.type for (name, _), slot in zip(effect.inputs, values)
+        }
+        for result, (name, type_) in zip(results, effect.outputs):
+            stack.append(Slot(result, types_by_name.get(name, type_)))
+
+    def branch(self, stack, indent, count):
+        # `if` with count 2, `when` with count 1.
+        quotations = [self.pop(stack) for _ in range(count)]
+        quotations.reverse()
+        cond = self.pop(stack)
+        if any(q.literal is None for q in quotations) or cond.type != NUM:
+            raise CannotTranslate
+
+        outer = self.lines
+        branches = []
+        for quotation in quotations:
+            self.lines = []
+            ended = self.run(quotation.literal.code, list(stack), indent + 1)
+            branches.append((self.lines, ended))
+        if count == 1:
+            branches.append(([], list(stack)))
+        self.lines = outer
+
+        if len({len(ended) for _, ended in branches}) != 1:
+            raise CannotTranslate
+        # Slots that differ between branches are assigned to a common local
+        # at the end of each.
+        merged = []
+        for slots in zip(*(ended for _, ended in branches)):
+            if all(slot.same(slots[0]) for slot in slots):
+                merged.append(slots[0])
+                continue
+            if any(slot.literal is not None for slot in slots):
+                raise CannotTranslate
+            result = self.new_local()
+            for (lines, _), slot in zip(branches, slots):
+                lines.append("    " * (indent + 1) + f"{result} = {slot.expr}")
+            same_type = all(slot.type == slots[0].type for slot in slots)
+            merged.append(Slot(result, slots[0].type if same_type else ANY))
+
+        self.emit(f"if {cond.expr}:", indent)
+        self.lines.extend(branches[0][0] or ["    " * (indent + 1) + "pass"])
+        if branches[1][0]:
+            self.emit("else:", indent)
+            self.lines.extend(branches[1][0])
+        stack[:] = merged
@@ -0,0 +1,176 @@
+from __future__ import annotations
+
+from mojito import types
+
+
+# Opcodes. Instruction `i` of a `Code` always comes from `nodes[i]`, which is
+# what lets parsing words such as `:` read the words that follow them.
+PUSH_CONST = 0
+CALL_WORD = 1
+MAKE_CLOSURE = 2
+CALL_CLOSURE = 3
+RETURN = 4
+# Emitted by `mojito.optimizer` in place of the first instruction of a span.
+PUSH_FOLDED = 5
+CALL_FOLDED = 6
+# Set by the executor in place of a call to a small word, see `mojito.inliner`.
+CALL_INLINED = 7
+# Runs a few builtin calls in one dispatch, see `mojito.superinstructions`.
+FUSED = 8
+# Calls every closure yielded by its operand, a generator, in turn. Returned
+# by loop combinators through `continuation`.
+ITERATE = 9
+
+# While set, every word resolved by a call site is replaced with
+# `resolve_hook(name, target)`. Used by `mojito.profiler`.
+resolve_hook = None
+
+
+class CallSite:
+    """
+    An inline cache for a single word call.
+
+    Remembers what `word` resolved to in `vocab` as of `types.Vocab.version`,
+    so that in steady state calling a word costs no vocab chain walk.
+    """
+
+    __slots__ = ("word", "vocab", "version", "target", "proof")
+
+    def __init__(self, word: types.Word):
+        self.word = word
+        self.vocab = None
+        self.version = -1
+        self.target = None
+        # Set by `mojito.effects` when the types of the values this call
+        # gets are known, which lets it run the builtin's unchecked variant.
+        self.proof = None
+
+    def resolve(self, vocab: types.Vocab):
+        target = vocab.lookup(self.word.name)
+        if target is None:
+            raise RuntimeError(f"I don't know the word: {self.word.name}")
+        if resolve_hook is not None:
+            target = resolve_hook(self.word.name, target)
+        elif self.proof is not None:
+            unchecked = getattr(target, "unchecked", None)
+            if unchecked is not None and self.proof.holds(vocab):
+                target = unchecked
+
+        self.vocab = vocab
+        self.version = types.Vocab.version
+        self.target = target
+        return target
+
+
+class QuotationLiteral:
+    """
+    The operand of a `MAKE_CLOSURE` instruction: a quotation literal and its
+    compiled code.
+
+    Remembers the closure it made in the last vocab it was pushed in, so
+    that in steady state pushing a quotation allocates nothing. Closures
+    are never mutated once made, which makes sharing one safe.
+    """
+
+    __slots__ = ("body", "code", "vocab", "closure")
+
+    def __init__(self, body: types.Quotation, code: Code):
+        self.body = body
+        self.code = code
+        self.vocab = None
+        self.closure = None
+
+    def closure_in(self, vocab: types.Vocab) -> types.Closure:
+        if self.vocab is not vocab:
+            self.closure = types.Closure(self.body, vocab, self.code)
+            self.vocab = vocab
+        return self.closure
+
+
+class Code:
+    """
+    A quotation lowered into a flat instruction array.
+
+    Attributes:
+        ops: Opcodes, one per node plus a trailing `RETURN`.
+        args: The operand of each instruction.
+        nodes: The AST nodes the instructions were compiled from.
+        effect: The stack effect inferred by `mojito.effects`, if any.
+        checks: What the stack must hold on entry for the code to run its
+            unchecked fast path, see `mojito.effects.check_entry`.
+        proof: What `effect` and `checks` were inferred assuming, or None
+            if `mojito.effects` has not looked at the code yet.
+        native: The function `mojito.codegen` translated the code into, the
+            `types.Vocab.version` at which it could not, or None if it has
+            not tried.
+    """
+
+    __slots__ = ("ops", "args", "nodes", "effect", "checks", "proof", "native")
+
+    def __init__(self, ops, args, nodes):
+        self.ops = ops
+        self.args = args
+        self.nodes = nodes
+        self.effect = None
+        self.checks = None
+        self.proof = None
+        self.native = None
+
+    def __len__(self):
+        return len(self.nodes)
+
+
+def compile_quotation(quotation) -> Code:
+    """
+    Lowers a quotation (or a program) into a `Code` object.
+
+    Nested quotations are compiled eagerly, so pushing a quotation literal
+    never compiles anything at run time.
+
+    Args:
+        quotation: A `types.Quotation` or `types.Program`.
+
+    Returns:
+        The compiled code.
+    """
+    nodes = list(quotation)
+    ops = []
+    args = []
+
+    for node in nodes:
+        match node:
+            case types.Number(value=value) | types.String(value=value):
+                ops.append(PUSH_CONST)
+                args.append(value)
+            case types.Quotation():
+                ops.append(MAKE_CLOSURE)
+                args.append(QuotationLiteral(node, compile_quotation(node)))
+            case types.Word():
+                ops.append(CALL_WORD)
+                args.append(CallSite(node))
+            case _:
+                raise TypeError(f"cannot compile {type(node).__name__}")
+
+    ops.append(RETURN)
+    args.append(None)
+    return Code(ops, args, nodes)
+
+
+def continuation(*instructions) -> types.Closure:
+    """
+    Wraps instructions into an anonymous closure.
+
+    Combinators return it to have the executor run several steps after
+    they return, instead of calling `execute` and growing the Python stack.
+
+    Args:
+        instructions: `(opcode, operand)` pairs, e.g. `(CALL_CLOSURE, quot)`.
+
+    Returns:
+        A closure running the instructions in order.
+    """
+    ops = [op for op, _ in instructions]
+    args = [arg for _, arg in instructions]
+    ops.append(RETURN)
+    args.append(None)
+    return types.Closure(types.Quotation(), None, Code(ops, args, []))
@@ -0,0 +1,577 @@
+"""
+Static stack effect inference.
+
+Builtins declare their stack effects (see `mojito.types.stack_effect`) and
+`:` definitions may too:
+
+    : sq ( n:num -- n:num ) dup * ;
+
+The inference runs over compiled code before it executes, tracking the
+types of the values on an abstract stack. It rejects code that would fail
+for sure, e.g. `"a" 1 +`, or whose body does not match its declaration,
+with a `StackEffectError` pointing at the word at fault.
+
+A call whose inputs have proven types gets a `Proof`, which makes its call
+site resolve to the unchecked variant of the builtin, skipping the arity
+and type checks. A proof lists the stack effects it assumed of the words
+of the code and is void once one of them resolves to something else. Code
+relying on the types of its inputs gets `checks`, verified once on entry
+by `check_entry` instead of in every call.
+
+The inference gives up, leaving the rest of the code unproven but not
+rejected, wherever it cannot tell the stack apart: unknown words, words of
+unknown effect, quotations of unknown effect being called, branches leaving
+different stacks.
+"""
+
+from mojito import compiler
+from mojito import memo
+from mojito import optimizer
+from mojito import parser
+from mojito import stdlib
+from mojito import superinstructions
+from mojito import types
+from mojito.types import stack_effect
+from mojito.types.stack_effect import ANY, NUM, QUOT, PYTHON_TYPES
+
+
+class StackEffectError(Exception):
+    pass
+
+
+class GiveUp(Exception):
+    pass
+
+
+class Value:
+    """
+    A value of the abstract stack.
+
+    Attributes:
+        type: One of the `stack_effect` types.
+        input: Whether the value was taken from below the code's own stack,
+            in which case its type may be narrowed by how it is used.
+        effect: The stack effect of a quotation literal, if known.
+    """
+
+    __slots__ = ("type", "input", "effect")
+
+    def __init__(self, type_=ANY, input=False, effect=None):
+        self.type = type_
+        self.input = input
+        self.effect = effect
+
+
+class Proof:
+    """
+    The assumptions the proven calls of a piece of code rely on: each word
+    resolving, in `vocab`, to something with the same stack effect.
+    `opt_level` is the one words are compiled at to infer their effects.
+    """
+
+    __slots__ = ("vocab", "assumptions", "opt_level", "version", "valid")
+
+    def __init__(self, vocab, assumptions, opt_level=1):
+        self.vocab = vocab
+        self.assumptions = assumptions
+        self.opt_level = opt_level
+        self.version = -1
+        self.valid = False
+
+    def holds(self, vocab) -> bool:
+        if vocab is not self.vocab:
+            return False
+        if self.version != types.Vocab.version:
+            self.valid = all(
+                key_of(vocab.lookup(name), self.opt_level) == key
+                for name, key in self.assumptions.items()
+            )
+            self.version = types.Vocab.version
+        return self.valid
+
+
+def code_of(closure: types.Closure, opt_level: int = 1) -> compiler.Code:
+    """
+    Like `optimizer.code_of`, but also infers the stack effect of the code.
+    """
+    code = optimizer.code_of(closure, opt_level)
+    if code.proof is None:
+        annotate(code, closure.vocab, closure.effect, opt_level)
+    return code
+
+
+def effect_of(closure: types.Closure, opt_level: int = 1):
+    """
+    Returns the stack effect of a closure, or None if unknown. Its code is
+    compiled at `opt_level` if it was not yet.
+    """
+    if closure.vocab is None:
+        return closure.effect
+    code = code_of(closure, opt_level)
+    if not code.proof.holds(closure.vocab):
+        # A word it calls was redefined since: so may its effect have been.
+        annotate(code, closure.vocab, closure.effect, opt_level)
+    return code.effect
+
+
+def key_of(target, opt_level: int = 1):
+    """
+    Returns what the proofs compare a word's definition by: the builtin
+    itself for combinators, its stack effect otherwise.
+    """
+    if isinstance(target, types.Closure):
+        return effect_of(target, opt_level)
+    if isinstance(target, memo.Memoized):
+        return effect_of(target.closure, opt_level)
+    if target in RULES:
+        return target
+    return getattr(target, "effect", None)
+
+
+def annotate(code, vocab, declared=None, opt_level=1, stack=None, defined=None):
+    """
+    Infers the stack effect of `code`, run in `vocab`, and of the
+    quotations in it, marking the calls it proves.
+
+    Args:
+        declared: The declared stack effect of the code, if any.
+        stack: The values the code will run on, if known, e.g. for a
+            program about to be run at the top level.
+        defined: Stack effects of the words defined by the code around
+            it, see `Inference.defined`.
+
+    Raises:
+        StackEffectError: If the code cannot run as it is.
+    """
+    # Marks the code as being inferred: a word calling itself sees only its
+    # declaration, if any.
+    code.proof = Proof(vocab, {}, opt_level)
+    code.effect = declared
+    for site in call_sites(code):
+        site.proof = None
+        # Make the site resolve again, with or without a proof.
+        site.version = -1
+
+    inference = Inference(code, vocab, dict(defined or {}), opt_level)
+    if stack is not None:
+        inference.known_depth = True
+        inference.stack = [value_of(value) for value in stack]
+    try:
+        inference.run()
+        inferred = inference.effect()
+    except GiveUp:
+        inferred = None
+
+    code.effect = inferred
+    if declared is not None:
+        check_declaration(declared, inferred, location_node(code))
+        code.effect = verified(declared, inferred)
+    code.proof = Proof(vocab, dict(inference.assumptions), opt_level)
+    if opt_level >= 1:
+        inference.prove(code.proof)
+
+
+def check_program(code, vocab, stack, opt_level=1):
+    """
+    Checks a program about to be run on `stack` at the top level.
+    """
+    annotate(code, vocab, None, opt_level, stack.data)
+
+
+def check_entry(checks, stack, word=None):
+    """
+    Checks that `stack` holds the inputs `checks`, the entry checks of some
+    code, require.
+
+    Args:
+        word: The word the code is called by, named in the errors.
+    """
+    depth, typed = checks
+    data = stack.data
+    if len(data) < depth:
+        raise RuntimeError(
+            f"{called_by(word)}expected {depth} elements on the stack, got {len(data)}"
+        )
+    for position, type_ in typed:
+        if not isinstance(data[position], PYTHON_TYPES[type_]):
+            raise RuntimeError(
+                f"{called_by(word)}expected {type_}, "
+                f"got {type(data[position]).__name__}"
+            )
+
+
+def called_by(word):
+    if word is None:
+        return ""
+    return f"{word.location}: '{word.name}' "
+
+
+def location_node(code):
+    # Quotations have no location of their own.
+    for node in code.nodes:
+        if not isinstance(node, types.Quotation):
+            return node
+    return None
+
+
+def value_of(value) -> Value:
+    for type_, python_type in PYTHON_TYPES.items():
+        if isinstance(value, python_type):
+            return Value(type_)
+    return Value()
+
+
+def call_sites(code):
+    for ip in range(len(code)):
+        op, arg = superinstructions.original_instruction(code, ip)
+        if op == compiler.CALL_WORD:
+            yield arg
+
+
+def verified(declared, inferred):
+    """
+    Returns what callers may assume of a word declared `declared`: all of
+    it if inference checked it against the body, only the number of inputs
+    and outputs if it gave up.
+    """
+    if inferred is not None or declared is None:
+        return declared
+    return stack_effect.StackEffect(
+        tuple((name, ANY) for name, _ in declared.inputs),
+        tuple((name, ANY) for name, _ in declared.outputs),
+    )
+
+
+def check_declaration(declared, inferred, node):
+    if inferred is None:
+        return
+    mismatch = len(declared.inputs) != len(inferred.inputs) or len(
+        declared.outputs
+    ) != len(inferred.outputs)
+    for (_, want), (_, got) in zip(
+        declared.inputs + declared.outputs, inferred.inputs + inferred.outputs
+    ):
+        if ANY not in (want, got) and want != got:
+            mismatch = True
+    if mismatch:
+        raise StackEffectError(
+            error(f"declared {declared} but the body is {inferred}", node)
+        )
+
+
+def error(msg, node):
+    loc = node.location if node is not None else None
+    if loc is None:
+        return parser.error(msg)
+    return parser.error(msg, (loc.line_number, loc.start, loc.end))
+
+
+class Inference:
+    """
+    Runs a piece of code on an abstract stack.
+
+    Attributes:
+        defined: Stack effects of the words defined by the code so far,
+            which shadow the vocab.
+        known_depth: Whether the stack the code runs on is known, so that
+            taking more values than it holds is an error.
+    """
+
+    def __init__(self, code, vocab, defined, opt_level):
+        self.code = code
+        self.vocab = vocab
+        self.defined = defined
+        self.opt_level = opt_level
+        self.known_depth = False
+        self.stack = []
+        self.inputs = []
+        self.assumptions = {}
+        self.proven = []
+        self.ip = 0
+        self.node = None
+
+    def run(self):
+        code = self.code
+        while self.ip < len(code):
+            op, arg = superinstructions.original_instruction(code, self.ip)
+            self.node = code.nodes[self.ip]
+            self.ip += 1
+            if op == compiler.PUSH_CONST:
+                self.stack.append(value_of(arg))
+            elif op == compiler.MAKE_CLOSURE:
+                nested = arg.code
+                annotate(nested, self.vocab, None, self.opt_level, defined=self.defined)
+                self.stack.append(Value(QUOT, effect=nested.effect))
+            elif op == compiler.CALL_WORD:
+                self.call(arg)
+            else:
+                raise GiveUp
+
+    def effect(self) -> stack_effect.StackEffect:
+        names = {}
+        inputs = []
+        for i, value in enumerate(self.inputs):
+            names[id(value)] = f"x{i}"
+            inputs.append((f"x{i}", value.type))
+        outputs = []
+        for i, value in enumerate(self.stack):
+            outputs.append((names.get(id(value), f"y{i}"), value.type))
+        return stack_effect.StackEffect(tuple(inputs), tuple(outputs))
+
+    def prove(self, proof):
+        """
+        Attaches the proof to the calls found safe, and the entry checks
+        they rely on to the code.
+        """
+        if not self.proven:
+            self.code.checks = None
+            return
+        for site in self.proven:
+            site.proof = proof
+        typed = tuple(
+            (i - len(self.inputs), value.type)
+            for i, value in enumerate(self.inputs)
+            if value.type != ANY
+        )
+        self.code.checks = (len(self.inputs), typed) if self.inputs else None
+
+    def call(self, site):
+        name = site.word.name
+        if name in self.defined:
+            effect = self.defined[name]
+            if effect is None:
+                raise GiveUp
+            self.assumptions[name] = effect
+            self.apply(effect, site)
+            return
+
+        target = self.vocab.lookup(name)
+        if target is None:
+            raise GiveUp
+        rule = None if isinstance(target, types.Closure) else RULES.get(target)
+        if rule is not None:
+            self.assumptions[name] = target
+            rule(self, site)
+            return
+
+        effect = key_of(target, self.opt_level)
+        if effect is None:
+            raise GiveUp
+        self.assumptions[name] = effect
+        if self.apply(effect, site) and not isinstance(target, types.Closure):
+            self.proven.append(site)
+
+    def pop(self) -> Value:
+        if self.stack:
+            return self.stack.pop()
+        if self.known_depth:
+            raise StackEffectError(
+                error(
+                    f"'{self.node.name}' needs more values than the stack has",
+                    self.node,
+                )
+            )
+        value = Value(input=True)
+        self.inputs.insert(0, value)
+        return value
+
+    def expect(self, value, type_) -> bool:
+        """
+        Checks that `value` can be of type `type_`.
+
+        Returns:
+            Whether it is known to be.
+        """
+        if type_ == ANY or value.type == type_:
+            return True
+        if value.type == ANY:
+            if value.input:
+                value.type = type_
+                return True
+            return False
+        raise StackEffectError(
+            error(f"'{self.node.name}' expected {type_}, got {value.type}", self.node)
+        )
+
+    def apply(self, effect, site=None) -> bool:
+        """
+        Applies a stack effect to the abstract stack.
+
+        Returns:
+            Whether the types of all the inputs were known to match.
+        """
+        bound = {}
+        proven = True
+        for name, type_ in reversed(effect.inputs):
+            value = self.pop()
+            proven = self.expect(value, type_) and proven
+            bound.setdefault(name, value)
+        for name, type_ in effect.outputs:
+            value = bound.get(name)
+            if value is None or (type_ != ANY and value.type != type_):
+                value = Value(type_)
+            self.stack.append(value)
+        return proven
+
+    def quotation(self) -> stack_effect.StackEffect:
+        value = self.pop()
+        self.expect(value, QUOT)
+        if value.effect is None:
+            raise GiveUp
+        return value.effect
+
+
+def infer_apply(inference, site):
+    inference.apply(inference.quotation())
+
+
+def infer_dip(inference, site):
+    effect = inference.quotation()
+    top = inference.pop()
+    inference.apply(effect)
+    inference.stack.append(top)
+
+
+def infer_bi(inference, site):
+    second = inference.quotation()
+    first = inference.quotation()
+    x = inference.pop()
+    inference.stack.append(x)
+    inference.apply(first)
+    inference.stack.append(x)
+    inference.apply(second)
+
+
+def infer_if(inference, site):
+    false_branch = inference.quotation()
+    true_branch = inference.quotation()
+    inference.expect(inference.pop(), NUM)
+    inference.apply(join(true_branch, false_branch))
+
+
+def infer_when(inference, site):
+    effect = inference.quotation()
+    inference.expect(inference.pop(), NUM)
+    inference.apply(optional(effect))
+
+
+def infer_times(inference, site):
+    effect = inference.quotation()
+    inference.expect(inference.pop(), NUM)
+    # Whatever the count, the stack must keep its shape between iterations.
+    effect = optional(effect)
+    if [type_ for _, type_ in effect.inputs] != [type_ for _, type_ in effect.outputs]:
+        raise GiveUp
+    inference.apply(effect)
+
+
+def optional(effect) -> stack_effect.StackEffect:
+    """
+    Returns the stack effect of running `effect` or not.
+    """
+    # Not running it must leave the same stack as running it.
+    if len(effect.inputs) != len(effect.outputs):
+        raise GiveUp
+    return join(effect, stack_effect.StackEffect(effect.inputs, effect.inputs))
+
+
+def join(first, second) -> stack_effect.StackEffect:
+    """
+    Returns the stack effect of running either `first` or `second`.
+    """
+    if len(first.inputs) != len(second.inputs) or len(first.outputs) != len(
+        second.outputs
+    ):
+        raise GiveUp
+
+    def merge(a, b):
+        return a if a == b else ANY
+
+    inputs = tuple(
+        (a_name, merge(a_type, b_type))
+        for (a_name, a_type), (_, b_type) in zip(first.inputs, second.inputs)
+    )
+    first_names = [name for name, _ in first.inputs]
+    second_names = [name for name, _ in second.inputs]
+    outputs = []
+    for i, ((a_name, a_type), (b_name, b_type)) in enumerate(
+        zip(first.outputs, second.outputs)
+    ):
+        a_index = first_names.index(a_name) if a_name in first_names else -1
+        b_index = second_names.index(b_name) if b_name in second_names else -2
+        name = inputs[a_index][0] if a_index == b_index else f"y{i}"
+        outputs.append((name, merge(a_type, b_type)))
+    return stack_effect.StackEffect(inputs, tuple(outputs))
+
+
+def infer_define(inference, site):
+    """
+    Reads the definition following `:` like it does, and infers the stack
+    effect of the defined word for the rest of the code.
+    """
+    code = inference.code
+    nodes = code.nodes
+
+    def read_word():
+        if inference.ip < len(nodes):
+            inference.ip += 1
+            return nodes[inference.ip - 1]
+        return None
+
+    name = read_word()
+    if not isinstance(name, types.Word):
+        raise GiveUp
+
+    word = read_word()
+    declared = None
+    if isinstance(word, types.Word) and word.name == "(":
+        names = []
+        while (word := read_word()) is not None and not (
+            isinstance(word, types.Word) and word.name == ")"
+        ):
+            names.append(word.name if isinstance(word, types.Word) else str(word.value))
+        try:
+            declared = stack_effect.parse(names)
+        except ValueError as err:
+            raise StackEffectError(error(str(err), name))
+        word = read_word()
+
+    body = []
+    level = 0
+    while word is not None:
+        if isinstance(word, types.Word):
+            if word.name in stdlib.DEFINING_WORDS:
+                level += 1
+            elif word.name == ";":
+                if level == 0:
+                    break
+                level -= 1
+        body.append(word)
+        word = read_word()
+    if word is None:
+        raise GiveUp
+
+    # The word may call itself: only its declaration is known meanwhile.
+    inference.defined[name.name] = declared
+    body_code = compiler.compile_quotation(types.Quotation(body))
+    nested = Inference(body_code, inference.vocab, dict(inference.defined), 0)
+    try:
+        nested.run()
+        inferred = nested.effect()
+    except GiveUp:
+        inferred = None
+    if declared is not None:
+        check_declaration(declared, inferred, name)
+    inference.defined[name.name] = verified(declared, inferred) or inferred
+
+
+RULES = {
+    stdlib.apply: infer_apply,
+    stdlib.dip: infer_dip,
+    stdlib.bi: infer_bi,
+    stdlib.if_combinator: infer_if,
+    stdlib.when: infer_when,
+    stdlib.times: infer_times,
+    stdlib.define: infer_define,
+    stdlib.memo_define: infer_define,
+}
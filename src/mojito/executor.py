@@ -1,45 +1,417 @@
 from mojito import types
 from mojito import parser
+from mojito import codegen
+from mojito import compiler
+from mojito import effects
+from mojito import image
+from mojito import inliner
+from mojito import limits as limits_
+from mojito import optimizer
+from mojito import profiler
+from mojito import superinstructions
+
+
+class Frame:
+    """
+    Position of the executor inside a `compiler.Code`, run in `vocab`.
+
+    Builtins receive `Frame.read_word` to consume the words that follow them.
+    """
+
+    __slots__ = ("code", "ip", "vocab")
+
+    def __init__(self, code: compiler.Code, vocab: types.Vocab):
+        self.code = code
+        self.ip = 0
+        self.vocab = vocab
+
+    def read_word(self):
+        if self.ip < len(self.code.nodes):
+            word = self.code.nodes[self.ip]
+            self.ip += 1
+            return word
+        return None
+
+
+class StreamFrame(Frame):
+    """
+    The frame of a top-level term run by `Executor.run_stream`: once its own
+    code is exhausted, `read_word` continues with the rest of the stream.
+    """
+
+    __slots__ = ("term_code", "rest")
+
+    def __init__(self, code, vocab, rest):
+        super().__init__(code, vocab)
+        self.term_code = code
+        self.rest = rest
+
+    def read_word(self):
+        word = super().read_word()
+        if word is None and self.code is self.term_code:
+            return next(self.rest, None)
+        return word
+
+
+code_of = effects.code_of
+
+
+def _no_words():
+    return None
+
+
+def _called_word(code, ip):
+    """
+    Returns the word instruction `ip` of `code` calls, or None.
+    """
+    op, arg = superinstructions.original_instruction(code, ip)
+    if op == compiler.CALL_WORD:
+        return arg.word
+    return None
 
 
 class Executor:
-    def __init__(self, vocab: types.Vocab):
+    """
+    Runs mojito code on its own stack.
+
+    Args:
+        vocab: The vocabulary words are looked up in. If it is frozen, as
+            `stdlib.vocab` is, words are defined in an offspring of it
+            private to the executor.
+        opt_level: 0 runs code as compiled, 1 runs it through
+            `mojito.optimizer` first, 2 also inlines small words into their
+            call sites with `mojito.inliner`, 3 also translates words
+            into Python functions with `mojito.codegen`.
+        limits: What each run may use, see `mojito.limits`. None for no
+            limits.
+    """
+
+    def __init__(
+        self,
+        vocab: types.Vocab,
+        opt_level: int = 2,
+        limits: limits_.Limits | None = None,
+    ):
+        if vocab.frozen:
+            vocab = vocab.offspring()
         self.vocab = vocab
         self.stack = types.Stack()
+        self.opt_level = opt_level
+        self.limits = limits
+        self.budget = None
+        self.countdown = limits_.UNLIMITED
 
     def run(self, source):
-        ast = types.Quotation(parser.parse(source).items)
-        closure = types.Closure(ast, self.vocab)
+        code = compiler.compile_quotation(parser.parse(source))
+        optimizer.optimize(code, self.opt_level)
+        return self.run_code(code)
+
+    def profile(self) -> profiler.Profiler:
+        """
+        Returns a profiler to use as a context manager around runs:
+
+            with ex.profile() as prof:
+                ex.run(source)
+            print(prof.table())
+
+        Call sites are shared by every executor, so words resolved by other
+        executors while the profiler is active are recorded too.
+        """
+        return profiler.Profiler()
+
+    def snapshot(self) -> image.Snapshot:
+        """
+        Captures the words defined so far and the stack, see `mojito.image`.
+        """
+        return image.snapshot(self.vocab, self.stack)
+
+    def restore(self, snapshot: image.Snapshot):
+        """
+        Replaces the words defined and the stack with those of a snapshot.
+        """
+        self.vocab = snapshot.vocab.offspring()
+        self.stack.data[:] = snapshot.stack
+
+    def run_code(self, code: compiler.Code):
+        """
+        Executes a program compiled ahead of time, e.g. loaded by `mojito.cache`.
+
+        Raises:
+            effects.StackEffectError: If the program is found not to run
+                before it starts.
+            limits.LimitExceeded: If the program goes past `self.limits`.
+        """
+        effects.check_program(code, self.vocab, self.stack, self.opt_level)
+        self.start_budget()
+        closure = types.Closure(types.Quotation(code.nodes), self.vocab, code)
         return self.execute(closure)
 
+    def run_stream(self, source):
+        """
+        Executes top-level terms one by one as the parser completes them, so
+        that a large script starts running before it has been read in full.
+
+        Args:
+            source: Anything `parser.parse_stream` accepts, e.g. a file object.
+        """
+        terms = parser.parse_stream(source)
+        self.start_budget()
+        for term in terms:
+            code = compiler.compile_quotation([term])
+            optimizer.optimize(code, self.opt_level)
+            effects.check_program(code, self.vocab, self.stack, self.opt_level)
+            self._run(StreamFrame(code, self.vocab, terms))
+
+    def start_budget(self):
+        """
+        Starts counting what a run uses against `self.limits`.
+        """
+        if self.limits is None:
+            self.budget = None
+            self.countdown = limits_.UNLIMITED
+        else:
+            self.budget = limits_.Budget(self.limits)
+            self.countdown = self.budget.granted
+        self.stack.budget = self.budget
+
     def execute(self, closure):
-        def reader(ws):
-            i = 0
-
-            def aux():
-                nonlocal i
-                if i < len(ws):
-                    r = ws[i]
-                    i += 1
-                    return r
-                return None
-
-            return aux
-
-        read_word = reader(closure.body.items)
-        while word := read_word():
-            match word:
-                case types.Number() | types.String():
-                    self.stack.push(word)
-                case types.Quotation():
-                    closure = types.Closure(word, closure.vocab)
-                    self.stack.push(closure)
-                case types.Word(name=name):
-                    func = closure.vocab.lookup(name)
-                    if not func:
-                        raise RuntimeError(f"I don't know the word: {name}")
-
-                    if isinstance(func, types.Closure):
-                        self.execute(func)
+        code = code_of(closure, self.opt_level)
+        if code.checks is not None:
+            effects.check_entry(code.checks, self.stack)
+        return self._run(Frame(code, closure.vocab))
+
+    # Whether `_run` may suspend on an async word, see `AsyncExecutor`.
+    suspendable = False
+
+    def _run(self, frame, frames=None):
+        # Closure calls never recurse in Python: the caller's frame is saved
+        # on `frames`, the explicit return stack, unless the call is the last
+        # instruction of the caller, in which case the frame is reused.
+        # Builtins take part by returning the closure they want to call.
+        #
+        # Async builtins return an awaitable instead: the run is suspended
+        # by returning it along with the return stack, and resumed by
+        # calling `_run` again with the topmost frame and the rest of them.
+        #
+        # Limits are enforced at calls only: each one spends the length of
+        # the code called from `countdown`, and `Budget.check` is consulted
+        # once it runs out.
+        PUSH_CONST = compiler.PUSH_CONST
+        CALL_WORD = compiler.CALL_WORD
+        CALL_CLOSURE = compiler.CALL_CLOSURE
+        MAKE_CLOSURE = compiler.MAKE_CLOSURE
+        RETURN = compiler.RETURN
+        PUSH_FOLDED = compiler.PUSH_FOLDED
+        CALL_FOLDED = compiler.CALL_FOLDED
+        CALL_INLINED = compiler.CALL_INLINED
+        FUSED = compiler.FUSED
+        ITERATE = compiler.ITERATE
+        CHECK_ENTRY = inliner.CHECK_ENTRY
+        inline = inliner.inline if self.opt_level >= 2 else None
+        native = codegen.native if self.opt_level >= 3 else None
+        check_entry = effects.check_entry
+        guards_hold = optimizer.guards_hold
+        opt_level = self.opt_level
+
+        countdown = self.countdown
+        if frames is None:
+            frames = []
+            countdown -= len(frame.code.ops)
+        suspendable = self.suspendable
+        read_word = frame.read_word
+        ops = frame.code.ops
+        args = frame.code.args
+        vocab = frame.vocab
+        Vocab = types.Vocab
+        stack = self.stack
+        push = stack.data.append
+        execute = self.execute
+        Closure = types.Closure
+        no_words = _no_words
+
+        ip = frame.ip
+        while True:
+            op = ops[ip]
+            if op == CALL_WORD:
+                site = args[ip]
+                ip += 1
+                if site.version == Vocab.version and site.vocab is vocab:
+                    func = site.target
+                else:
+                    func = site.resolve(vocab)
+                    if native is not None and isinstance(func, Closure):
+                        translated = native(func, opt_level)
+                        if translated is not None:
+                            site.target = func = translated
+                    if inline is not None and isinstance(func, Closure):
+                        inlined = inline(site, vocab, func, opt_level)
+                        if inlined is not None:
+                            ip -= 1
+                            ops[ip] = CALL_INLINED
+                            args[ip] = inlined
+                            continue
+
+                if not isinstance(func, Closure):
+                    frame.ip = ip
+                    func = func(site.word, stack, vocab, read_word, execute)
+                    ip = frame.ip
+                    if not isinstance(func, Closure):
+                        if func is not None:
+                            if not suspendable:
+                                func.close()
+                                raise RuntimeError(
+                                    f"{site.word.location}: '{site.word.name}' "
+                                    "is async, it needs an AsyncExecutor"
+                                )
+                            frame.ip = ip
+                            frames.append(frame)
+                            self.countdown = countdown
+                            return func, frames
+                        continue
+            elif op == FUSED:
+                fused = args[ip]
+                if (
+                    fused.version != Vocab.version or fused.vocab is not vocab
+                ) and not fused.resolve(vocab):
+                    ops[ip], args[ip] = fused.original
+                    continue
+                start = ip
+                ip += fused.length
+                for i, (target, word) in enumerate(fused.steps):
+                    if word is None:
+                        push(target)
+                        continue
+                    func = target(word, stack, vocab, read_word, execute)
+                    if func is not None and isinstance(func, Closure):
+                        # Call it, then carry on with the next instruction.
+                        ip = start + i + 1
+                        break
+                else:
+                    continue
+            elif op == PUSH_CONST:
+                push(args[ip])
+                ip += 1
+                continue
+            elif op == MAKE_CLOSURE:
+                literal = args[ip]
+                if literal.vocab is vocab:
+                    push(literal.closure)
+                else:
+                    push(literal.closure_in(vocab))
+                ip += 1
+                continue
+            elif op == CALL_CLOSURE:
+                func = args[ip]
+                ip += 1
+            elif op == PUSH_FOLDED:
+                values, next_ip, guards, original = args[ip]
+                if not guards_hold(guards, vocab):
+                    # A word the fold relied on was redefined: undo it.
+                    ops[ip], args[ip] = original
+                    continue
+                stack.data.extend(values)
+                ip = next_ip
+                continue
+            elif op == CALL_FOLDED:
+                values, literal, next_ip, guards, original = args[ip]
+                if not guards_hold(guards, vocab):
+                    ops[ip], args[ip] = original
+                    continue
+                stack.data.extend(values)
+                func = literal.closure_in(vocab)
+                ip = next_ip
+            elif op == CALL_INLINED:
+                inlined = args[ip]
+                if (
+                    inlined.version != Vocab.version or inlined.vocab is not vocab
+                ) and not inlined.revalidate(vocab):
+                    # The word or one it calls was redefined: resolve it again,
+                    # which inlines the new definition if it qualifies.
+                    inlined.site.version = -1
+                    ops[ip] = CALL_WORD
+                    args[ip] = inlined.site
+                    continue
+                ip += 1
+                func = None
+                for step in inlined.steps:
+                    kind = step[0]
+                    if kind == PUSH_CONST:
+                        push(step[1])
+                        continue
+                    if kind == CALL_WORD:
+                        _, builtin, word, step_vocab, resume = step
+                        func = builtin(word, stack, step_vocab, no_words, execute)
+                        if not isinstance(func, Closure):
+                            continue
+                    elif kind == MAKE_CLOSURE:
+                        push(step[1])
+                        continue
+                    elif kind == CHECK_ENTRY:
+                        check_entry(step[1], stack, step[2])
+                        continue
                     else:
-                        func(word, self.stack, closure.vocab, read_word, self.execute)
+                        _, func, resume = step
+
+                    if resume is not None:
+                        # A closure called before the end of the inlined
+                        # words: give the rest of them real frames.
+                        frame.ip = ip
+                        frames.append(frame)
+                        for code, resume_ip, resume_vocab in resume:
+                            frame = Frame(code, resume_vocab)
+                            frame.ip = resume_ip
+                            frames.append(frame)
+                        frames.pop()
+                        read_word = frame.read_word
+                        ops = frame.code.ops
+                        args = frame.code.args
+                        vocab = frame.vocab
+                        ip = frame.ip
+                    break
+                if func is None:
+                    continue
+            elif op == ITERATE:
+                # Call the next closure, then come back here for the one after.
+                func = next(args[ip], None)
+                if func is None:
+                    ip += 1
+                    continue
+            else:
+                if not frames:
+                    if self.budget is not None:
+                        countdown = self.budget.check(countdown, stack, frames)
+                    self.countdown = countdown
+                    return
+                frame = frames.pop()
+                read_word = frame.read_word
+                ops = frame.code.ops
+                args = frame.code.args
+                vocab = frame.vocab
+                ip = frame.ip
+                continue
+
+            # Call `func`, a closure.
+            code = func.code
+            if code is None:
+                code = code_of(func, opt_level)
+            if code.checks is not None:
+                try:
+                    check_entry(code.checks, stack)
+                except RuntimeError:
+                    # Check again, naming the word called in the error.
+                    check_entry(code.checks, stack, _called_word(frame.code, ip - 1))
+            if ops[ip] == RETURN:
+                frame.code = code
+                frame.vocab = func.vocab
+            else:
+                frame.ip = ip
+                frames.append(frame)
+                frame = Frame(code, func.vocab)
+                read_word = frame.read_word
+            ops = code.ops
+            args = code.args
+            vocab = func.vocab
+            ip = 0
+            countdown -= len(ops)
+            if countdown <= 0:
+                countdown = self.budget.check(countdown, stack, frames)
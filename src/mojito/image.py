@@ -0,0 +1,97 @@
+"""
+Snapshots of an executor's state, and images storing them on disk.
+
+A snapshot holds the words an executor has defined, along with the vocabs
+they were defined in, and the contents of its stack. Restoring it gives
+an executor the same state without running the source again:
+
+    ex = Executor(stdlib.vocab)
+    ex.run(prelude)
+    image.save(ex.snapshot(), "prelude.image")
+
+    worker = Executor(stdlib.vocab)
+    worker.restore(image.load("prelude.image"))
+
+The vocab of a snapshot is frozen, and every executor restored from it
+defines its words in an offspring of it, so one snapshot can be shared by
+any number of executors, including those of forked processes.
+
+Module vocabs such as `stdlib.vocab` are not part of a snapshot: it refers
+to them by module name, see `types.Vocab`. Every other word must be
+picklable, e.g. builtins defined at the top level of a module.
+"""
+
+import dataclasses
+import gc
+import os
+import pathlib
+import pickle
+
+import mojito
+from mojito import types
+
+
+# Bump whenever the layout of `Snapshot` or of the vocabs changes.
+FORMAT_VERSION = 1
+
+TAG = f"mojito-image-{mojito.__version__}-{FORMAT_VERSION}"
+
+
+@dataclasses.dataclass(frozen=True)
+class Snapshot:
+    """
+    Attributes:
+        vocab: A frozen copy of the executor's vocab, and of its parents up
+            to the module vocabs.
+        stack: The values on the stack, bottom first.
+    """
+
+    vocab: types.Vocab
+    stack: tuple
+
+
+def snapshot(vocab: types.Vocab, stack: types.Stack) -> Snapshot:
+    # A round trip through pickle copies the vocabs, with the closures in
+    # them referring to the copies, so that later definitions in `vocab`
+    # cannot change the meaning of the snapshot.
+    data = pickle.dumps((vocab, stack.data), protocol=pickle.HIGHEST_PROTOCOL)
+    vocab, values = pickle.loads(data)
+    vocab.freeze()
+    return Snapshot(vocab, tuple(values))
+
+
+def save(snapshot: Snapshot, path):
+    """
+    Writes `snapshot` to an image file, replacing it atomically.
+    """
+    path = pathlib.Path(path)
+    tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+    try:
+        with tmp_path.open("wb") as file:
+            pickle.dump((TAG, snapshot), file, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, path)
+    finally:
+        tmp_path.unlink(missing_ok=True)
+
+
+def load(path) -> Snapshot:
+    """
+    Reads a snapshot from an image file.
+
+    Raises:
+        ValueError: If the image was written by another version of mojito.
+    """
+    # Like `cache.load`, spare the garbage collector the many small
+    # containers unpickling allocates.
+    gc_was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        with pathlib.Path(path).open("rb") as file:
+            tag, snapshot = pickle.load(file)
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+
+    if tag != TAG:
+        raise ValueError(f"{path}: image written by {tag}, expected {TAG}")
+    return snapshot
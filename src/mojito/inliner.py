@@ -0,0 +1,207 @@
+"""
+Inlining of small user-defined words into their call sites.
+
+When a call site resolves to a small, non-recursive closure, the executor
+replaces its `CALL_WORD` with a `CALL_INLINED` instruction, which runs the
+body of the word, and of the small words it calls in turn, as a flat list of
+steps without pushing frames or looking anything up.
+
+Every word the steps were resolved from is guarded: once any word is defined
+again, the guards are checked on the next run and, if one of them no longer
+resolves to the same thing, the call site goes back to `CALL_WORD`, which
+may then inline the new definition.
+"""
+
+from mojito import compiler
+from mojito import effects
+from mojito import optimizer
+from mojito import stdlib
+from mojito import types
+
+
+# Words bigger than this many instructions are called, not inlined.
+INLINE_LIMIT = 8
+
+# Maximum number of steps of an inlined call, nested words included.
+MAX_STEPS = 32
+
+# Kind of the step checking the inputs of a word, see `effects.check_entry`.
+CHECK_ENTRY = "check"
+
+
+class NotInlinable(Exception):
+    pass
+
+
+class Inlined:
+    """
+    The operand of a `CALL_INLINED` instruction.
+
+    Attributes:
+        site: The call site it replaces.
+        target: The closure the site resolved to.
+        steps: Tuples run in order by the executor:
+            `(PUSH_CONST, value)`,
+            `(MAKE_CLOSURE, closure)`,
+            `(CALL_WORD, builtin, word, vocab, resume)`,
+            `(CALL_CLOSURE, closure, resume)` or
+            `(CHECK_ENTRY, checks, word)`, with the entry checks of the code
+            of `word` as they were when inlined.
+            `resume` lists the `(code, ip, vocab)` positions to continue
+            from if the step calls a closure, outermost word first. It is
+            None for the last step, whose call is a tail call.
+        guards: `(call site, vocab, target)` triples the steps rely on.
+        proofs: `(code, proof)` pairs of the inlined words, whose checks
+            and types the steps rely on.
+        vocab, version: The caller vocab and `types.Vocab.version` the
+            guards were last checked against.
+    """
+
+    __slots__ = ("site", "target", "steps", "guards", "proofs", "vocab", "version")
+
+    def __init__(self, site, target, steps, guards, proofs, vocab):
+        self.site = site
+        self.target = target
+        self.steps = steps
+        self.guards = guards
+        self.proofs = proofs
+        self.vocab = vocab
+        self.version = types.Vocab.version
+
+    def revalidate(self, vocab: types.Vocab) -> bool:
+        try:
+            if self.site.resolve(vocab) is not self.target:
+                return False
+            for site, site_vocab, target in self.guards:
+                if site.resolve(site_vocab) is not target:
+                    return False
+        except RuntimeError:
+            return False
+        for code, proof in self.proofs:
+            # Inferred again since: its entry checks may have changed.
+            if code.proof is not proof:
+                return False
+        self.vocab = vocab
+        self.version = types.Vocab.version
+        return True
+
+
+def inline(site, vocab, closure, opt_level=2):
+    """
+    Returns an `Inlined` calling `closure`, which `site` resolved to in
+    `vocab`, or None if the closure is too big or recursive.
+    """
+    code = effects.code_of(closure, opt_level)
+    if len(code) > INLINE_LIMIT or is_recursive(closure):
+        return None
+
+    steps = []
+    guards = []
+    proofs = []
+    try:
+        expand(closure, site.word, (), steps, guards, proofs, {id(closure)}, opt_level)
+    except (NotInlinable, RuntimeError):
+        return None
+    if not steps or len(steps) > MAX_STEPS:
+        return None
+
+    last = steps[-1]
+    if last[0] == compiler.CALL_WORD:
+        steps[-1] = last[:4] + (None,)
+    elif last[0] == compiler.CALL_CLOSURE:
+        steps[-1] = (last[0], last[1], None)
+    return Inlined(site, closure, tuple(steps), tuple(guards), tuple(proofs), vocab)
+
+
+def expand(closure, word, outer, steps, guards, proofs, expanding, opt_level):
+    """
+    Appends the steps running `closure`, called by `word`, to `steps`.
+
+    Args:
+        outer: The resume positions of the words `closure` is inlined into.
+        expanding: Ids of the closures being expanded, to stop at recursion.
+    """
+    code = closure.code
+    vocab = closure.vocab
+    ops, args = code.ops, code.args
+    proofs.append((code, code.proof))
+    if code.checks is not None:
+        steps.append((CHECK_ENTRY, code.checks, word))
+
+    ip = 0
+    while ops[ip] != compiler.RETURN:
+        op, arg = ops[ip], args[ip]
+        if op == compiler.PUSH_CONST:
+            steps.append((op, arg))
+            ip += 1
+            continue
+        if op == compiler.MAKE_CLOSURE:
+            steps.append((op, arg.closure_in(vocab)))
+            ip += 1
+            continue
+        if op == compiler.PUSH_FOLDED:
+            values, next_ip, folded_guards, original = arg
+            if not optimizer.guards_hold(folded_guards, vocab):
+                ops[ip], args[ip] = original
+                continue
+            steps.extend((compiler.PUSH_CONST, value) for value in values)
+            guards.extend((s, vocab, target) for s, target in folded_guards)
+            ip = next_ip
+            continue
+        if op == compiler.FUSED:
+            op, arg = arg.original
+            if op == compiler.PUSH_CONST:
+                steps.append((op, arg))
+                ip += 1
+                continue
+        elif op == compiler.CALL_INLINED:
+            arg = arg.site
+        elif op != compiler.CALL_WORD:
+            raise NotInlinable
+
+        ip += 1
+        target = arg.resolve(vocab)
+        guards.append((arg, vocab, target))
+        resume = outer + ((code, ip, vocab),)
+        if not isinstance(target, types.Closure):
+            if stdlib.needs_frame(target):
+                raise NotInlinable
+            steps.append((compiler.CALL_WORD, target, arg.word, vocab, resume))
+        elif (
+            id(target) in expanding
+            or len(effects.code_of(target, opt_level)) > INLINE_LIMIT
+        ):
+            steps.append((compiler.CALL_CLOSURE, target, resume))
+        else:
+            expanding.add(id(target))
+            expand(
+                target, arg.word, resume, steps, guards, proofs, expanding, opt_level
+            )
+            expanding.discard(id(target))
+
+        if len(steps) > MAX_STEPS:
+            raise NotInlinable
+
+
+def is_recursive(closure: types.Closure) -> bool:
+    """
+    Tells whether the body of `closure`, quotations included, calls a word
+    resolving to `closure` itself.
+    """
+    pending = [closure.code]
+    while pending:
+        code = pending.pop()
+        for op, arg in zip(code.ops, code.args):
+            if op in (compiler.PUSH_FOLDED, compiler.CALL_FOLDED):
+                op, arg = arg[-1]
+            elif op == compiler.FUSED:
+                op, arg = arg.original
+            elif op == compiler.CALL_INLINED:
+                op, arg = compiler.CALL_WORD, arg.site
+
+            if op == compiler.MAKE_CLOSURE:
+                pending.append(arg.code)
+            elif op == compiler.CALL_WORD:
+                if closure.vocab.lookup(arg.word.name) is closure:
+                    return True
+    return False
@@ -0,0 +1,178 @@
+"""
+Execution limits for running untrusted programs.
+
+An executor given `Limits` stops a run that goes past any of them by raising
+the matching subclass of `LimitExceeded`:
+
+    ex = Executor(stdlib.vocab, limits=Limits(instructions=10**6, timeout=1.0))
+    try:
+        ex.run(source)
+    except LimitExceeded as err:
+        print(err)
+
+Limits apply to each run separately. They are not checked per word: every
+word body or quotation the executor enters spends its length from a
+countdown, and only when the countdown runs out does `Budget.check` look at
+the clock and the stacks. Every loop and every recursion goes through such
+calls, so a run can overshoot a limit by at most `CHECK_INTERVAL`
+instructions' worth of work before it is stopped.
+
+A single builtin can still create many values at once, e.g. `range`: such
+builtins call `Budget.reserve` before they allocate anything. `pmap` and
+`peach` run their workers under a `Budget.share` of what is left.
+"""
+
+import array
+import dataclasses
+import sys
+import time
+
+from mojito import types
+
+
+# Number of instructions run between two checks of the limits.
+CHECK_INTERVAL = 1000
+
+# The countdown of executors without limits, never run out.
+UNLIMITED = sys.maxsize
+
+
+class LimitExceeded(RuntimeError):
+    """
+    Raised when a run goes past one of its `Limits`.
+    """
+
+
+class InstructionLimitExceeded(LimitExceeded):
+    pass
+
+
+class StackDepthExceeded(LimitExceeded):
+    pass
+
+
+class CallDepthExceeded(LimitExceeded):
+    pass
+
+
+class DeadlineExceeded(LimitExceeded):
+    pass
+
+
+class ValueLimitExceeded(LimitExceeded):
+    pass
+
+
+@dataclasses.dataclass(frozen=True)
+class Limits:
+    """
+    What a single run may use. None means no limit.
+
+    Attributes:
+        instructions: Number of instructions run.
+        stack_depth: Number of values on the stack.
+        call_depth: Number of calls in progress, i.e. the size of the return
+            stack. Calls in tail position do not count.
+        timeout: Seconds of wall-clock time.
+        values: Number of values held by the stack, counting every element of
+            a sequence and every term of a quotation.
+    """
+
+    instructions: int | None = None
+    stack_depth: int | None = None
+    call_depth: int | None = None
+    timeout: float | None = None
+    values: int | None = None
+
+
+def values_held(stack: types.Stack) -> int:
+    count = 0
+    for value in stack.data:
+        if isinstance(value, array.array):
+            count += len(value)
+        elif isinstance(value, types.Closure):
+            count += len(value.body)
+        else:
+            count += 1
+    return count
+
+
+class Budget:
+    """
+    The limits of a run in progress, and what it has used so far.
+    """
+
+    __slots__ = ("limits", "executed", "deadline", "granted")
+
+    def __init__(self, limits: Limits):
+        self.limits = limits
+        self.executed = 0
+        self.deadline = None
+        if limits.timeout is not None:
+            self.deadline = time.monotonic() + limits.timeout
+        self.granted = self._interval()
+
+    def _interval(self) -> int:
+        if self.limits.instructions is None:
+            return CHECK_INTERVAL
+        return min(CHECK_INTERVAL, self.limits.instructions - self.executed)
+
+    def check(self, countdown: int, stack: types.Stack, frames: list) -> int:
+        """
+        Called by the executor when its countdown has run out.
+
+        Args:
+            countdown: What is left of the countdown, at most 0.
+            frames: The return stack.
+
+        Returns:
+            The countdown to the next check.
+
+        Raises:
+            LimitExceeded: If a limit has been exceeded.
+        """
+        limits = self.limits
+        self.executed += self.granted - countdown
+        if limits.instructions is not None and self.executed > limits.instructions:
+            raise InstructionLimitExceeded(
+                f"ran more than {limits.instructions} instructions"
+            )
+        if limits.stack_depth is not None and len(stack.data) > limits.stack_depth:
+            raise StackDepthExceeded(
+                f"more than {limits.stack_depth} values on the stack"
+            )
+        if limits.call_depth is not None and len(frames) > limits.call_depth:
+            raise CallDepthExceeded(f"more than {limits.call_depth} nested calls")
+        if self.deadline is not None and time.monotonic() > self.deadline:
+            raise DeadlineExceeded(f"ran for more than {limits.timeout} seconds")
+        if limits.values is not None and values_held(stack) > limits.values:
+            raise ValueLimitExceeded(f"held more than {limits.values} values")
+        self.granted = max(self._interval(), 1)
+        return self.granted
+
+    def reserve(self, count: int, stack: types.Stack):
+        """
+        Called by builtins about to create `count` values.
+
+        Raises:
+            ValueLimitExceeded: If the stack could not hold them along with
+                its values.
+        """
+        limit = self.limits.values
+        if limit is not None and count + values_held(stack) > limit:
+            raise ValueLimitExceeded(f"held more than {limit} values")
+
+    def share(self, parts: int) -> Limits:
+        """
+        Returns the limits of `parts` runs splitting what is left of this
+        one, e.g. the workers of `pmap`. They share its deadline and split
+        its remaining instructions evenly.
+        """
+        limits = self.limits
+        changes = {}
+        if limits.instructions is not None:
+            left = max(limits.instructions - self.executed, 0)
+            changes["instructions"] = left // parts
+        if self.deadline is not None:
+            changes["timeout"] = self.deadline - time.monotonic()
+        return dataclasses.replace(limits, **changes)
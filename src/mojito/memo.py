@@ -0,0 +1,133 @@
+"""
+Memoized words and quotations, made by `MEMO:` and `memoize`.
+
+    MEMO: fib ( n -- f ) dup 2 < [] [dup 1 - fib swap 2 - fib +] if ;
+
+A memoized word looks the values it takes up in a bounded LRU cache. On a
+hit, it replaces them with the values it left the last time, without
+running its body; on a miss, it runs its body and records what it leaves.
+How many values it takes and leaves comes from its stack effect, so its
+body must not touch the stack beyond it, and must have no other effect.
+
+Values that cannot be hashed, such as quotations and sequences, are never
+looked up: a word taking one always runs its body. Values of different
+types never match, so `1` and `1.0` are cached apart.
+
+Every memoized word has a cache of its own, with statistics:
+
+    vocab.lookup("fib").cache.info()
+"""
+
+import collections
+
+from mojito import compiler
+from mojito import types
+from mojito.types import stack_effect
+
+
+# Default number of entries kept by a cache.
+MAXSIZE = 4096
+
+CacheInfo = collections.namedtuple("CacheInfo", "hits misses maxsize size")
+
+
+class LRUCache:
+    """
+    Keeps the `maxsize` most recently used entries.
+    """
+
+    __slots__ = ("entries", "maxsize", "hits", "misses")
+
+    def __init__(self, maxsize: int = MAXSIZE):
+        self.entries = collections.OrderedDict()
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        """
+        Returns the value of `key`, or None on a miss.
+
+        Raises:
+            TypeError: If `key` cannot be hashed.
+        """
+        entries = self.entries
+        try:
+            value = entries[key]
+        except KeyError:
+            self.misses += 1
+            return None
+        entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def put(self, key, value):
+        entries = self.entries
+        entries[key] = value
+        if len(entries) > self.maxsize:
+            entries.popitem(last=False)
+
+    def info(self) -> CacheInfo:
+        return CacheInfo(self.hits, self.misses, self.maxsize, len(self.entries))
+
+    def clear(self):
+        self.entries.clear()
+        self.hits = 0
+        self.misses = 0
+
+
+class Memoized:
+    """
+    A builtin standing for `closure`, caching its results.
+
+    Attributes:
+        closure: What runs on a miss.
+        effect: The stack effect of `closure`, which tells how many values
+            make up the key and the result.
+        cache: The `LRUCache` of results, keyed by the input values and
+            their types.
+    """
+
+    __slots__ = ("closure", "effect", "cache")
+
+    def __init__(
+        self,
+        closure: types.Closure,
+        effect: stack_effect.StackEffect,
+        maxsize: int = MAXSIZE,
+    ):
+        self.closure = closure
+        self.effect = effect
+        self.cache = LRUCache(maxsize)
+
+    def __call__(self, word, state, vocab, read_word, execute):
+        data = state.data
+        start = len(data) - len(self.effect.inputs)
+        if start < 0:
+            loc = word.location
+            raise RuntimeError(
+                f"{loc}: '{word.name}' expected {len(self.effect.inputs)} "
+                "values on the stack"
+            )
+        values = data[start:]
+        key = (*values, *map(type, values))
+        try:
+            result = self.cache.get(key)
+        except TypeError:
+            return self.closure
+        if result is not None:
+            del data[start:]
+            data.extend(result)
+            return None
+        return compiler.continuation((compiler.ITERATE, self.record(word, key, data)))
+
+    def record(self, word, key, data):
+        # Runs the closure, then stores what it left.
+        depth = len(data) - len(self.effect.inputs)
+        yield self.closure
+        if len(data) != depth + len(self.effect.outputs):
+            loc = word.location
+            raise RuntimeError(
+                f"{loc}: '{word.name}' did not leave the stack as {self.effect} says"
+            )
+        self.cache.put(key, tuple(data[depth:]))
@@ -0,0 +1,199 @@
+"""
+Peephole optimizer over compiled quotations.
+
+An optimized instruction replaces the first instruction of a span of the
+code and jumps over the rest, which is left untouched: instruction `i` still
+comes from `nodes[i]`, so parsing words and jumps into the middle of a span
+keep working. Every optimized instruction carries guards: the call sites of
+the builtins it assumed, with the builtin each one must still resolve to.
+If a guard fails, e.g. because `+` was redefined, the executor puts the
+original instruction back and runs it instead.
+"""
+
+from mojito import compiler
+from mojito import stdlib
+from mojito import superinstructions
+from mojito import types
+from mojito.types import runtime
+
+
+# Words folded when applied to constants: they only move or compute values.
+PURE = {
+    "+": stdlib.add,
+    "-": stdlib.sub,
+    "*": stdlib.mul,
+    "/": stdlib.div,
+    "mod": stdlib.mod,
+    "<": stdlib.lt,
+    ">": stdlib.gt,
+    "dup": stdlib.dup,
+    "drop": stdlib.drop,
+    "swap": stdlib.swap,
+}
+
+# Pairs of words that leave any stack as it was.
+NO_OPS = {
+    ("dup", "drop"): (stdlib.dup, stdlib.drop),
+    ("swap", "swap"): (stdlib.swap, stdlib.swap),
+}
+
+
+def code_of(closure: types.Closure, opt_level: int = 1) -> compiler.Code:
+    """
+    Returns the code of a closure, compiling and optimizing it on first use.
+    """
+    code = closure.code
+    if code is None:
+        code = compiler.compile_quotation(closure.body)
+        optimize(code, opt_level)
+        closure.code = code
+    return code
+
+
+def guards_hold(guards, vocab) -> bool:
+    """
+    Checks that every guarded call site still resolves to what the
+    optimizer assumed.
+    """
+    version = types.Vocab.version
+    for site, expected in guards:
+        if site.version == version and site.vocab is vocab:
+            target = site.target
+        else:
+            target = site.resolve(vocab)
+        if target is not expected and target is not getattr(
+            expected, "unchecked", None
+        ):
+            return False
+    return True
+
+
+def optimize(code: compiler.Code, opt_level: int = 1):
+    """
+    Optimizes the code, and the code of the quotations it contains, in place.
+
+    Level 1 folds pure builtins applied to constants, removes no-op stack
+    shuffles, resolves `if` and `when` on constant conditions and fuses
+    common sequences into superinstructions.
+    """
+    if opt_level < 1:
+        return
+
+    for op, arg in zip(code.ops, code.args):
+        if op == compiler.MAKE_CLOSURE:
+            optimize(arg.code, opt_level)
+
+    i = 0
+    while i < len(code):
+        end = fold(code, i)
+        i = max(end, i + 1)
+
+    superinstructions.fuse(code)
+
+
+def fold(code: compiler.Code, start: int) -> int:
+    """
+    Folds the longest foldable span starting at `start`.
+
+    Returns:
+        The index right after the folded span.
+    """
+    ops, args = code.ops, code.args
+    values = []
+    guards = []
+
+    i = start
+    while True:
+        if ops[i] == compiler.PUSH_CONST:
+            values.append(args[i])
+            i += 1
+        elif ops[i] == compiler.CALL_WORD and (no_op := match_no_op(code, i)):
+            guards.extend(no_op)
+            i += len(no_op)
+        elif ops[i] == compiler.CALL_WORD and (folded := apply_pure(args[i], values)):
+            values = folded
+            guards.append((args[i], PURE[args[i].word.name]))
+            i += 1
+        else:
+            break
+
+    branch = match_conditional(code, i, values)
+    if branch is not None:
+        quotation, end, site, combinator = branch
+        guards.append((site, combinator))
+        original = (ops[start], args[start])
+        if quotation is None:
+            ops[start] = compiler.PUSH_FOLDED
+            args[start] = (tuple(values[:-1]), end, tuple(guards), original)
+        else:
+            ops[start] = compiler.CALL_FOLDED
+            args[start] = (tuple(values[:-1]), quotation, end, tuple(guards), original)
+        return end
+
+    if i - start >= 2:
+        original = (ops[start], args[start])
+        ops[start] = compiler.PUSH_FOLDED
+        args[start] = (tuple(values), i, tuple(guards), original)
+    return i
+
+
+def match_no_op(code: compiler.Code, i: int):
+    if i + 1 >= len(code) or code.ops[i + 1] != compiler.CALL_WORD:
+        return None
+    first, second = code.args[i], code.args[i + 1]
+    expected = NO_OPS.get((first.word.name, second.word.name))
+    if expected is None:
+        return None
+    return [(first, expected[0]), (second, expected[1])]
+
+
+def apply_pure(site: compiler.CallSite, values: list):
+    """
+    Runs a pure builtin on a scratch stack holding `values`.
+
+    Returns:
+        The new values, or None if the word is not pure or fails, e.g. for
+        lack of values or on a division by zero.
+    """
+    func = PURE.get(site.word.name)
+    if func is None:
+        return None
+
+    scratch = types.Stack()
+    scratch.data.extend(values)
+    try:
+        func(site.word, scratch, None, None, None)
+    except Exception:
+        return None
+    return scratch.data
+
+
+def match_conditional(code: compiler.Code, i: int, values: list):
+    """
+    Matches `[t] [f] if` or `[t] when` right after a constant condition.
+
+    Returns:
+        `(quotation to call or None, end, call site, combinator)` or None.
+    """
+    if not values or not isinstance(values[-1], runtime.NUMBER_TYPES):
+        return None
+
+    ops, args = code.ops, code.args
+    cond = values[-1]
+    if (
+        i + 2 < len(code)
+        and ops[i] == ops[i + 1] == compiler.MAKE_CLOSURE
+        and ops[i + 2] == compiler.CALL_WORD
+        and args[i + 2].word.name == "if"
+    ):
+        quotation = args[i] if cond else args[i + 1]
+        return quotation, i + 3, args[i + 2], stdlib.if_combinator
+    if (
+        i + 1 < len(code)
+        and ops[i] == compiler.MAKE_CLOSURE
+        and ops[i + 1] == compiler.CALL_WORD
+        and args[i + 1].word.name == "when"
+    ):
+        quotation = args[i] if cond else None
+        return quotation, i + 2, args[i + 1], stdlib.when
+    return None
@@ -0,0 +1,104 @@
+"""
+Worker processes for the `pmap` and `peach` combinators.
+
+The quotation is pickled along with the words it can see (see
+`types.Vocab`) and sent with a chunk of the elements to each worker, which
+runs it on an executor of its own. Results come back in order.
+
+The pool is started on first use and shared by every executor. Its size is
+`workers`, which can be changed at any time:
+
+    parallel.workers = 4
+"""
+
+import concurrent.futures
+import os
+
+from mojito import executor
+
+
+# Number of worker processes.
+workers = os.cpu_count() or 1
+
+# Elements are split into this many chunks per worker, so that a worker
+# done early can take over part of the work of a slower one.
+CHUNKS_PER_WORKER = 4
+
+_pool = None
+_pool_size = 0
+
+
+def pool() -> concurrent.futures.ProcessPoolExecutor:
+    """
+    Returns the worker pool, starting it if needed.
+    """
+    global _pool, _pool_size
+    if _pool is not None and _pool_size != workers:
+        shutdown()
+    if _pool is None:
+        _pool = concurrent.futures.ProcessPoolExecutor(workers)
+        _pool_size = workers
+    return _pool
+
+
+def shutdown():
+    """
+    Stops the worker pool. It is started again when next needed.
+    """
+    global _pool
+    if _pool is not None:
+        _pool.shutdown()
+        _pool = None
+
+
+def run(word, closure, values, collect: bool, budget=None) -> list:
+    """
+    Runs `closure` once per element of `values`, in the worker processes.
+
+    Args:
+        word: The combinator running it, for error messages.
+        collect: Whether to return the value each run leaves on the stack,
+            as `pmap` does, or to discard the stack, as `peach` does.
+        budget: The `limits.Budget` of the calling run, if any, which the
+            workers share.
+
+    Raises:
+        RuntimeError: If a run fails.
+        limits.LimitExceeded: If a worker goes past its share of the budget.
+    """
+    if not len(values):
+        return []
+    size = -(-len(values) // (workers * CHUNKS_PER_WORKER))
+    chunks = [values[i : i + size] for i in range(0, len(values), size)]
+    limits = budget.share(len(chunks)) if budget is not None else None
+    futures = [
+        pool().submit(run_chunk, word, closure, chunk, collect, limits)
+        for chunk in chunks
+    ]
+    results = []
+    for future in futures:
+        results.extend(future.result())
+    return results
+
+
+def run_chunk(word, closure, values, collect: bool, limits=None) -> list:
+    """
+    Runs in a worker: the part of `run` done for a single chunk.
+    """
+    ex = executor.Executor(closure.vocab, limits=limits)
+    ex.start_budget()
+    data = ex.stack.data
+    results = []
+    for value in values:
+        data.append(value)
+        ex.execute(closure)
+        if collect:
+            if len(data) != 1:
+                loc = word.location
+                raise RuntimeError(
+                    f"{loc}: '{word.name}' expected its quotation to leave one value"
+                )
+            results.append(data.pop())
+        else:
+            data.clear()
+    return results
@@ -1,4 +1,6 @@
 from __future__ import annotations
+import sys
+import typing
 
 import mojito.tokenizer as t
 from mojito import types
@@ -16,6 +18,15 @@ class ProgramBuilder:
     def program(self):
         return types.Program(self.stack[-1])
 
+    def take(self):
+        """
+        Removes and returns the top-level elements collected so far.
+        """
+        top = self.stack[0]
+        elements = top[:]
+        top.clear()
+        return elements
+
     def append(self, element):
         self.context.append(element)
 
@@ -37,6 +48,7 @@ class Parser:
     def __init__(self):
         self.builder = ProgramBuilder()
         self.left_brackets = []
+        self.source_map = types.SourceMap()
 
     def consume(self, token: types.TokenWithLineNumber):
         match token.kind:
@@ -46,7 +58,7 @@ class Parser:
                 | types.MojitoTokenKind.STRING
                 | types.MojitoTokenKind.WORD
             ):
-                term = convert_token_to_term(token)
+                term = convert_token_to_term(token, self.source_map)
                 self.builder.append(term)
             case types.MojitoTokenKind.LEFT_SQUARE_BRACKET:
                 self.left_brackets.append(token)
@@ -77,6 +89,20 @@ class Parser:
                     )
                 )
 
+    def completed(self) -> list:
+        """
+        Takes the top-level terms parsed so far, unless a quotation is still
+        open: then nothing is complete yet.
+        """
+        if self.left_brackets:
+            return []
+        terms = self.builder.take()
+        if terms:
+            # The terms taken keep their source map alive: give the next ones
+            # a map of their own, so that memory stays proportional to a term.
+            self.source_map = types.SourceMap()
+        return terms
+
     def ast(self) -> types.Program:
         if self.left_brackets:
             last = self.left_brackets.pop()
@@ -90,19 +116,21 @@ class Parser:
         return self.builder.program()
 
 
-def convert_token_to_term(token: types.TokenWithLineNumber):
-    loc = types.Location(
-        line_number=token.line_number,
-        start=token.start,
-        end=token.end,
-    )
+def convert_token_to_term(
+    token: types.TokenWithLineNumber,
+    source_map: types.SourceMap,
+):
+    node_id = source_map.add(token.line_number, token.start, token.end)
     match token.kind:
-        case types.MojitoTokenKind.FLOAT_NUMBER | types.MojitoTokenKind.INTEGER_NUMBER:
-            return types.Number(loc, float(token.value))
+        case types.MojitoTokenKind.INTEGER_NUMBER:
+            return types.Number(int(token.value), source_map, node_id)
+        case types.MojitoTokenKind.FLOAT_NUMBER:
+            return types.Number(float(token.value), source_map, node_id)
         case types.MojitoTokenKind.STRING:
-            return types.String(loc, token.value[1:-1])
+            return types.String(token.value[1:-1], source_map, node_id)
         case types.MojitoTokenKind.WORD:
-            return types.Word(loc, token.value)
+            # Programs use few distinct words many times: share their names.
+            return types.Word(sys.intern(token.value), source_map, node_id)
 
 
 def parse(source) -> types.Program:
@@ -119,6 +147,33 @@ def parse(source) -> types.Program:
     return parser.ast()
 
 
+def parse_stream(source) -> typing.Iterator:
+    """
+    Parses the source incrementally, yielding each top-level term as soon as
+    it is complete: a literal or a word right away, a quotation once it is
+    closed.
+
+    Args:
+        source: Anything `mojito.tokenizer.tokenize` accepts, e.g. a file object.
+
+    Yields:
+        Top-level `types.Number`, `types.String`, `types.Word` and
+        `types.Quotation` terms.
+    """
+    parser = Parser()
+
+    try:
+        for token in t.tokenize(source):
+            parser.consume(token)
+            yield from parser.completed()
+    except t.NoMatchingRuleFoundError as err:
+        raise MojitoSyntaxError(
+            error("parser is unable to continue: uncrecognozied character found")
+        ) from err
+
+    parser.ast()
+
+
 def error(msg, loc=None):
     error_msg = f"\x1b[31merror: \x1b[0m{msg}"
     if loc:
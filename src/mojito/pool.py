@@ -0,0 +1,121 @@
+"""
+Running many independent mojito programs from one process.
+
+Every job runs on a fresh `Executor` over a private offspring of a frozen
+vocab, `stdlib.vocab` by default, so that nothing a program defines is seen
+by the others:
+
+    with ExecutorPool(workers=8) as pool:
+        for result in pool.run(["1 2 +", ": sq dup * ; 3 sq"]):
+            print(result.stack, result.error)
+
+Jobs run on threads by default, which suits programs waiting on I/O. Pass
+`processes=True` for CPU-bound programs: the vocab is then pickled to the
+worker processes (see `types.Vocab`), and so are the results.
+"""
+
+import concurrent.futures
+import dataclasses
+
+from mojito import executor
+from mojito import limits as limits_
+from mojito import stdlib
+from mojito import types
+
+
+@dataclasses.dataclass
+class JobResult:
+    """
+    The outcome of one program.
+
+    Attributes:
+        stack: The values left on the stack, bottom first.
+        error: What the program failed with, or None.
+    """
+
+    stack: list
+    error: Exception | None = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+def run_job(
+    vocab: types.Vocab,
+    source: str,
+    opt_level: int,
+    limits: limits_.Limits | None = None,
+) -> JobResult:
+    """
+    Runs a single program on a fresh executor. Never raises.
+    """
+    ex = executor.Executor(vocab.offspring(), opt_level, limits)
+    try:
+        ex.run(source)
+    except Exception as err:
+        return JobResult(list(ex.stack.data), err)
+    return JobResult(list(ex.stack.data))
+
+
+class ExecutorPool:
+    """
+    Runs programs concurrently, each in isolation from the others.
+
+    Args:
+        vocab: The vocab programs start from. It is frozen if it was not.
+        workers: Number of threads or processes, see
+            `concurrent.futures`.
+        processes: Whether to run programs in worker processes rather
+            than threads.
+        opt_level: See `Executor`.
+        limits: What each program may use, see `mojito.limits`. A program
+            going past them ends with a `limits.LimitExceeded` error.
+    """
+
+    def __init__(
+        self,
+        vocab: types.Vocab = stdlib.vocab,
+        workers: int | None = None,
+        processes: bool = False,
+        opt_level: int = 2,
+        limits: limits_.Limits | None = None,
+    ):
+        vocab.freeze()
+        self.vocab = vocab
+        self.opt_level = opt_level
+        self.limits = limits
+        if processes:
+            self.executor = concurrent.futures.ProcessPoolExecutor(workers)
+        else:
+            self.executor = concurrent.futures.ThreadPoolExecutor(workers)
+
+    def submit(self, source: str) -> concurrent.futures.Future:
+        """
+        Starts running a program.
+
+        Returns:
+            A future of its `JobResult`.
+        """
+        return self.executor.submit(
+            run_job, self.vocab, source, self.opt_level, self.limits
+        )
+
+    def run(self, sources) -> list[JobResult]:
+        """
+        Runs a batch of programs.
+
+        Returns:
+            Their results, in the order of `sources`.
+        """
+        futures = [self.submit(source) for source in sources]
+        return [future.result() for future in futures]
+
+    def close(self):
+        self.executor.shutdown()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
@@ -0,0 +1,191 @@
+"""
+Deterministic profiler for mojito words.
+
+While a `Profiler` is active, every word resolved by a call site is wrapped
+so that entering and leaving it is recorded. Nothing is wrapped otherwise,
+so the dispatch loop pays nothing for profiling being available.
+"""
+
+import dataclasses
+import time
+
+from mojito import compiler
+from mojito import types
+
+
+@dataclasses.dataclass
+class WordStats:
+    calls: int = 0
+    self_ns: int = 0
+    total_ns: int = 0
+
+
+class CallNode:
+    """
+    A node of the call tree: one per distinct stack of word names.
+    """
+
+    __slots__ = ("name", "depth", "children", "self_ns")
+
+    def __init__(self, name, depth=0):
+        self.name = name
+        self.depth = depth
+        self.children = {}
+        self.self_ns = 0
+
+    def child(self, name):
+        node = self.children.get(name)
+        if node is None:
+            node = self.children[name] = CallNode(name, self.depth + 1)
+        return node
+
+
+class Profiler:
+    """
+    Records call counts, self and cumulative time and call graph edges for
+    builtins and user-defined words.
+
+    Closure calls stay off the Python stack while profiling: a word is run
+    through a continuation that reports back to the profiler when it
+    returns. Tail calls are not eliminated while profiling.
+
+    The call tree, used for call stacks, is at most `max_depth` deep: time
+    spent deeper is attributed to the deepest recorded word.
+    """
+
+    def __init__(self, clock=time.perf_counter_ns, max_depth=256):
+        self.clock = clock
+        self.max_depth = max_depth
+        self.stats: dict[str, WordStats] = {}
+        self.edges: dict[tuple[str, str], int] = {}
+        self.root = CallNode("<root>")
+        # Entries: [word name, call tree node, start time, time in callees]
+        self.active = []
+        # How many times each word is on the stack, to count the cumulative
+        # time of recursive words only once.
+        self.depth: dict[str, int] = {}
+
+        exit_vocab = types.Vocab(builtins={"profiler-exit": self._exit_word})
+        self.exit_closure = types.Closure(
+            types.Quotation([types.Word("profiler-exit")]), exit_vocab
+        )
+
+    def start(self):
+        compiler.resolve_hook = self.wrap
+        # Invalidate call site caches, so that every word is resolved again.
+        types.Vocab.version += 1
+
+    def stop(self):
+        compiler.resolve_hook = None
+        types.Vocab.version += 1
+        # Close the words left running by an error.
+        while self.active:
+            self.exit()
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    def enter(self, name):
+        if self.active:
+            caller, parent = self.active[-1][:2]
+        else:
+            caller, parent = self.root.name, self.root
+        node = parent.child(name) if parent.depth < self.max_depth else parent
+
+        if name not in self.stats:
+            self.stats[name] = WordStats()
+        self.stats[name].calls += 1
+        edge = (caller, name)
+        self.edges[edge] = self.edges.get(edge, 0) + 1
+        self.depth[name] = self.depth.get(name, 0) + 1
+        self.active.append([name, node, self.clock(), 0])
+
+    def exit(self):
+        name, node, start, callees_ns = self.active.pop()
+        elapsed = self.clock() - start
+        stats = self.stats[name]
+        stats.self_ns += elapsed - callees_ns
+        node.self_ns += elapsed - callees_ns
+        self.depth[name] -= 1
+        if not self.depth[name]:
+            stats.total_ns += elapsed
+        if self.active:
+            self.active[-1][3] += elapsed
+
+    def _exit_word(self, word, stack, vocab, read_word, execute):
+        self.exit()
+
+    def wrap(self, name, target):
+        """
+        Returns a builtin standing for `target` that reports to the profiler.
+        """
+        if target == self._exit_word:
+            return target
+
+        if isinstance(target, types.Closure):
+
+            def profiled_closure(word, stack, vocab, read_word, execute):
+                self.enter(name)
+                return self._then_exit(target)
+
+            return profiled_closure
+
+        def profiled_builtin(word, stack, vocab, read_word, execute):
+            self.enter(name)
+            try:
+                result = target(word, stack, vocab, read_word, execute)
+            except BaseException:
+                self.exit()
+                raise
+            if isinstance(result, types.Closure):
+                # A combinator: its time includes the quotation it runs.
+                return self._then_exit(result)
+            self.exit()
+            return result
+
+        return profiled_builtin
+
+    def _then_exit(self, closure):
+        return compiler.continuation(
+            (compiler.CALL_CLOSURE, closure),
+            (compiler.CALL_CLOSURE, self.exit_closure),
+        )
+
+    def table(self, sort_by="self_ns", limit=None) -> str:
+        """
+        Formats the statistics as a table, sorted by `sort_by` in
+        descending order.
+        """
+        rows = sorted(
+            self.stats.items(),
+            key=lambda item: getattr(item[1], sort_by),
+            reverse=True,
+        )
+        lines = [f"{'calls':>10} {'self ms':>10} {'total ms':>10}  word"]
+        for name, stats in rows[:limit]:
+            lines.append(
+                f"{stats.calls:>10} {stats.self_ns / 1e6:>10.3f} "
+                f"{stats.total_ns / 1e6:>10.3f}  {name}"
+            )
+        return "\n".join(lines)
+
+    def collapsed_stacks(self) -> str:
+        """
+        Formats the call tree in the collapsed stack format read by
+        flamegraph tools: one `caller;callee;... <self microseconds>` line
+        per distinct stack.
+        """
+        lines = []
+        pending = [(child, child.name) for child in self.root.children.values()]
+        while pending:
+            node, path = pending.pop()
+            if node.self_ns:
+                lines.append(f"{path} {node.self_ns // 1000}")
+            for child in node.children.values():
+                pending.append((child, f"{path};{child.name}"))
+        lines.sort()
+        return "\n".join(lines)
@@ -1,15 +1,26 @@
+import array
+import inspect
+import math
+
+from mojito import compiler
+from mojito import memo
 from mojito import types
 from mojito.types import runtime
+from mojito.types import sequence
+from mojito.types import stack_effect
+from mojito.types.stack_effect import declare, unchecked
 
 
 vocab = types.Vocab(
     parent_vocab=None,
     builtins={},
     user_defined={},
+    module=__name__,
 )
 
 
 @vocab.define("dup")
+@declare("( x -- x x )")
 def dup(word, state, vocab, read_word, execute):
     try:
         state.dup()
@@ -20,7 +31,13 @@ def dup(word, state, vocab, read_word, execute):
         )
 
 
+@unchecked(dup)
+def dup_unchecked(word, state, vocab, read_word, execute):
+    state.data.append(state.data[-1])
+
+
 @vocab.define("drop")
+@declare("( x -- )")
 def drop(word, state, vocab, read_word, execute):
     try:
         state.pop()
@@ -31,21 +48,34 @@ def drop(word, state, vocab, read_word, execute):
         )
 
 
+@unchecked(drop)
+def drop_unchecked(word, state, vocab, read_word, execute):
+    state.data.pop()
+
+
 @vocab.define("dip")
 def dip(word, state, vocab, read_word, execute):
     try:
         quotation = state.pop()
         top = state.pop()
-        execute(quotation)
-        state.push(top)
     except IndexError:
         loc = word.location
         raise RuntimeError(
             f"{loc}: '{word.name}' expected a closure on top of the stack"
         )
+    if not isinstance(quotation, types.Closure):
+        loc = word.location
+        raise RuntimeError(
+            f"{loc}: '{word.name}' expected a closure on top of the stack"
+        )
+    return compiler.continuation(
+        (compiler.CALL_CLOSURE, quotation),
+        (compiler.PUSH_CONST, top),
+    )
 
 
 @vocab.define("swap")
+@declare("( x y -- y x )")
 def swap(word, state, vocab, read_word, execute):
     try:
         a, b = state.pop(), state.pop()
@@ -58,6 +88,12 @@ def swap(word, state, vocab, read_word, execute):
         )
 
 
+@unchecked(swap)
+def swap_unchecked(word, state, vocab, read_word, execute):
+    data = state.data
+    data[-1], data[-2] = data[-2], data[-1]
+
+
 # Everything below was written by LLM just to quick check the prototype...
 
 
@@ -68,7 +104,9 @@ def _pop2_numbers(word, state):
     except Exception:
         loc = word.location
         raise RuntimeError(f"{loc}: '{word.name}' expected 2 elements on the stack")
-    if not (isinstance(a, types.Number) and isinstance(b, types.Number)):
+    if not (
+        isinstance(a, runtime.NUMBER_TYPES) and isinstance(b, runtime.NUMBER_TYPES)
+    ):
         loc = word.location
         raise RuntimeError(
             f"{loc}: '{word.name}' expected two numbers, got {type(a).__name__} and {type(b).__name__}"
@@ -77,51 +115,93 @@ def _pop2_numbers(word, state):
 
 
 @vocab.define("<")
+@declare("( a:num b:num -- c:num )")
 def lt(word, state, vocab, read_word, execute):
     a, b = _pop2_numbers(word, state)
-    state.push(types.Number(word.location, float(a.value < b.value)))
+    state.push(int(a < b))
+
+
+@unchecked(lt)
+def lt_unchecked(word, state, vocab, read_word, execute):
+    data = state.data
+    b = data.pop()
+    data[-1] = int(data[-1] < b)
 
 
 @vocab.define(">")
+@declare("( a:num b:num -- c:num )")
 def gt(word, state, vocab, read_word, execute):
     a, b = _pop2_numbers(word, state)
-    state.push(types.Number(word.location, float(a.value > b.value)))
+    state.push(int(a > b))
+
+
+@unchecked(gt)
+def gt_unchecked(word, state, vocab, read_word, execute):
+    data = state.data
+    b = data.pop()
+    data[-1] = int(data[-1] > b)
 
 
 @vocab.define("+")
+@declare("( a:num b:num -- c:num )")
 def add(word, state, vocab, read_word, execute):
     a, b = _pop2_numbers(word, state)
-    state.push(types.Number(word.location, a.value + b.value))
+    state.push(a + b)
+
+
+@unchecked(add)
+def add_unchecked(word, state, vocab, read_word, execute):
+    data = state.data
+    b = data.pop()
+    data[-1] += b
 
 
 @vocab.define("-")
+@declare("( a:num b:num -- c:num )")
 def sub(word, state, vocab, read_word, execute):
     a, b = _pop2_numbers(word, state)
-    state.push(types.Number(word.location, a.value - b.value))
+    state.push(a - b)
+
+
+@unchecked(sub)
+def sub_unchecked(word, state, vocab, read_word, execute):
+    data = state.data
+    b = data.pop()
+    data[-1] -= b
 
 
 @vocab.define("*")
+@declare("( a:num b:num -- c:num )")
 def mul(word, state, vocab, read_word, execute):
     a, b = _pop2_numbers(word, state)
-    state.push(types.Number(word.location, a.value * b.value))
+    state.push(a * b)
+
+
+@unchecked(mul)
+def mul_unchecked(word, state, vocab, read_word, execute):
+    data = state.data
+    b = data.pop()
+    data[-1] *= b
 
 
 @vocab.define("/")
+@declare("( a:num b:num -- c:num )")
 def div(word, state, vocab, read_word, execute):
     a, b = _pop2_numbers(word, state)
-    if b.value == 0:
+    if b == 0:
         loc = word.location
         raise RuntimeError(f"{loc}: Division by zero in '{word.name}'")
-    state.push(types.Number(word.location, a.value / b.value))
+    state.push(a / b)
 
 
 @vocab.define("mod")
+@declare("( a:num b:num -- c:num )")
 def mod(word, state, vocab, read_word, execute):
     a, b = _pop2_numbers(word, state)
-    if b.value == 0:
+    if b == 0:
         loc = word.location
         raise RuntimeError(f"{loc}: Modulo by zero in '{word.name}'")
-    state.push(types.Number(word.location, a.value % b.value))
+    state.push(a % b)
 
 
 @vocab.define("if")
@@ -140,13 +220,12 @@ def if_combinator(word, state, vocab, read_word, execute):
     ):
         loc = word.location
         raise RuntimeError(f"{loc}: '{word.name}' expected quotations for branches")
-    if not isinstance(cond, types.Number):
+    if not isinstance(cond, runtime.NUMBER_TYPES):
         loc = word.location
         raise RuntimeError(f"{loc}: '{word.name}' expected a number as condition")
-    if cond.value:
-        execute(true_branch)
-    else:
-        execute(false_branch)
+    if cond:
+        return true_branch
+    return false_branch
 
 
 @vocab.define("bi")
@@ -164,9 +243,11 @@ def bi(word, state, vocab, read_word, execute):
         loc = word.location
         raise RuntimeError(f"{loc}: '{word.name}' expected quotations for bi")
     state.push(x)
-    execute(q1)
-    state.push(x)
-    execute(q2)
+    return compiler.continuation(
+        (compiler.CALL_CLOSURE, q1),
+        (compiler.PUSH_CONST, x),
+        (compiler.CALL_CLOSURE, q2),
+    )
 
 
 @vocab.define("when")
@@ -182,11 +263,11 @@ def when(word, state, vocab, read_word, execute):
     if not isinstance(q, types.Closure):
         loc = word.location
         raise RuntimeError(f"{loc}: '{word.name}' expected a quotation for when")
-    if not isinstance(cond, types.Number):
+    if not isinstance(cond, runtime.NUMBER_TYPES):
         loc = word.location
         raise RuntimeError(f"{loc}: '{word.name}' expected a number as condition")
-    if cond.value:
-        execute(q)
+    if cond:
+        return q
 
 
 @vocab.define("apply")
@@ -198,29 +279,430 @@ def apply(word, state, vocab, read_word, execute):
         raise RuntimeError(
             f"{loc}: '{word.name}' expected 1 element on the stack (quotation)"
         )
+    if not isinstance(q, types.Closure):
+        loc = word.location
+        raise RuntimeError(f"{loc}: '{word.name}' expected a quotation for apply")
+    return q
 
-    execute(q)
 
+# The loop combinators below return a generator of the quotations to call,
+# which the executor runs from its own loop (see `compiler.ITERATE`): an
+# iteration grows neither the Python stack nor the return stack.
+# Besides sequences, they iterate over quotations of literals: `[1 2 3]`.
 
-@vocab.define(":")
-def define(word, state, vocab, read_word, execute):
+
+def _pop_quotations(word, state, count, signature):
+    try:
+        quotations = [state.pop() for _ in range(count)]
+    except IndexError:
+        loc = word.location
+        raise RuntimeError(f"{loc}: '{word.name}' expected ({signature}) on the stack")
+    if not all(isinstance(q, types.Closure) for q in quotations):
+        loc = word.location
+        raise RuntimeError(f"{loc}: '{word.name}' expected quotations ({signature})")
+    quotations.reverse()
+    return quotations
+
+
+def _pop_flag(word, state):
+    try:
+        flag = state.pop()
+    except IndexError:
+        loc = word.location
+        raise RuntimeError(
+            f"{loc}: '{word.name}' expected its quotation to leave a flag"
+        )
+    if not isinstance(flag, runtime.NUMBER_TYPES):
+        loc = word.location
+        raise RuntimeError(f"{loc}: '{word.name}' expected a number as flag")
+    return flag
+
+
+def _pop_sequence(word, state, signature):
+    try:
+        seq = state.pop()
+    except IndexError:
+        seq = None
+    if isinstance(seq, array.array):
+        return seq
+    if not isinstance(seq, types.Closure):
+        loc = word.location
+        raise RuntimeError(f"{loc}: '{word.name}' expected a sequence ({signature})")
+
+    values = []
+    for node in seq.body:
+        match node:
+            case types.Number(value=value) | types.String(value=value):
+                values.append(value)
+            case types.Quotation():
+                values.append(types.Closure(node, seq.vocab))
+            case _:
+                loc = word.location
+                raise RuntimeError(
+                    f"{loc}: '{word.name}' expected a sequence of values, got word '{node.name}'"
+                )
+    return values
+
+
+def _sequence_of(values, vocab, like):
+    # A sequence stays one as long as it holds numbers only.
+    if isinstance(like, array.array):
+        try:
+            return sequence.from_values(values)
+        except (TypeError, ValueError):
+            pass
+    nodes = []
+    for value in values:
+        match value:
+            case int() | float():
+                nodes.append(types.Number(value))
+            case str():
+                nodes.append(types.String(value))
+            case types.Closure():
+                nodes.append(value.body)
+            case array.array():
+                # Boxed as a quotation of its numbers, which `>seq` unboxes.
+                nodes.append(types.Quotation([types.Number(x) for x in value]))
+            case _:
+                raise TypeError(f"cannot hold {type(value).__name__} in a quotation")
+    return types.Closure(types.Quotation(nodes), vocab)
+
+
+def _iterate(steps) -> types.Closure:
+    return compiler.continuation((compiler.ITERATE, steps))
+
+
+@vocab.define("times")
+def times(word, state, vocab, read_word, execute):
+    (q,) = _pop_quotations(word, state, 1, "n quotation")
+    try:
+        n = state.pop()
+    except IndexError:
+        n = None
+    if not isinstance(n, int):
+        loc = word.location
+        raise RuntimeError(f"{loc}: '{word.name}' expected an integer count")
+    return _iterate(q for _ in range(n))
+
+
+@vocab.define("while")
+def while_combinator(word, state, vocab, read_word, execute):
+    cond, body = _pop_quotations(word, state, 2, "cond-quotation body-quotation")
+
+    def steps():
+        while True:
+            yield cond
+            if not _pop_flag(word, state):
+                return
+            yield body
+
+    return _iterate(steps())
+
+
+@vocab.define("loop")
+def loop(word, state, vocab, read_word, execute):
+    (q,) = _pop_quotations(word, state, 1, "quotation")
+
+    def steps():
+        yield q
+        while _pop_flag(word, state):
+            yield q
+
+    return _iterate(steps())
+
+
+@vocab.define("each")
+def each(word, state, vocab, read_word, execute):
+    (q,) = _pop_quotations(word, state, 1, "seq quotation")
+    values = _pop_sequence(word, state, "seq quotation")
+    push = state.push
+
+    def steps():
+        for value in values:
+            push(value)
+            yield q
+
+    return _iterate(steps())
+
+
+@vocab.define("map")
+def map_combinator(word, state, vocab, read_word, execute):
+    (q,) = _pop_quotations(word, state, 1, "seq quotation")
+    values = _pop_sequence(word, state, "seq quotation")
+    _reserve(state, len(values))
+    data = state.data
+    depth = len(data)
+
+    def steps():
+        results = []
+        for value in values:
+            data.append(value)
+            yield q
+            if len(data) != depth + 1:
+                loc = word.location
+                raise RuntimeError(
+                    f"{loc}: '{word.name}' expected its quotation to leave one value"
+                )
+            results.append(data.pop())
+        data.append(_sequence_of(results, vocab, values))
+
+    return _iterate(steps())
+
+
+@vocab.define("filter")
+def filter_combinator(word, state, vocab, read_word, execute):
+    (q,) = _pop_quotations(word, state, 1, "seq quotation")
+    values = _pop_sequence(word, state, "seq quotation")
+    push = state.push
+
+    def steps():
+        results = []
+        for value in values:
+            push(value)
+            yield q
+            if _pop_flag(word, state):
+                results.append(value)
+        push(_sequence_of(results, vocab, values))
+
+    return _iterate(steps())
+
+
+@vocab.define("fold")
+def fold(word, state, vocab, read_word, execute):
+    (q,) = _pop_quotations(word, state, 1, "seq init quotation")
+    try:
+        init = state.pop()
+    except IndexError:
+        loc = word.location
+        raise RuntimeError(
+            f"{loc}: '{word.name}' expected (seq init quotation) on the stack"
+        )
+    values = _pop_sequence(word, state, "seq init quotation")
+    push = state.push
+    push(init)
+
+    def steps():
+        for value in values:
+            push(value)
+            yield q
+
+    return _iterate(steps())
+
+
+def _in_parallel(word, state, vocab, collect):
+    (q,) = _pop_quotations(word, state, 1, "seq quotation")
+    values = _pop_sequence(word, state, "seq quotation")
+    if collect:
+        _reserve(state, len(values))
+    # Imported here: it runs executors, which need this module.
+    from mojito import parallel
+
+    results = parallel.run(word, q, values, collect, state.budget)
+    if collect:
+        state.push(_sequence_of(results, vocab, values))
+
+
+@vocab.define("pmap")
+def pmap(word, state, vocab, read_word, execute):
+    _in_parallel(word, state, vocab, collect=True)
+
+
+@vocab.define("peach")
+def peach(word, state, vocab, read_word, execute):
+    _in_parallel(word, state, vocab, collect=False)
+
+
+# Sequences, see `types.sequence`.
+
+
+def _reserve(state, count):
+    # Checked before allocating: the executor only checks its limits between
+    # calls, long after a single builtin may have used up all memory.
+    if state.budget is not None:
+        state.budget.reserve(count, state)
+
+
+def _pop_seq(word, state) -> array.array:
+    try:
+        seq = state.pop()
+    except IndexError:
+        seq = None
+    if not isinstance(seq, array.array):
+        loc = word.location
+        raise RuntimeError(f"{loc}: '{word.name}' expected a sequence on the stack")
+    return seq
+
+
+def _pop_int(word, state) -> int:
+    try:
+        n = state.pop()
+    except IndexError:
+        n = None
+    if not isinstance(n, int):
+        loc = word.location
+        raise RuntimeError(f"{loc}: '{word.name}' expected an integer on the stack")
+    return n
+
+
+@vocab.define(">seq")
+@declare("( q:quot -- s:seq )")
+def to_seq(word, state, vocab, read_word, execute):
+    values = _pop_sequence(word, state, "quotation")
+    try:
+        state.push(sequence.from_values(values))
+    except (TypeError, ValueError) as err:
+        loc = word.location
+        raise RuntimeError(f"{loc}: '{word.name}': {err}")
+
+
+@vocab.define("range")
+@declare("( a:num b:num -- s:seq )")
+def range_(word, state, vocab, read_word, execute):
+    stop = _pop_int(word, state)
+    start = _pop_int(word, state)
+    _reserve(state, stop - start)
+    try:
+        state.push(sequence.numbers(start, stop))
+    except (ValueError, OverflowError):
+        loc = word.location
+        raise RuntimeError(
+            f"{loc}: '{word.name}': sequence element out of the 64-bit range"
+        )
+
+
+@vocab.define("length")
+@declare("( s -- n:num )")
+def length(word, state, vocab, read_word, execute):
+    try:
+        seq = state.pop()
+    except IndexError:
+        seq = None
+    if isinstance(seq, types.Closure):
+        seq = seq.body
+    elif not isinstance(seq, array.array):
+        loc = word.location
+        raise RuntimeError(f"{loc}: '{word.name}' expected a sequence on the stack")
+    state.push(len(seq))
+
+
+@vocab.define("nth")
+@declare("( s:seq i:num -- x:num )")
+def nth(word, state, vocab, read_word, execute):
+    i = _pop_int(word, state)
+    seq = _pop_seq(word, state)
+    if not 0 <= i < len(seq):
+        loc = word.location
+        raise RuntimeError(
+            f"{loc}: '{word.name}' index {i} out of range for length {len(seq)}"
+        )
+    state.push(seq[i])
+
+
+@vocab.define("slice")
+@declare("( s:seq i:num j:num -- t:seq )")
+def slice_(word, state, vocab, read_word, execute):
+    stop = _pop_int(word, state)
+    start = _pop_int(word, state)
+    seq = _pop_seq(word, state)
+    state.push(seq[start:stop])
+
+
+@vocab.define("sum")
+@declare("( s:seq -- n:num )")
+def sum_(word, state, vocab, read_word, execute):
+    state.push(sum(_pop_seq(word, state)))
+
+
+@vocab.define("product")
+@declare("( s:seq -- n:num )")
+def product(word, state, vocab, read_word, execute):
+    state.push(math.prod(_pop_seq(word, state)))
+
+
+@vocab.define("minimum")
+@declare("( s:seq -- n:num )")
+def minimum(word, state, vocab, read_word, execute):
+    seq = _pop_seq(word, state)
+    if not seq:
+        loc = word.location
+        raise RuntimeError(f"{loc}: '{word.name}' of an empty sequence")
+    state.push(min(seq))
+
+
+@vocab.define("maximum")
+@declare("( s:seq -- n:num )")
+def maximum(word, state, vocab, read_word, execute):
+    seq = _pop_seq(word, state)
+    if not seq:
+        loc = word.location
+        raise RuntimeError(f"{loc}: '{word.name}' of an empty sequence")
+    state.push(max(seq))
+
+
+def _elementwise(op):
+    @declare("( a b -- c:seq )")
+    def elementwise(word, state, vocab, read_word, execute):
+        try:
+            b = state.pop()
+            a = state.pop()
+        except IndexError:
+            loc = word.location
+            raise RuntimeError(f"{loc}: '{word.name}' expected 2 elements on the stack")
+        operands = (a, b)
+        if not any(isinstance(x, array.array) for x in operands) or not all(
+            isinstance(x, (array.array, *runtime.NUMBER_TYPES)) for x in operands
+        ):
+            loc = word.location
+            raise RuntimeError(
+                f"{loc}: '{word.name}' expected a sequence and a sequence or a number"
+            )
+        _reserve(state, max(len(x) for x in operands if isinstance(x, array.array)))
+        try:
+            state.push(sequence.elementwise(op, a, b))
+        except ValueError as err:
+            loc = word.location
+            raise RuntimeError(f"{loc}: '{word.name}': {err}")
+
+    return elementwise
+
+
+# v+, v-, v*, v/ and vmod: arithmetic on every element of a sequence.
+for name, op in sequence.OPERATORS.items():
+    vocab.define(f"v{name}", _elementwise(op))
+
+
+def _read_definition(word, read_word):
+    # Reads `name ( effect ) body ;`, the effect being optional.
     # Read the function name (should be a Word)
     func_name = read_word()
     if func_name is None or not isinstance(func_name, types.Word):
         loc = word.location
-        raise RuntimeError(f"{loc}: ':' expected a word for function name")
+        raise RuntimeError(f"{loc}: '{word.name}' expected a word for function name")
+    # Read an optional stack effect declaration: ( a b -- c )
+    effect = None
+    w = read_word()
+    if isinstance(w, types.Word) and w.name == "(":
+        names = []
+        while (w := read_word()) is not None and not (
+            isinstance(w, types.Word) and w.name == ")"
+        ):
+            names.append(w.name if isinstance(w, types.Word) else str(w.value))
+        try:
+            effect = stack_effect.parse(names)
+        except ValueError as err:
+            raise RuntimeError(f"{word.location}: {err}")
+        w = read_word()
     # Read body until ';'
     body = []
     level = 0
     while True:
-        w = read_word()
         if w is None:
             loc = word.location
-            raise RuntimeError(f"{loc}: ':' expected ';' to end definition")
+            raise RuntimeError(f"{loc}: '{word.name}' expected ';' to end definition")
 
         # The following allows us to define local functions -- no Forth supported that
         if isinstance(w, types.Word):
-            if w.name == ":":
+            if w.name in DEFINING_WORDS:
                 level += 1
             elif w.name == ";":
                 if level == 0:
@@ -228,12 +710,70 @@ def define(word, state, vocab, read_word, execute):
                 level -= 1
 
         body.append(w)
-    closure = types.Closure(types.Quotation(body), vocab.offspring())
-    vocab.define(func_name.name, closure)
+        w = read_word()
+    return func_name.name, effect, types.Quotation(body)
+
+
+@vocab.define(":")
+def define(word, state, vocab, read_word, execute):
+    name, effect, body = _read_definition(word, read_word)
+    closure = types.Closure(body, vocab.offspring(), effect=effect)
+    vocab.define(name, closure)
+
+
+@vocab.define("MEMO:")
+def memo_define(word, state, vocab, read_word, execute):
+    name, effect, body = _read_definition(word, read_word)
+    if effect is None:
+        loc = word.location
+        raise RuntimeError(
+            f"{loc}: '{word.name}' expected a stack effect declaration for '{name}'"
+        )
+    closure = types.Closure(body, vocab.offspring(), effect=effect)
+    vocab.define_word(name, memo.Memoized(closure, effect))
+
+
+@vocab.define("memoize")
+def memoize(word, state, vocab, read_word, execute):
+    (q,) = _pop_quotations(word, state, 1, "quotation")
+    # Imported here: it needs this module.
+    from mojito import effects
+
+    effect = effects.effect_of(q)
+    if effect is None:
+        loc = word.location
+        raise RuntimeError(
+            f"{loc}: '{word.name}' could not infer the stack effect of its quotation"
+        )
+    # The memoized quotation calls a word standing for `q`, defined in a
+    # vocab of its own. No call site can have resolved a word in that vocab
+    # yet: unlike `Vocab.define_word`, this leaves the caches of the others
+    # valid.
+    private = q.vocab.offspring()
+    private.user_defined["memoized"] = memo.Memoized(q, effect)
+    body = types.Quotation([types.Word("memoized")])
+    state.push(types.Closure(body, private, effect=effect))
+
+
+# Names of the words starting a definition ended by ';'.
+DEFINING_WORDS = {":", "MEMO:"}
+
+# Builtins reading the words that follow them: they need a real frame.
+PARSING_WORDS = {define, memo_define}
+
+
+def needs_frame(target) -> bool:
+    """
+    Tells whether a builtin must be called from a frame of the executor,
+    rather than inlined or fused: parsing words, which read the words that
+    follow them, and async words, which suspend the executor.
+    """
+    return target in PARSING_WORDS or inspect.iscoroutinefunction(target)
 
 
 @vocab.define("put")
 @vocab.define(".")
+@declare("( x -- )")
 def println(word, state, vocab, read_word, execute):
     try:
         print(runtime.as_string(state.pop()))
@@ -244,6 +784,11 @@ def println(word, state, vocab, read_word, execute):
 
 
 @vocab.define("get")
+@declare("( -- s:str )")
 def get(word, state, vocab, read_word, execute):
     input_text = input()
-    state.push(types.String(word.location, input_text))
+    state.push(input_text)
+
+
+# Shared by every executor: words are defined in offspring of it.
+vocab.freeze()
@@ -0,0 +1,293 @@
+"""
+Superinstructions: common sequences of builtin calls fused into a single
+dispatch step.
+
+A fusion table lists the sequences to fuse as patterns: tuples of word names
+in which `CONST` stands for any literal, e.g. `("dup", CONST, "-")`. The
+active table, `table`, starts as `DEFAULT_TABLE` and can be extended with
+patterns found by a training run:
+
+    with Trainer() as trainer:
+        ex.run_code(code)
+    save(trainer.patterns([code], ex.vocab), "fusion.json")
+    ...
+    table.update(load("fusion.json"))
+
+Like the optimizer, a `FUSED` instruction replaces the first instruction of
+the sequence and leaves the rest untouched. Its words are resolved on first
+run and again after any word is defined; if one of them turns out to be a
+user-defined word, the original instruction is put back.
+"""
+
+import json
+import pathlib
+
+from mojito import compiler
+from mojito import stdlib
+from mojito import types
+
+
+# Stands for any literal in a pattern.
+CONST = "#"
+
+DEFAULT_TABLE = frozenset(
+    {
+        ("dup", CONST, "-"),
+        ("dup", CONST, "+"),
+        ("dup", CONST, ">"),
+        ("dup", CONST, "<"),
+        ("dup", "*"),
+        ("swap", "drop"),
+        ("swap", "-"),
+        ("drop", CONST),
+        (CONST, ">"),
+        (CONST, "<"),
+        (CONST, "+"),
+        (CONST, "-"),
+        (CONST, "*"),
+    }
+)
+
+# The patterns fused by `fuse` by default.
+table = set(DEFAULT_TABLE)
+
+
+class Fused:
+    """
+    The operand of a `FUSED` instruction.
+
+    Attributes:
+        items: The fused instructions, as `(opcode, operand)` pairs.
+        original: The instruction replaced by the `FUSED` one.
+        steps: `(builtin, word)` pairs, or `(value, None)` for literals, as
+            resolved in `vocab` as of `types.Vocab.version`.
+    """
+
+    __slots__ = ("items", "length", "original", "steps", "vocab", "version")
+
+    def __init__(self, items, original):
+        self.items = items
+        self.length = len(items)
+        self.original = original
+        self.steps = ()
+        self.vocab = None
+        self.version = -1
+
+    def resolve(self, vocab: types.Vocab) -> bool:
+        """
+        Resolves the fused words in `vocab`.
+
+        Returns:
+            False if one of them is not a plain builtin, in which case the
+            instructions must run unfused.
+        """
+        steps = []
+        for op, arg in self.items:
+            if op == compiler.PUSH_CONST:
+                steps.append((arg, None))
+                continue
+            try:
+                target = arg.resolve(vocab)
+            except RuntimeError:
+                return False
+            if isinstance(target, types.Closure) or stdlib.needs_frame(target):
+                return False
+            steps.append((target, arg.word))
+
+        self.steps = tuple(steps)
+        self.vocab = vocab
+        self.version = types.Vocab.version
+        return True
+
+
+def original_instruction(code: compiler.Code, ip: int):
+    """
+    Returns the `(opcode, operand)` pair instruction `ip` was compiled to,
+    before any optimization replaced it.
+    """
+    op, arg = code.ops[ip], code.args[ip]
+    if op in (compiler.PUSH_FOLDED, compiler.CALL_FOLDED):
+        return arg[-1]
+    if op == compiler.FUSED:
+        return arg.original
+    if op == compiler.CALL_INLINED:
+        return compiler.CALL_WORD, arg.site
+    return op, arg
+
+
+def pattern_at(code: compiler.Code, ip: int, length: int):
+    """
+    Returns the pattern matching the `length` instructions at `ip`, or None
+    if they are not all literals and word calls.
+    """
+    if ip + length > len(code):
+        return None
+    pattern = []
+    for i in range(ip, ip + length):
+        op, arg = original_instruction(code, i)
+        if op == compiler.PUSH_CONST:
+            pattern.append(CONST)
+        elif op == compiler.CALL_WORD:
+            pattern.append(arg.word.name)
+        else:
+            return None
+    return tuple(pattern)
+
+
+def fuse(code: compiler.Code, patterns=None):
+    """
+    Fuses the sequences of `code` that match a pattern, preferring longer
+    ones. Quotations inside `code` are left to the caller.
+
+    Args:
+        patterns: The fusion table, `table` by default.
+    """
+    if patterns is None:
+        patterns = table
+    if not patterns:
+        return
+    lengths = sorted({len(pattern) for pattern in patterns}, reverse=True)
+
+    ops, args = code.ops, code.args
+    ip = 0
+    while ops[ip] != compiler.RETURN:
+        op, arg = ops[ip], args[ip]
+        if op == compiler.PUSH_FOLDED:
+            # Only the first instruction of a folded span ever runs.
+            ip = arg[1]
+            continue
+        elif op == compiler.CALL_FOLDED:
+            ip = arg[2]
+            continue
+        elif op in (compiler.PUSH_CONST, compiler.CALL_WORD):
+            for length in lengths:
+                # A pattern may match the original instructions of a folded
+                # span, which must not be fused with its neighbours.
+                if pattern_at(code, ip, length) in patterns and all(
+                    other in (compiler.PUSH_CONST, compiler.CALL_WORD)
+                    for other in ops[ip : ip + length]
+                ):
+                    items = tuple(zip(ops[ip : ip + length], args[ip : ip + length]))
+                    ops[ip] = compiler.FUSED
+                    args[ip] = Fused(items, (op, arg))
+                    ip += length - 1
+                    break
+        ip += 1
+
+
+class Trainer:
+    """
+    Counts how many times each call site runs a builtin, to find the
+    sequences worth fusing. Use as a context manager around training runs.
+    """
+
+    def __init__(self):
+        # id() of the calling word node -> calls
+        self.counts: dict[int, int] = {}
+
+    def start(self):
+        compiler.resolve_hook = self.wrap
+        types.Vocab.version += 1
+
+    def stop(self):
+        compiler.resolve_hook = None
+        types.Vocab.version += 1
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    def wrap(self, name, target):
+        if isinstance(target, types.Closure) or stdlib.needs_frame(target):
+            return target
+
+        counts = self.counts
+
+        def counted(word, stack, vocab, read_word, execute):
+            key = id(word)
+            counts[key] = counts.get(key, 0) + 1
+            return target(word, stack, vocab, read_word, execute)
+
+        return counted
+
+    def patterns(self, codes, vocab=None, limit=16, min_count=100):
+        """
+        Ranks the sequences of two and three instructions of the training
+        run by how many times they ran.
+
+        Args:
+            codes: The code that was run.
+            vocab: If given, the code of the words defined in it is
+                searched too.
+            limit: Maximum number of patterns returned.
+            min_count: Sequences run fewer times are left out.
+
+        Returns:
+            Patterns, most frequent first.
+        """
+        pending = list(codes)
+        if vocab is not None:
+            for target in vocab.user_defined.values():
+                if isinstance(target, types.Closure) and target.code is not None:
+                    pending.append(target.code)
+
+        totals = {}
+        seen = set()
+        # The words of a definition are nodes of both the defined word and
+        # the code around the definition: count each sequence once.
+        seen_windows = set()
+        while pending:
+            code = pending.pop()
+            if id(code) in seen:
+                continue
+            seen.add(id(code))
+            for ip in range(len(code)):
+                op, arg = original_instruction(code, ip)
+                if op == compiler.MAKE_CLOSURE:
+                    pending.append(arg.code)
+                for length in (2, 3):
+                    window = (id(code.nodes[ip]), length)
+                    if window in seen_windows:
+                        continue
+                    count = self.window_count(code, ip, length)
+                    if count:
+                        seen_windows.add(window)
+                        pattern = pattern_at(code, ip, length)
+                        totals[pattern] = totals.get(pattern, 0) + count
+
+        ranked = sorted(totals.items(), key=lambda item: item[1], reverse=True)
+        return [pattern for pattern, count in ranked[:limit] if count >= min_count]
+
+    def window_count(self, code, ip, length) -> int:
+        """
+        Returns how many times the `length` instructions at `ip` all ran,
+        or 0 if they do not form a pattern.
+        """
+        if pattern_at(code, ip, length) is None:
+            return 0
+        count = None
+        for i in range(ip, ip + length):
+            op, arg = original_instruction(code, i)
+            if op == compiler.CALL_WORD:
+                calls = self.counts.get(id(arg.word), 0)
+                count = calls if count is None else min(count, calls)
+        return count or 0
+
+
+def save(patterns, path):
+    """
+    Writes a fusion table to a JSON file.
+    """
+    data = {"patterns": [list(pattern) for pattern in patterns]}
+    pathlib.Path(path).write_text(json.dumps(data, indent=2))
+
+
+def load(path) -> set:
+    """
+    Reads a fusion table written by `save`.
+    """
+    data = json.loads(pathlib.Path(path).read_text())
+    return {tuple(pattern) for pattern in data["patterns"]}
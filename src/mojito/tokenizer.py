@@ -1,6 +1,7 @@
 from __future__ import annotations
+import functools
 import typing
-import itertools as it
+import re
 
 from mojito import types
 
@@ -33,6 +34,9 @@ class RegexTokenizer:
         Initializes the tokenizer with an empty rule set.
         """
         self.__rules: typing.List[types.TokenRule] = []
+        self.__pattern: typing.Optional[re.Pattern] = None
+        self.__kinds: typing.List[typing.Any] = []
+        self.__frozen = False
 
     def add_token(
         self,
@@ -48,8 +52,15 @@ class RegexTokenizer:
 
         Returns:
             The RegexTokenizer instance (for method chaining).
+
+        Raises:
+            TypeError: If the tokenizer is frozen.
         """
+        if self.__frozen:
+            raise TypeError("a frozen tokenizer cannot be extended")
+
         self.__rules.append(types.TokenRule(regex_rule, kind))
+        self.__pattern = None
         return self
 
     def ignore(
@@ -67,15 +78,36 @@ class RegexTokenizer:
         """
         return self.add_token(regex_rule, None)
 
+    def freeze(self) -> RegexTokenizer:
+        """
+        Compiles the rules and forbids adding new ones, so the tokenizer can be
+        safely shared.
+
+        Returns:
+            The RegexTokenizer instance.
+        """
+        self.__compile()
+        self.__frozen = True
+        return self
+
+    def __compile(self) -> re.Pattern:
+        if self.__pattern is None:
+            self.__pattern = compile_rules(self.__rules)
+            self.__kinds = [rule.kind for rule in self.__rules]
+        return self.__pattern
+
     def __call__(
         self,
         s: str,
+        line_number: typing.Optional[int] = None,
     ) -> typing.Iterator[types.Token]:
         """
         Tokenizes the input text using the configured rules.
 
         Args:
             s: The string to tokenize.
+            line_number: If given, `TokenWithLineNumber`s on that line are
+                produced instead of plain tokens.
 
         Yields:
             Tokens whose `kind` is not None.
@@ -83,21 +115,46 @@ class RegexTokenizer:
         Raises:
             NoMatchingRuleFoundError: If a segment of text cannot be matched by any rule.
         """
-        for token in simple_tokenize(s, self.__rules):
-            if token.kind is not None:
-                yield token
+        pattern = self.__compile()
+        yield from scan(s, pattern, self.__kinds, True, line_number)
 
 
-def simple_tokenize(
+def compile_rules(
+    rules: typing.Sequence[types.TokenRule],
+) -> re.Pattern:
+    """
+    Joins token rules into a single alternation, wrapping the i-th rule into
+    a group named `_i`. Alternatives are tried left to right, so the first
+    matching rule wins just like when the rules are tried one by one.
+
+    Args:
+        rules: A sequence of TokenRule objects.
+
+    Returns:
+        The compiled master pattern.
+    """
+    return re.compile(
+        "|".join(f"(?P<_{i}>{rule.regex_rule})" for i, rule in enumerate(rules))
+    )
+
+
+def scan(
     s: str,
-    rules: typing.Iterable[types.TokenRule],
+    pattern: re.Pattern,
+    kinds: typing.Sequence[typing.Any],
+    skip_ignored: bool = False,
+    line_number: typing.Optional[int] = None,
 ) -> typing.Iterator[types.Token]:
     """
-    Tokenizes the input string by applying a sequence of TokenRule instances.
+    Tokenizes the input string with a master pattern built by `compile_rules`.
 
     Args:
         s: The string to tokenize.
-        rules: An iterable of TokenRule objects.
+        pattern: The master pattern.
+        kinds: Token kinds, in the same order as the rules of the pattern.
+        skip_ignored: Whether to drop tokens whose kind is None.
+        line_number: If given, `TokenWithLineNumber`s on that line are
+            produced instead of plain tokens.
 
     Yields:
         Token instances for each match in the input string.
@@ -105,24 +162,50 @@ def simple_tokenize(
     Raises:
         NoMatchingRuleFoundError: If no rule matches at the current position.
     """
-    rules_list = list(rules)
+    match = pattern.match
     index = 0
+    length = len(s)
 
-    while index < len(s):
-        matched = False
-        for rule in rules_list:
-            token = rule.try_match(s, start_index=index)
-            if token:
-                matched = True
-                index = token.end + 1
-                yield token
-                break
-
-        if not matched:
+    while index < length:
+        m = match(s, index)
+        if m is None or m.lastgroup is None:
             error_snippet = s[index : index + 3]
             msg = f"No rule matched at index {index}: '{error_snippet}'"
             raise NoMatchingRuleFoundError(msg)
 
+        end = m.end()
+        kind = kinds[int(m.lastgroup[1:])]
+        if kind is not None or not skip_ignored:
+            if line_number is None:
+                yield types.Token(kind, m.group(), index, end - 1)
+            else:
+                yield types.TokenWithLineNumber(
+                    kind, m.group(), index, end - 1, line_number
+                )
+        index = end
+
+
+def simple_tokenize(
+    s: str,
+    rules: typing.Iterable[types.TokenRule],
+) -> typing.Iterator[types.Token]:
+    """
+    Tokenizes the input string by applying a sequence of TokenRule instances.
+
+    Args:
+        s: The string to tokenize.
+        rules: An iterable of TokenRule objects.
+
+    Yields:
+        Token instances for each match in the input string.
+
+    Raises:
+        NoMatchingRuleFoundError: If no rule matches at the current position.
+    """
+    rules_list = list(rules)
+    kinds = [rule.kind for rule in rules_list]
+    yield from scan(s, compile_rules(rules_list), kinds)
+
 
 def mojito_tokenizer() -> RegexTokenizer:
     return (
@@ -145,6 +228,14 @@ def mojito_tokenizer() -> RegexTokenizer:
     )
 
 
+@functools.cache
+def default_tokenizer() -> RegexTokenizer:
+    """
+    Returns the process-wide frozen Mojito tokenizer, building it on first use.
+    """
+    return mojito_tokenizer().freeze()
+
+
 def tokenize(source, line_number: int = 1):
     """
     Tokenizes the input using the Mojito tokenizer.
@@ -152,15 +243,16 @@ def tokenize(source, line_number: int = 1):
     The input can be either:
     - A string, which will be split into lines using `str.splitlines()`.
     - A callable that returns one line of text per call. Tokenization stops when the callable returns an empty string or `None`.
+    - A text file object, which is read lazily line by line.
 
     Args:
-        source: A string to be tokenized or a callable returning lines of text.
+        source: A string to be tokenized, a callable returning lines of text or a text file object.
         line_number: The initial line number to associate with the generated tokens.
 
     Yields:
         Token (`mojito.types.TokenWithLineNumber`) objects as defined by the Mojito language specification.
     """
-    tokenizer = mojito_tokenizer()
+    tokenizer = default_tokenizer()
 
     if isinstance(source, str):
         lines = iter([line for line in source.splitlines() if line] + [""])
@@ -168,14 +260,9 @@ def tokenize(source, line_number: int = 1):
         def source():
             return next(lines)
 
-    i = line_number
+    elif hasattr(source, "readline"):
+        source = source.readline
+
     while line := source():
-        for line_number, token in zip(it.repeat(i), tokenizer(line)):
-            yield types.TokenWithLineNumber(
-                kind=token.kind,
-                line_number=line_number,
-                start=token.start,
-                end=token.end,
-                value=token.value,
-            )
-        i += 1
+        yield from tokenizer(line, line_number)
+        line_number += 1
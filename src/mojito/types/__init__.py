@@ -6,6 +6,7 @@ from .tokens import (
 )
 from .ast import (
     Location,
+    SourceMap,
     Number,
     Word,
     String,
@@ -25,6 +26,7 @@ __all__ = [
     "TokenRule",
     "MojitoTokenKind",
     "Location",
+    "SourceMap",
     "Number",
     "Word",
     "String",
@@ -1,3 +1,5 @@
+import abc
+import array
 import dataclasses
 
 
@@ -8,43 +10,100 @@ class Location:
     end: int
 
 
-@dataclasses.dataclass(frozen=True)
-class Number:
-    location: Location
-    value: float
+class SourceMap:
+    """
+    Locations of the nodes produced by one parse, packed into a single array
+    as `line_number, start, end` triples indexed by node id.
+    """
 
-    def __add__(self, other):
-        return Number(self.value + other.value)
+    __slots__ = ("data",)
 
-    def __sub__(self, other):
-        return Number(self.value - other.value)
+    def __init__(self):
+        self.data = array.array("I")
 
-    def __mul__(self, other):
-        return Number(self.value * other.value)
+    def add(self, line_number: int, start: int, end: int) -> int:
+        node_id = len(self.data) // 3
+        self.data.extend((line_number, start, end))
+        return node_id
 
-    def __truediv__(self, other):
-        return Number(self.value / other.value)
+    def location(self, node_id: int) -> Location:
+        i = node_id * 3
+        return Location(*self.data[i : i + 3])
 
-    def __mod__(self, other):
-        return Number(self.value % other.value)
+    def __len__(self):
+        return len(self.data) // 3
 
-    def __floordiv__(self, other):
-        return Number(self.value // other.value)
 
+class Node(abc.ABC):
+    """
+    Base of the leaf AST nodes. Nodes keep no `Location` of their own: it is
+    looked up in the `SourceMap` of the parse they come from when needed.
+    """
 
-@dataclasses.dataclass(frozen=True)
-class String:
-    location: Location
-    value: str
+    __slots__ = ("source_map", "node_id")
 
+    def __init__(self, source_map: SourceMap | None = None, node_id: int = 0):
+        self.source_map = source_map
+        self.node_id = node_id
 
-@dataclasses.dataclass(frozen=True)
-class Word:
-    location: Location
-    name: str
+    @property
+    def location(self) -> Location | None:
+        if self.source_map is None:
+            return None
+        return self.source_map.location(self.node_id)
 
+    @abc.abstractmethod
+    def _key(self):
+        """
+        Returns what tells nodes of the same type apart, besides location.
+        """
 
-@dataclasses.dataclass(frozen=True)
+    def __eq__(self, other):
+        if type(self) is not type(other):
+            return NotImplemented
+        return self._key() == other._key() and self.location == other.location
+
+    def __hash__(self):
+        return hash((type(self), self._key()))
+
+    def __repr__(self):
+        return f"{type(self).__name__}({self._key()!r}, location={self.location})"
+
+
+class Number(Node):
+    __slots__ = ("value",)
+
+    def __init__(self, value: int | float, source_map=None, node_id=0):
+        super().__init__(source_map, node_id)
+        self.value = value
+
+    def _key(self):
+        return self.value
+
+
+class String(Node):
+    __slots__ = ("value",)
+
+    def __init__(self, value: str, source_map=None, node_id=0):
+        super().__init__(source_map, node_id)
+        self.value = value
+
+    def _key(self):
+        return self.value
+
+
+class Word(Node):
+    __slots__ = ("name",)
+
+    def __init__(self, name: str, source_map=None, node_id=0):
+        super().__init__(source_map, node_id)
+        self.name = name
+
+    def _key(self):
+        return self.name
+
+
+@dataclasses.dataclass(frozen=True, slots=True)
 class Quotation:
     items: list = dataclasses.field(default_factory=list)
 
@@ -58,7 +117,7 @@ class Quotation:
         return iter(self.items)
 
 
-@dataclasses.dataclass(frozen=True)
+@dataclasses.dataclass(frozen=True, slots=True)
 class Program:
     items: list = dataclasses.field(default_factory=list)
 
@@ -1,27 +1,43 @@
 from __future__ import annotations
+import array
 import dataclasses
-import re
+import decimal
+import importlib
+import typing
 
 from mojito import types
 
 
+# Values live on the stack unboxed: numbers are plain ints and floats,
+# strings are plain strs, quotations are `Closure`s and sequences are
+# `array.array`s, see `types.sequence`.
+NUMBER_TYPES = (int, float)
+
+
 def as_string(literal) -> str:
     match literal:
-        case types.String(value=value):
+        case str(value):
             return f'"{value}"'
-        case types.Number(value=num_literal):
-            return num_as_string(num_literal)
+        case int() | float():
+            return num_as_string(literal)
         case types.Closure() as quot:
             return quot_as_string(quot)
-
-
-def num_as_string(num_literal: float) -> str:
-    str_value = str(num_literal)
-
-    match = re.match(r"^(\d+)\.[1-9]*0+$", str_value)
-    if match:
-        return match.group(1)
-
+        case array.array() as seq:
+            return seq_as_string(seq)
+
+
+def num_as_string(num_literal: int | float) -> str:
+    if isinstance(num_literal, int):
+        try:
+            return str(num_literal)
+        except ValueError:
+            # Longer than `sys.get_int_max_str_digits()`, which `Decimal`
+            # does not care about.
+            return str(decimal.Decimal(num_literal))
+
+    str_value = repr(num_literal)
+    if str_value.endswith(".0"):
+        return str_value[:-2]
     return str_value
 
 
@@ -29,11 +45,18 @@ def quot_as_string(quot_literal) -> str:
     return "[...]"
 
 
+def seq_as_string(seq_literal) -> str:
+    return " ".join(["{", *map(num_as_string, seq_literal), "}"])
+
+
 class Stack:
-    __slots__ = ("data",)
+    # `budget` is the `mojito.limits.Budget` of the run using the stack, if
+    # any: builtins creating many values check them against it first.
+    __slots__ = ("data", "budget")
 
     def __init__(self):
         self.data = []
+        self.budget = None
 
     def peek(self, at: int = 0):
         # Note about `at`:
@@ -66,51 +89,123 @@ class Stack:
 
 
 class Vocab:
+    """
+    Words by name, falling back on `parent_vocab` for the others.
+
+    Vocabs pickle along with their user-defined words, which lets closures
+    run in other processes. A module-level vocab, such as `stdlib.vocab`,
+    is created with the name of its `module` and pickled by reference: its
+    builtins are never copied.
+
+    A frozen vocab, such as `stdlib.vocab` once loaded, cannot be defined
+    into, so that it can be shared: words are defined in its `offspring`.
+    Offspring share the builtins of their parent until they define one of
+    their own.
+    """
+
     __slots__ = (
         "parent_vocab",
         "builtins",
         "user_defined",
+        "module",
+        "frozen",
     )
 
+    # Bumped by every `define`, so cached lookups know when to re-resolve.
+    # Definitions must go through `define` for the caches to notice them.
+    version = 0
+
     def __init__(
         self,
         parent_vocab=None,
         builtins=None,
         user_defined=None,
+        module=None,
     ):
         self.parent_vocab = parent_vocab
         self.builtins = builtins or {}
         self.user_defined = user_defined or {}
+        self.module = module
+        self.frozen = False
+
+    def __reduce__(self):
+        if self.module is not None:
+            return module_vocab, (self.module,)
+        parent = self.parent_vocab
+        # Offspring share the builtins of their parent.
+        shared = parent is not None and self.builtins is parent.builtins
+        builtins = None if shared else self.builtins
+        # Passed as state, so that words referring to the vocab they are
+        # defined in can be unpickled.
+        return Vocab, (), (parent, builtins, self.user_defined, self.frozen)
+
+    def __setstate__(self, state):
+        parent, builtins, user_defined, frozen = state
+        self.parent_vocab = parent
+        self.builtins = parent.builtins if builtins is None else builtins
+        self.user_defined = user_defined
+        self.module = None
+        self.frozen = frozen
+
+    def freeze(self):
+        self.frozen = True
 
     def is_builtin(self, name: str) -> bool:
         return name in self.builtins
 
     def define(self, name: str, func=None):
+        if self.frozen:
+            raise RuntimeError(f"cannot define '{name}' in a frozen vocab")
+
         if callable(func):
-            self.builtins[name] = func
+            self.define_builtin(name, func)
             return
 
         if isinstance(func, types.Closure):
-            self.user_defined[name] = func
+            self.define_word(name, func)
             return
 
         def decorator(func):
-            self.builtins[name] = func
+            self.define_builtin(name, func)
             return func
 
         return decorator
 
+    def define_word(self, name: str, word):
+        """
+        Defines a user word, which shadows the words of the same name in
+        parent vocabs. It is usually a closure, but can be a builtin standing
+        for one, e.g. a `MEMO:` definition.
+        """
+        if self.frozen:
+            raise RuntimeError(f"cannot define '{name}' in a frozen vocab")
+        self.user_defined[name] = word
+        Vocab.version += 1
+
+    def define_builtin(self, name: str, func):
+        parent = self.parent_vocab
+        if parent is not None and self.builtins is parent.builtins:
+            self.builtins = dict(self.builtins)
+        self.builtins[name] = func
+        Vocab.version += 1
+
     def lookup(self, name: str):
-        # 1. Check user_defined
-        if name in self.user_defined:
-            return self.user_defined[name]
-        # 2. Check parent vocab recursively
-        if self.parent_vocab:
-            found = self.parent_vocab.lookup(name)
+        # User definitions shadow anything from parent vocabs, which in turn
+        # shadow builtins of the vocabs below them. Between builtins, the
+        # closest vocab wins.
+        chain = []
+        vocab = self
+        while vocab is not None:
+            if name in vocab.user_defined:
+                return vocab.user_defined[name]
+            chain.append(vocab)
+            vocab = vocab.parent_vocab
+
+        for vocab in chain:
+            found = vocab.builtins.get(name)
             if found:
                 return found
-        # 3. Check builtins
-        return self.builtins.get(name)
+        return None
 
     def offspring(self):
         return Vocab(
@@ -120,7 +215,25 @@ class Vocab:
         )
 
 
-@dataclasses.dataclass(frozen=True, slots=True)
+@dataclasses.dataclass(slots=True)
 class Closure:
     body: types.Quotation
     vocab: Vocab
+    # Compiled form of `body`, filled in by the executor on the first call.
+    code: typing.Any = dataclasses.field(default=None, compare=False, repr=False)
+    # Stack effect declared with `( ... -- ... )`, see `mojito.effects`.
+    effect: typing.Any = dataclasses.field(default=None, compare=False, repr=False)
+
+    def __reduce__(self):
+        # The code is left out: it holds caches only valid in this process.
+        return Closure, (self.body, None), (self.vocab, self.effect)
+
+    def __setstate__(self, state):
+        self.vocab, self.effect = state
+
+
+def module_vocab(module: str) -> Vocab:
+    """
+    Returns the vocab `module` defines as `vocab`, e.g. `mojito.stdlib`.
+    """
+    return importlib.import_module(module).vocab
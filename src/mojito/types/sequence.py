@@ -0,0 +1,147 @@
+"""
+Numeric sequences: the values of the `v+`, `sum`, `range`... words.
+
+A sequence is an `array.array` of 64-bit integers (typecode `q`) or of
+floats (typecode `d`), so that bulk operations loop in C instead of going
+through the executor once per element. When NumPy is installed, it does
+the element-wise arithmetic. With or without it, integer elements going
+out of the 64-bit range are an error.
+"""
+
+import array
+import itertools
+import operator
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+INT = "q"
+FLOAT = "d"
+
+# Arithmetic words of the form `v<op>` and the operators they apply.
+OPERATORS = {
+    "+": operator.add,
+    "-": operator.sub,
+    "*": operator.mul,
+    "/": operator.truediv,
+    "mod": operator.mod,
+}
+
+# The operators integer elements can overflow with.
+OVERFLOWING = (operator.add, operator.sub, operator.mul)
+
+INT_MAX = 2**63 - 1
+
+
+def from_values(values) -> array.array:
+    """
+    Makes a sequence of numbers, of integers if they all are.
+
+    Raises:
+        TypeError: If one of the values is not a number.
+    """
+    values = list(values)
+    for value in values:
+        if value.__class__ is not int and value.__class__ is not float:
+            raise TypeError(f"a sequence holds numbers, got {type(value).__name__}")
+    typecode = INT if all(value.__class__ is int for value in values) else FLOAT
+    return new(typecode, values)
+
+
+def new(typecode, values) -> array.array:
+    try:
+        return array.array(typecode, values)
+    except OverflowError:
+        raise ValueError("sequence element out of the 64-bit range")
+
+
+def numbers(start, stop) -> array.array:
+    """
+    Returns the integers from `start` up to `stop`, excluded.
+    """
+    if numpy is not None:
+        return from_numpy(numpy.arange(start, stop, dtype=numpy.int64))
+    return new(INT, range(start, stop))
+
+
+def elementwise(op, a, b) -> array.array:
+    """
+    Applies `op`, one of `OPERATORS`, to the elements of `a` and `b`, two
+    sequences of the same length or a sequence and a number.
+
+    Raises:
+        ValueError: If the lengths differ, or on division by zero.
+    """
+    if isinstance(a, array.array) and isinstance(b, array.array) and len(a) != len(b):
+        raise ValueError(f"sequences of different lengths: {len(a)} and {len(b)}")
+    if op in (operator.truediv, operator.mod) and (
+        b == 0 if not isinstance(b, array.array) else 0 in b
+    ):
+        raise ValueError("division by zero")
+
+    # NumPy wraps integers around on overflow: leave the operations that
+    # might overflow to the loop below, which raises instead.
+    if numpy is not None and not may_overflow(op, a, b):
+        try:
+            return from_numpy(op(as_numpy(a), as_numpy(b)))
+        except OverflowError:
+            raise ValueError("sequence element out of the 64-bit range")
+
+    if isinstance(a, array.array) and isinstance(b, array.array):
+        values = map(op, a, b)
+    elif isinstance(a, array.array):
+        values = map(op, a, itertools.repeat(b))
+    else:
+        values = map(op, itertools.repeat(a), b)
+
+    if op is operator.truediv or FLOAT in (typecode_of(a), typecode_of(b)):
+        return new(FLOAT, values)
+    return new(INT, values)
+
+
+def may_overflow(op, a, b) -> bool:
+    """
+    Tells whether `op` could take integer elements of `a` and `b` out of
+    the 64-bit range, judging by their largest magnitudes.
+    """
+    if op not in OVERFLOWING or FLOAT in (typecode_of(a), typecode_of(b)):
+        return False
+    x, y = magnitude(a), magnitude(b)
+    if op is operator.mul:
+        return x * y > INT_MAX
+    return x + y > INT_MAX
+
+
+def magnitude(value) -> int:
+    if not isinstance(value, array.array):
+        return abs(value)
+    if not value:
+        return 0
+    values = as_numpy(value)
+    return max(abs(int(values.min())), abs(int(values.max())))
+
+
+def typecode_of(value) -> str:
+    if isinstance(value, array.array):
+        return value.typecode
+    return INT if value.__class__ is int else FLOAT
+
+
+def as_numpy(value):
+    if not isinstance(value, array.array):
+        return value
+    dtype = numpy.int64 if value.typecode == INT else numpy.float64
+    return numpy.frombuffer(value, dtype=dtype)
+
+
+def from_numpy(result) -> array.array:
+    if result.dtype.kind in "biu":
+        typecode, dtype = INT, numpy.int64
+    else:
+        typecode, dtype = FLOAT, numpy.float64
+    seq = array.array(typecode)
+    seq.frombytes(result.astype(dtype, copy=False).tobytes())
+    return seq
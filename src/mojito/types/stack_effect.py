@@ -0,0 +1,103 @@
+import array
+import dataclasses
+
+from . import runtime
+
+
+# Value types of stack effects. Inputs and outputs without a type are ANY.
+ANY = "any"
+NUM = "num"
+STR = "str"
+QUOT = "quot"
+SEQ = "seq"
+
+PYTHON_TYPES = {
+    NUM: runtime.NUMBER_TYPES,
+    STR: str,
+    QUOT: runtime.Closure,
+    SEQ: array.array,
+}
+
+
+@dataclasses.dataclass(frozen=True)
+class StackEffect:
+    """
+    What a word takes from and leaves on the stack, topmost values last.
+
+    Inputs and outputs are `(name, type)` pairs. An output named like an
+    input is that very input, e.g. `dup` is `( x -- x x )`.
+    """
+
+    inputs: tuple = ()
+    outputs: tuple = ()
+
+    def __str__(self):
+        def show(values):
+            return [
+                name if type_ == ANY else f"{name}:{type_}" for name, type_ in values
+            ]
+
+        return " ".join(["(", *show(self.inputs), "--", *show(self.outputs), ")"])
+
+
+def parse(names) -> StackEffect:
+    """
+    Parses the words of a declaration, parentheses excluded, e.g.
+    `["a:num", "b:num", "--", "c:num"]`.
+
+    Raises:
+        ValueError: If the declaration is malformed.
+    """
+    names = list(names)
+    if names.count("--") != 1:
+        raise ValueError("a stack effect needs exactly one '--'")
+
+    values = []
+    for name in names:
+        if name == "--":
+            values.append(name)
+            continue
+        name, _, type_ = name.partition(":")
+        type_ = type_ or ANY
+        if not name or (type_ != ANY and type_ not in PYTHON_TYPES):
+            raise ValueError(f"unknown type in stack effect: {type_}")
+        values.append((name, type_))
+
+    split = values.index("--")
+    return StackEffect(tuple(values[:split]), tuple(values[split + 1 :]))
+
+
+def declare(declaration: str):
+    """
+    Declares the stack effect of a builtin:
+
+        @vocab.define("+")
+        @declare("( a:num b:num -- c:num )")
+        def add(word, state, vocab, read_word, execute):
+            ...
+    """
+    names = declaration.split()
+    if names[:1] != ["("] or names[-1:] != [")"]:
+        raise ValueError(f"stack effect must be parenthesized: {declaration}")
+    effect = parse(names[1:-1])
+
+    def decorator(func):
+        func.effect = effect
+        return func
+
+    return decorator
+
+
+def unchecked(checked):
+    """
+    Registers a variant of the builtin `checked` that trusts its stack
+    effect: it is called instead of `checked` where the types of its inputs
+    have been proven.
+    """
+
+    def decorator(func):
+        func.effect = checked.effect
+        checked.unchecked = func
+        return func
+
+    return decorator
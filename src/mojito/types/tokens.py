@@ -1,10 +1,11 @@
 import dataclasses
 import enum
+import functools
 import typing
 import re
 
 
-@dataclasses.dataclass(frozen=True)
+@dataclasses.dataclass(frozen=True, slots=True)
 class Token:
     """
     Represents a token produced by the tokenizer.
@@ -22,7 +23,7 @@ class Token:
     end: int
 
 
-@dataclasses.dataclass(frozen=True)
+@dataclasses.dataclass(frozen=True, slots=True)
 class TokenWithLineNumber(Token):
     line_number: int
 
@@ -40,6 +41,13 @@ class TokenRule:
     regex_rule: str
     kind: typing.Any
 
+    @functools.cached_property
+    def pattern(self) -> re.Pattern:
+        """
+        The compiled form of `regex_rule`, built on first use.
+        """
+        return re.compile(self.regex_rule)
+
     def try_match(
         self,
         s: str,
@@ -56,16 +64,15 @@ class TokenRule:
         Returns:
             A Token if the pattern matches at `start_index`, otherwise None.
         """
-        substring = s[start_index:]
-        match = re.match(self.regex_rule, substring)
+        match = self.pattern.match(s, start_index)
         if not match:
             return None
 
         return Token(
             kind=self.kind,
             value=match.group(),
-            start=match.start() + start_index,
-            end=match.end() + start_index - 1,
+            start=match.start(),
+            end=match.end() - 1,
         )
 
 
@@ -0,0 +1,12 @@
+import pytest
+
+from mojito import Executor, stdlib
+
+
+@pytest.fixture
+def ex():
+    return Executor(stdlib.vocab)
+
+
+def values(ex):
+    return list(ex.stack.data)
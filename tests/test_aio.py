@@ -0,0 +1,66 @@
+import asyncio
+
+import pytest
+
+from mojito import Executor, stdlib, types
+from mojito.aio import AsyncExecutor
+
+
+class Writer:
+    def __init__(self):
+        self.data = b""
+
+    def write(self, data):
+        self.data += data
+
+    async def drain(self):
+        pass
+
+
+def reader(*lines):
+    stream = asyncio.StreamReader()
+    for line in lines:
+        stream.feed_data(line.encode() + b"\n")
+    stream.feed_eof()
+    return stream
+
+
+def test_async_io_words():
+    async def main():
+        ex = AsyncExecutor(stdlib.vocab, reader("world"), writer)
+        await ex.run(': greet "hello" . get . ; greet 0 3 [1 + dup .] times')
+        return ex
+
+    writer = Writer()
+    ex = asyncio.run(main())
+    assert writer.data == b'"hello"\n"world"\n1\n2\n3\n'
+    assert ex.stack.data == [3]
+
+
+def test_sessions_interleave():
+    async def main():
+        stream = asyncio.StreamReader()
+        waiting = AsyncExecutor(stdlib.vocab, stream, Writer())
+        busy = AsyncExecutor(stdlib.vocab, None, Writer())
+        task = asyncio.create_task(waiting.run("get"))
+        # The first session waits on `get` while the second one runs.
+        await busy.run("0 1000 [1 +] times")
+        assert not task.done()
+        stream.feed_data(b"done\n")
+        await task
+        return waiting.stack.data, busy.stack.data
+
+    assert asyncio.run(main()) == (["done"], [1000])
+
+
+def test_new_sessions_keep_caches_valid():
+    version = types.Vocab.version
+    for _ in range(10):
+        AsyncExecutor(stdlib.vocab, None, Writer())
+    assert types.Vocab.version == version
+
+
+def test_async_words_need_an_async_executor():
+    ex = AsyncExecutor(stdlib.vocab, None, Writer())
+    with pytest.raises(RuntimeError, match="needs an AsyncExecutor"):
+        Executor(ex.vocab).run("1 .")
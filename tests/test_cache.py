@@ -0,0 +1,43 @@
+import pytest
+
+from mojito import Executor, cache, parser, stdlib
+
+
+@pytest.fixture
+def source(tmp_path):
+    path = tmp_path / "prog.mojito"
+    path.write_text(": sq dup * ;\n3 sq\n")
+    return path
+
+
+def run(code):
+    ex = Executor(stdlib.vocab)
+    ex.run_code(code)
+    return ex.stack.data
+
+
+def test_cold_run_writes_cache(source):
+    assert run(cache.compile_file(source)) == [9]
+    assert cache.cache_path(source).exists()
+
+
+def test_warm_run_skips_parsing(source, monkeypatch):
+    cache.compile_file(source)
+
+    def fail(_):
+        raise AssertionError("parsed a cached file")
+
+    monkeypatch.setattr(parser, "parse", fail)
+    assert run(cache.compile_file(source)) == [9]
+
+
+def test_changed_source_invalidates_cache(source):
+    cache.compile_file(source)
+    source.write_text("4 dup *\n")
+    assert run(cache.compile_file(source)) == [16]
+
+
+def test_corrupt_cache_is_ignored(source):
+    cache.compile_file(source)
+    cache.cache_path(source).write_bytes(b"garbage")
+    assert run(cache.compile_file(source)) == [9]
@@ -0,0 +1,80 @@
+import pytest
+
+from mojito import Executor, codegen, stdlib, types
+
+
+PRELUDE = """
+: poly ( x:num -- y:num ) dup dup * swap 3 * + 1 + ;
+: abs ( x:num -- y:num ) dup 0 < [0 swap -] when ;
+: sign ( x:num -- y:num ) dup 0 < [drop -1] [0 > [1] [0] if] if ;
+: half ( x:num -- y:num ) 2 / ;
+: pair ( a b -- b a a ) swap dup ;
+: fact dup 1 > [dup 1 - fact *] [drop 1] if ;
+"""
+
+
+def run(source, opt_level):
+    ex = Executor(stdlib.vocab, opt_level=opt_level)
+    ex.run(PRELUDE)
+    ex.run(source)
+    return ex
+
+
+@pytest.mark.parametrize(
+    "source",
+    [
+        "3 poly 2.5 poly",
+        "-4 abs 4 abs",
+        "-7 sign 0 sign 7 sign",
+        "7 half 1.5 half",
+        '1 "a" pair',
+        "10 fact",
+        "0 [poly] apply 3 [abs] times",
+    ],
+)
+def test_translated_words_match_the_interpreter(source):
+    assert run(source, 3).stack.data == run(source, 2).stack.data
+
+
+def test_stack_slots_become_locals():
+    ex = run("3 poly", 3)
+    entry = codegen.native(ex.vocab.lookup("poly"))
+    assert "data" not in entry.source.split("def entry")[0]
+    assert entry.body(None, None, 3) == 19
+
+
+def test_recursive_words_are_left_to_the_interpreter():
+    ex = run("5 fact", 3)
+    assert codegen.native(ex.vocab.lookup("fact")) is None
+    assert ex.stack.data == [120]
+
+
+def test_inputs_of_other_types_fall_back_on_the_interpreter():
+    ex = run("", 3)
+    closure = ex.vocab.lookup("poly")
+    entry = codegen.native(closure)
+    ex.stack.data.append("a")
+    assert entry(None, ex.stack, ex.vocab, None, ex.execute) is closure
+    assert ex.stack.data == ["a"]
+
+
+def test_builtins_are_called_on_the_stack(capsys):
+    ex = run(": show ( x:num -- ) dup . poly . ; 2 show", 3)
+    assert "data.append" in codegen.native(ex.vocab.lookup("show")).source
+    assert capsys.readouterr().out == "2\n11\n"
+
+
+def test_redefinition_retranslates():
+    ex = run(": sq ( x:num -- y:num ) dup * ; : quad ( x:num -- y:num ) sq sq ;", 3)
+    ex.run("2 quad")
+    ex.run(": sq ( x:num -- y:num ) dup + ; 2 quad")
+    assert ex.stack.data == [16, 8]
+
+
+def test_generated_code_is_shared_between_vocabs():
+    first, second = run("1 poly", 3), run("1 poly", 3)
+    a = codegen.native(first.vocab.lookup("poly"))
+    b = codegen.native(second.vocab.lookup("poly"))
+    assert a is not b
+    assert a.__code__ is b.__code__
+    assert isinstance(first.vocab.lookup("poly"), types.Closure)
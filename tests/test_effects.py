@@ -0,0 +1,96 @@
+import pytest
+
+from mojito import Executor, compiler, effects, stdlib
+from mojito.types import stack_effect
+
+from .conftest import values
+
+
+def test_parse_declaration():
+    effect = stack_effect.parse(["a:num", "b", "--", "c:num"])
+    assert effect.inputs == (("a", "num"), ("b", "any"))
+    assert effect.outputs == (("c", "num"),)
+    assert str(effect) == "( a:num b -- c:num )"
+
+
+@pytest.mark.parametrize("names", [["a"], ["a", "--", "--"], ["a:float", "--"]])
+def test_parse_bad_declaration(names):
+    with pytest.raises(ValueError):
+        stack_effect.parse(names)
+
+
+def test_rejects_type_errors_before_running(ex, capsys):
+    with pytest.raises(effects.StackEffectError, match="'\\+' expected num"):
+        ex.run('1 . "a" 1 +')
+    assert capsys.readouterr().out == ""
+    assert values(ex) == []
+
+
+def test_rejects_underflow(ex):
+    with pytest.raises(effects.StackEffectError, match="needs more values"):
+        ex.run("1 +")
+
+
+def test_rejects_wrong_declarations(ex):
+    with pytest.raises(effects.StackEffectError, match="declared"):
+        ex.run(": f ( a -- ) dup ;")
+
+
+def test_rejects_bad_calls_of_inferred_words(ex):
+    ex.run(": double dup + ;")
+    with pytest.raises(effects.StackEffectError, match="expected num"):
+        ex.run('"x" double')
+
+
+def test_declared_word(ex):
+    ex.run(": sq ( n:num -- n:num ) dup * ; 3 sq")
+    assert values(ex) == [9]
+    assert str(ex.vocab.lookup("sq").code.effect) == "( n:num -- n:num )"
+
+
+def test_proven_calls_skip_checks(ex):
+    ex.run(": sq ( n:num -- n:num ) 1 swap * ; 3 sq")
+    code = ex.vocab.lookup("sq").code
+    targets = {getattr(arg, "target", None) for arg in code.args}
+    assert stdlib.mul_unchecked in targets
+
+
+def test_entry_checks_guard_dynamic_calls(ex):
+    ex.run(": sq ( n:num -- n:num ) dup * ;")
+    # The branches of the `if` do not agree, so this is only caught at run time.
+    with pytest.raises(RuntimeError, match="expected num, got str"):
+        ex.run('"x" 1 [sq] [drop drop] if')
+
+
+@pytest.mark.parametrize("opt_level", [0, 1, 2, 3])
+def test_unverified_declarations_prove_no_types(opt_level):
+    # Inference gives up on the branches: the declared type is not trusted.
+    ex = Executor(stdlib.vocab, opt_level=opt_level)
+    ex.run(': f ( -- n:num ) 1 ["a"] [1 2] if ;')
+    with pytest.raises(RuntimeError, match=r"'\+' expected two numbers"):
+        ex.run("f 1 +")
+    with pytest.raises(RuntimeError, match=r"'\+' expected two numbers"):
+        ex.run(': g ( -- n:num ) 1 ["a"] [1 2] if ; g 1 +')
+
+
+def test_redefinition_voids_proofs(ex):
+    ex.run(": double dup + ; 2 double")
+    assert values(ex) == [4]
+    ex.run(': dup "s" ;')
+    with pytest.raises(effects.StackEffectError, match="expected num"):
+        ex.run("2 double")
+
+
+def test_no_unchecked_calls_at_opt_level_zero():
+    ex = Executor(stdlib.vocab, opt_level=0)
+    ex.run(": sq ( n:num -- n:num ) dup * ; 4 sq")
+    assert values(ex) == [16]
+    code = ex.vocab.lookup("sq").code
+    assert stdlib.mul_unchecked not in {getattr(a, "target", None) for a in code.args}
+
+
+def test_words_stay_unoptimized_at_opt_level_zero():
+    ex = Executor(stdlib.vocab, opt_level=0)
+    ex.run(": f 2 3 + ; f")
+    assert values(ex) == [5]
+    assert compiler.PUSH_FOLDED not in ex.vocab.lookup("f").code.ops
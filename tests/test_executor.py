@@ -0,0 +1,142 @@
+import pathlib
+
+import pytest
+
+from mojito import Executor, compiler, parser, stdlib
+
+from .conftest import values
+
+
+EXAMPLES = pathlib.Path(__file__).resolve().parent.parent / "examples"
+
+
+def test_arithmetic(ex):
+    ex.run("2 3 + 4 *")
+    assert values(ex) == [20]
+
+
+def test_print(ex, capsys):
+    ex.run('2 3 + . "hi" .')
+    assert capsys.readouterr().out == '5\n"hi"\n'
+
+
+def test_factorial_example(ex):
+    ex.run((EXAMPLES / "factorial.mojito").read_text())
+    ex.run("5 fact")
+    assert values(ex) == [120]
+
+
+def test_empty_quotation(ex):
+    ex.run("1 [] [2] if 3")
+    assert values(ex) == [3]
+
+
+def test_combinators(ex):
+    ex.run("1 2 [10 +] dip 5 [1 +] [2 *] bi")
+    assert values(ex) == [11, 2, 6, 10]
+
+
+def test_local_definitions(ex):
+    ex.run(": outer : inner 2 * ; inner inner ; 3 outer")
+    assert values(ex) == [12]
+    with pytest.raises(RuntimeError, match="inner"):
+        ex.run("inner")
+
+
+def test_redefinition(ex):
+    ex.run(": f 1 ; : g f ; g : f 2 ; g")
+    assert values(ex) == [1, 2]
+
+
+def test_unknown_word(ex):
+    with pytest.raises(RuntimeError, match="I don't know the word: nope"):
+        ex.run("nope")
+
+
+def test_redefining_builtin_invalidates_cached_lookups(ex):
+    ex.run(": twice dup + ; 1 twice")
+    ex.run(": dup 10 ; 1 twice")
+    assert values(ex) == [2, 11]
+
+
+def test_tail_recursion_runs_in_constant_python_stack(ex):
+    ex.run(": countdown dup 0 > [1 - countdown] [drop] if ; 100000 countdown")
+    assert values(ex) == []
+
+
+def test_deep_non_tail_recursion(ex):
+    ex.run(": sum dup 0 > [dup 1 - sum +] when ; 20000 sum")
+    ex.run(": down dup 0 > [1 - dup [down] dip drop] when ; 20000 down")
+    assert values(ex) == [200010000, 0]
+
+
+def test_loop_combinators(ex):
+    ex.run("0 10 [1 +] times")
+    ex.run("1 [dup 100 <] [2 *] while")
+    ex.run("0 [1 + dup 5 <] loop")
+    assert values(ex) == [10, 128, 5]
+
+
+def test_sequence_combinators(ex, capsys):
+    ex.run("[1 2 3] [.] each")
+    ex.run("[1 2 3 4] [dup *] map [2 mod] filter 0 [+] fold")
+    assert capsys.readouterr().out == "1\n2\n3\n"
+    assert values(ex) == [10]
+
+
+def test_loops_run_in_constant_stack(ex):
+    ex.run("0 1000000 [1 +] times")
+    ex.run("0 [dup 100000 <] [1 +] while")
+    assert values(ex) == [1000000, 100000]
+
+
+def test_nested_loops(ex):
+    ex.run(": add [1 +] times ; 0 3 [4 add] times")
+    ex.run("[[1 2] [3] []] [0 [+] fold] map 0 [+] fold")
+    assert values(ex) == [12, 6]
+
+
+def test_loop_errors(ex):
+    with pytest.raises(RuntimeError, match="expected a number as flag"):
+        ex.run('[""] loop')
+    with pytest.raises(RuntimeError, match="sequence of values"):
+        ex.run("[a b] [.] each")
+    with pytest.raises(RuntimeError, match="leave one value"):
+        ex.run("[1 2] [drop] map")
+
+
+def test_integers_are_exact(ex, capsys):
+    ex.run((EXAMPLES / "factorial.mojito").read_text())
+    ex.run("25 fact dup .")
+    assert values(ex) == [15511210043330985984000000]
+    assert capsys.readouterr().out == "15511210043330985984000000\n"
+
+
+def test_promotion_to_float(ex, capsys):
+    ex.run("7 2 / . 7 2 mod . 1.5 2 * . 2 3 < .")
+    assert capsys.readouterr().out == "3.5\n1\n3\n1\n"
+    ex.run("4 2 /")
+    assert values(ex) == [2.0] and isinstance(values(ex)[0], float)
+
+
+def test_run_stream(ex, capsys, tmp_path):
+    path = tmp_path / "script.mojito"
+    path.write_text(": sq\n  dup *\n;\n3 sq .\n[1 2\n+] apply .\n")
+    with path.open() as file:
+        ex.run_stream(file)
+    assert capsys.readouterr().out == "9\n3\n"
+
+
+def test_quotation_literals_reuse_their_closure(ex):
+    ex.run(": quot [1 +] ; 3 [quot] times")
+    first, second, third = values(ex)
+    assert first is second is third
+
+
+def test_quotation_literals_make_a_closure_per_vocab(ex):
+    code = compiler.compile_quotation(parser.parse("[1 +]"))
+    other = Executor(stdlib.vocab)
+    ex.run_code(code)
+    other.run_code(code)
+    assert values(ex)[0].vocab is ex.vocab
+    assert values(other)[0].vocab is other.vocab
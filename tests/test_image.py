@@ -0,0 +1,59 @@
+import pytest
+
+from mojito import Executor, image, stdlib
+
+
+PRELUDE = ": sq dup * ; : quad sq sq ; 1 2"
+
+
+@pytest.fixture
+def warm():
+    ex = Executor(stdlib.vocab)
+    ex.run(PRELUDE)
+    return ex
+
+
+def test_restore_brings_back_words_and_stack(warm):
+    ex = Executor(stdlib.vocab)
+    ex.restore(warm.snapshot())
+    ex.run("3 quad")
+    assert ex.stack.data == [1, 2, 81]
+
+
+def test_snapshot_is_not_changed_by_later_definitions(warm):
+    snapshot = warm.snapshot()
+    warm.run(": sq dup + ; drop drop")
+
+    ex = Executor(stdlib.vocab)
+    ex.restore(snapshot)
+    ex.run("3 quad")
+    assert ex.stack.data == [1, 2, 81]
+
+
+def test_executors_restored_from_one_snapshot_are_isolated(warm):
+    snapshot = warm.snapshot()
+    first, second = Executor(stdlib.vocab), Executor(stdlib.vocab)
+    first.restore(snapshot)
+    second.restore(snapshot)
+    first.run(": sq 0 ; 3 sq")
+    second.run("3 sq")
+    assert first.stack.data == [1, 2, 3, 0]
+    assert second.stack.data == [1, 2, 9]
+
+
+def test_image_round_trip(warm, tmp_path):
+    path = tmp_path / "prelude.image"
+    image.save(warm.snapshot(), path)
+
+    ex = Executor(stdlib.vocab)
+    ex.restore(image.load(path))
+    ex.run("2 quad")
+    assert ex.stack.data == [1, 2, 16]
+
+
+def test_image_of_another_version_is_rejected(warm, tmp_path, monkeypatch):
+    path = tmp_path / "prelude.image"
+    image.save(warm.snapshot(), path)
+    monkeypatch.setattr(image, "TAG", "mojito-image-0.0.0-0")
+    with pytest.raises(ValueError, match="image written by"):
+        image.load(path)
@@ -0,0 +1,110 @@
+import pytest
+
+from mojito import Executor, compiler, effects, parser, stdlib
+
+from .conftest import values
+
+
+def run_code(ex, source):
+    code = compiler.compile_quotation(parser.parse(source))
+    ex.run_code(code)
+    return code
+
+
+def test_inlines_small_words(ex):
+    ex.run(": sq dup * ;")
+    code = run_code(ex, "3 sq")
+    assert code.ops[1] == compiler.CALL_INLINED
+    assert values(ex) == [9]
+
+
+def test_inlines_nested_words(ex):
+    ex.run(": sq dup * ; : quad sq sq ;")
+    code = run_code(ex, "2 quad")
+    steps = code.args[1].steps
+    assert compiler.CALL_CLOSURE not in {step[0] for step in steps}
+    assert values(ex) == [16]
+
+
+def test_does_not_inline_recursive_words(ex):
+    ex.run(": countdown dup 0 > [1 - countdown] [drop] if ;")
+    code = run_code(ex, "5 countdown")
+    assert code.ops[1] == compiler.CALL_WORD
+    assert values(ex) == []
+
+
+def test_does_not_inline_big_words(ex):
+    ex.run(": big 1 + 1 + 1 + 1 + 1 + ;")
+    code = run_code(ex, "0 big")
+    assert code.ops[1] == compiler.CALL_WORD
+    assert values(ex) == [5]
+
+
+def test_combinator_in_the_middle(ex):
+    ex.run(": under [1 +] dip 10 * ; : f under 2 + ;")
+    code = run_code(ex, "1 2 f 3")
+    assert code.ops[2] == compiler.CALL_INLINED
+    assert values(ex) == [2, 22, 3]
+
+
+def test_combinator_at_the_end(ex):
+    ex.run(": branch [1] [2] if ;")
+    ex.run("0 branch 1 branch")
+    assert values(ex) == [2, 1]
+
+
+def test_redefinition_invalidates_inlined_code(ex):
+    ex.run(": sq dup * ; : f sq ;")
+    code = run_code(ex, "3 f")
+    ex.run(": sq dup + ;")
+    ex.run_code(code)
+    assert values(ex) == [9, 6]
+    assert code.ops[1] == compiler.CALL_INLINED
+
+
+def test_redefined_builtin_invalidates_inlined_code(ex):
+    ex.run(": sq dup * ;")
+    code = run_code(ex, "3 sq")
+    ex.run(": * - ;")
+    ex.run_code(code)
+    assert values(ex) == [9, 0]
+
+
+@pytest.mark.parametrize("opt_level", [0, 2])
+def test_redefinition_while_running_inlined_code(opt_level):
+    ex = Executor(stdlib.vocab, opt_level=opt_level)
+    ex.run(": h 1 + ; : g h swap ; 1 2 g : + * ; 2 3 g")
+    assert values(ex) == [3, 1, 3, 2]
+
+
+def test_reinferred_words_invalidate_inlined_code(ex):
+    ex.run(": sq dup * ;")
+    code = run_code(ex, "3 sq")
+    inlined = code.args[1]
+    assert inlined.revalidate(ex.vocab)
+    sq = ex.vocab.lookup("sq")
+    effects.annotate(sq.code, sq.vocab)
+    assert not inlined.revalidate(ex.vocab)
+
+
+def test_inlined_entry_checks_name_the_word(ex):
+    ex.run(": sq ( n:num -- n:num ) dup * ; : f sq ;")
+    with pytest.raises(RuntimeError, match="'sq' expected num, got str"):
+        ex.run('"x" 1 [f] [drop drop] if')
+    ex.stack.data.clear()
+    with pytest.raises(RuntimeError, match="'sq' expected 1 elements"):
+        ex.run("1 [f] [1 drop] if")
+
+
+def test_inlined_words_in_deep_recursion(ex):
+    ex.run(": dec 1 - ; : down dup 0 > [dec down] when ;")
+    ex.run("100000 down")
+    assert values(ex) == [0]
+
+
+def test_no_inlining_at_opt_level_1():
+    ex = Executor(stdlib.vocab, opt_level=1)
+    ex.run(": sq dup * ;")
+    code = run_code(ex, "3 sq")
+    assert code.ops[1] == compiler.CALL_WORD
+    assert values(ex) == [9]
@@ -0,0 +1,78 @@
+import pytest
+
+from mojito import Executor, ExecutorPool, Limits, limits, parallel, stdlib
+
+
+def run(source, **kwargs):
+    ex = Executor(stdlib.vocab, limits=Limits(**kwargs))
+    ex.run(source)
+    return ex.stack.data
+
+
+@pytest.mark.parametrize(
+    "source, kwargs, error",
+    [
+        (": f 1 + f ; 0 f", {"instructions": 10_000}, limits.InstructionLimitExceeded),
+        ("1 2 + 3 4 5 6 7 8", {"instructions": 5}, limits.InstructionLimitExceeded),
+        ("100000 [1] times", {"stack_depth": 1000}, limits.StackDepthExceeded),
+        (
+            ": f dup 0 > [1 - f 1 +] [] if ; 100000 f",
+            {"call_depth": 100},
+            limits.CallDepthExceeded,
+        ),
+        (": f f ; f", {"timeout": 0.05}, limits.DeadlineExceeded),
+        ("10 [0 100000 range] times", {"values": 10_000}, limits.ValueLimitExceeded),
+    ],
+)
+def test_limits_stop_runs(source, kwargs, error):
+    with pytest.raises(error):
+        run(source, **kwargs)
+
+
+@pytest.mark.parametrize(
+    "source",
+    [
+        "0 10000000000 range",
+        "[1 2 3] [0 10000000000 range] map",
+        "0 600 range dup 1 v+",
+        "0 600 range dup [1 +] map",
+    ],
+)
+def test_values_are_reserved_before_allocating(source):
+    # Allocated in full, the first two would run out of memory.
+    with pytest.raises(limits.ValueLimitExceeded):
+        run(source, values=1000)
+
+
+def test_runs_within_limits_complete():
+    source = ": f dup 0 > [1 - f] [] if ; 100 f 10 [0 10 range drop] times"
+    limits_ = {"instructions": 10_000, "call_depth": 200, "values": 100}
+    assert run(source, **limits_) == [0]
+
+
+def test_limits_apply_to_each_run():
+    ex = Executor(stdlib.vocab, limits=Limits(instructions=1000))
+    ex.run(": f dup 0 > [1 - f] [drop] if ;")
+    for _ in range(10):
+        ex.run("20 f")
+    with pytest.raises(limits.LimitExceeded):
+        ex.run("1000 f")
+
+
+def test_limits_in_pool():
+    with ExecutorPool(workers=1, limits=Limits(instructions=1000)) as pool:
+        stuck, done = pool.run([": f f ; f", "1 2 +"])
+    assert isinstance(stuck.error, limits.InstructionLimitExceeded)
+    assert done.stack == [3]
+
+
+@pytest.mark.parametrize("combinator", ["pmap", "peach"])
+def test_limits_apply_to_parallel_workers(monkeypatch, combinator):
+    monkeypatch.setattr(parallel, "workers", 2)
+    try:
+        with pytest.raises(limits.InstructionLimitExceeded):
+            run(f": f f ; [1 2 3 4] [f] {combinator}", instructions=10_000)
+        (seq,) = run("0 4 range [1 +] pmap", instructions=10_000)
+        assert list(seq) == [1, 2, 3, 4]
+    finally:
+        parallel.shutdown()
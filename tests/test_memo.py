@@ -0,0 +1,73 @@
+import pytest
+
+from mojito import Executor, memo, stdlib, types
+
+
+FIB = "dup 2 < [] [dup 1 - fib swap 2 - fib +] if ;"
+
+
+def test_memoized_fib(ex):
+    ex.run(f"MEMO: fib ( n -- f ) {FIB} 90 fib")
+    assert ex.stack.data == [2880067194370816120]
+    info = ex.vocab.lookup("fib").cache.info()
+    assert info.misses == 91 and info.size == 91
+
+    ex.run("drop 90 fib")
+    assert ex.vocab.lookup("fib").cache.info().hits == info.hits + 1
+
+
+def test_memoized_word_matches_plain_one(ex):
+    ex.run(f": fib ( n -- f ) {FIB} 15 fib")
+    ex.run(f"MEMO: mfib ( n -- f ) {FIB.replace('fib', 'mfib')} 15 mfib")
+    assert ex.stack.data == [610, 610]
+
+
+def test_values_of_different_types_are_cached_apart(ex):
+    ex.run("MEMO: half ( x -- y ) 2 / ; 3 half 3.0 half")
+    assert ex.stack.data == [1.5, 1.5]
+    assert ex.vocab.lookup("half").cache.info().misses == 2
+
+
+def test_unhashable_inputs_bypass_the_cache(ex):
+    ex.run("MEMO: call ( q -- x ) apply ; [1] call [2] call")
+    assert ex.stack.data == [1, 2]
+    assert ex.vocab.lookup("call").cache.info().size == 0
+
+
+def test_memo_needs_a_declaration(ex):
+    with pytest.raises(RuntimeError, match="stack effect declaration"):
+        ex.run("MEMO: sq dup * ;")
+
+
+def test_cache_evicts_least_recently_used():
+    cache = memo.LRUCache(maxsize=2)
+    cache.put(1, "a")
+    cache.put(2, "b")
+    assert cache.get(1) == "a"
+    cache.put(3, "c")
+    assert cache.get(2) is None
+    assert cache.info() == memo.CacheInfo(hits=1, misses=1, maxsize=2, size=2)
+
+
+def test_memoize_quotation(ex):
+    ex.run("[dup *] memoize dup dup 4 swap apply swap 4 swap apply")
+    quotation, first, second = ex.stack.data
+    assert first == second == 16
+    cache = quotation.vocab.lookup("memoized").cache
+    assert cache.info().hits == 1
+
+
+def test_memoize_keeps_caches_valid(ex):
+    ex.run("[dup *]")
+    version = types.Vocab.version
+    ex.run("memoize")
+    assert types.Vocab.version == version
+
+
+def test_memoized_words_survive_snapshots(ex):
+    ex.run(f"MEMO: fib ( n -- f ) {FIB} 20 fib drop")
+    worker = Executor(stdlib.vocab)
+    worker.restore(ex.snapshot())
+    worker.run("20 fib")
+    assert worker.stack.data == [6765]
+    assert worker.vocab.lookup("fib").cache.info().hits > 0
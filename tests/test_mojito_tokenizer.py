@@ -123,3 +123,11 @@ def test_multiline_text_is_string():
     )
 
     assert list(t.tokenize(source, line_number=1)) == expected
+
+
+def test_default_tokenizer_is_shared_and_frozen():
+    tokenizer = t.default_tokenizer()
+
+    assert t.default_tokenizer() is tokenizer
+    with pytest.raises(TypeError):
+        tokenizer.add_token(r"\d+", types.MojitoTokenKind.INTEGER_NUMBER)
@@ -0,0 +1,90 @@
+import pytest
+
+from mojito import Executor, compiler, optimizer, parser, stdlib
+
+from .conftest import values
+
+
+def optimized(source):
+    code = compiler.compile_quotation(parser.parse(source))
+    optimizer.optimize(code)
+    return code
+
+
+def test_folds_arithmetic_on_constants():
+    code = optimized("2 3 + 4 *")
+    assert code.ops[0] == compiler.PUSH_FOLDED
+    folded, next_ip = code.args[0][:2]
+    assert folded == (20,)
+    assert next_ip == 5
+
+
+def test_keeps_words_needing_runtime_values():
+    code = optimized("2 + 3")
+    assert compiler.PUSH_FOLDED not in code.ops
+
+
+def test_does_not_fold_errors():
+    code = optimized("1 0 /")
+    assert code.args[0][:2] == ((1, 0), 2)
+    assert code.ops[2] == compiler.CALL_WORD
+
+
+def test_removes_no_op_shuffles(ex):
+    code = optimized("dup drop swap swap 1")
+    assert code.ops[0] == compiler.PUSH_FOLDED
+    ex.run("1 2 dup drop swap swap")
+    assert values(ex) == [1, 2]
+
+
+def test_optimizes_nested_quotations(ex):
+    code = optimized("[1 2 +]")
+    assert code.args[0].code.ops[0] == compiler.PUSH_FOLDED
+    ex.run("[1 2 +] apply")
+    assert values(ex) == [3]
+
+
+@pytest.mark.parametrize(
+    "source, expected",
+    [
+        ("5 1 [10] [20] if", [5, 10]),
+        ("5 2 3 > [10] [20] if", [5, 20]),
+        ("1 [7] when 8", [7, 8]),
+        ("0 [7] when 8", [8]),
+    ],
+)
+def test_resolves_constant_conditions(ex, source, expected):
+    assert compiler.CALL_WORD not in optimized(source).ops[:1]
+    ex.run(source)
+    assert values(ex) == expected
+
+
+def test_same_results_without_optimizations():
+    source = ": f 2 3 + * ; 4 f 1 [dup drop 9] [0] if 6 2 / 3 3 < [1] when"
+    results = []
+    for opt_level in (0, 1):
+        ex = Executor(stdlib.vocab, opt_level)
+        ex.run(source)
+        results.append(values(ex))
+    assert results[0] == results[1] == [20, 9, 3.0]
+
+
+def test_bails_out_on_redefined_arithmetic(ex):
+    ex.run(": + * ; 2 3 +")
+    assert values(ex) == [6]
+
+
+def test_bails_out_on_redefined_shuffle(ex):
+    ex.run(": dup drop ; 1 2 dup drop")
+    assert values(ex) == []
+
+
+def test_bails_out_on_redefined_if(ex):
+    ex.run(": if drop drop ; 1 [10] [20] if")
+    assert values(ex) == [1]
+
+
+def test_bails_out_in_already_optimized_words(ex):
+    ex.run(": f 2 3 + ; f")
+    ex.run(": + - ; f")
+    assert values(ex) == [5, -1]
@@ -0,0 +1,47 @@
+import array
+import pickle
+
+import pytest
+
+from mojito import Executor, parallel, stdlib
+
+from .conftest import values
+
+
+@pytest.fixture
+def ex(monkeypatch):
+    monkeypatch.setattr(parallel, "workers", 2)
+    yield Executor(stdlib.vocab)
+    parallel.shutdown()
+
+
+def test_closures_pickle_with_their_words(ex):
+    ex.run(": sq dup * ; : quad sq sq ; [quad 1 +]")
+    quotation = pickle.loads(pickle.dumps(ex.stack.pop()))
+    assert quotation.vocab.parent_vocab is stdlib.vocab
+    assert quotation.vocab.builtins is stdlib.vocab.builtins
+
+    other = Executor(quotation.vocab)
+    other.stack.push(2)
+    other.execute(quotation)
+    assert values(other) == [17]
+
+
+def test_pmap(ex):
+    ex.run(": sq dup * ; 0 10 range [sq 1 +] pmap [1 2 3] [drop [5]] pmap")
+    seq, quotations = values(ex)
+    assert seq == array.array("q", [1, 2, 5, 10, 17, 26, 37, 50, 65, 82])
+    assert len(quotations.body) == 3
+
+
+def test_peach(ex, capfd):
+    ex.run("[1 2 3] [.] peach")
+    assert sorted(capfd.readouterr().out.split()) == ["1", "2", "3"]
+    assert values(ex) == []
+
+
+def test_errors_in_workers(ex):
+    with pytest.raises(RuntimeError, match="leave one value"):
+        ex.run("[1 2] [drop] pmap")
+    with pytest.raises(RuntimeError, match="expected num, got str"):
+        ex.run('[1 "a"] [1 swap +] pmap')
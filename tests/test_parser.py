@@ -81,3 +81,47 @@ def test_unmatched_right_bracket_raises():
 def test_invalid_string_literal_raises():
     with pytest.raises(parser.MojitoSyntaxError, match=r"invalid string literal"):
         parser.parse('"unterminated string')
+
+
+def test_integer_literals_stay_integers():
+    seq = parser.parse("123 -4 1.0 99999999999999999999")
+    assert [type(elem.value) for elem in seq] == [int, int, float, int]
+    assert seq[3].value == 99999999999999999999
+
+
+def test_parse_stream_yields_terms_as_they_complete():
+    lines = iter(["1 [ 2", "3 ] foo", ""])
+    read = []
+
+    def source():
+        read.append(next(lines))
+        return read[-1]
+
+    stream = parser.parse_stream(source)
+    assert next(stream).value == 1
+    assert len(read) == 1
+    assert [n.value for n in next(stream)] == [2, 3]
+    assert len(read) == 2
+    assert next(stream).name == "foo"
+    assert list(stream) == []
+
+
+def test_parse_stream_source_maps_stay_small():
+    terms = list(parser.parse_stream("1 foo [2 [3]] bar\n" * 1000))
+    assert len(terms) == 4000
+    sizes = {len(term.source_map) for term in terms[1::4]}
+    sizes |= {len(term[0].source_map) for term in terms[2::4]}
+    assert sizes == {1, 2}
+    assert terms[-1].location == types.Location(1000, 14, 16)
+
+
+def test_parse_stream_unclosed_quotation_raises():
+    with pytest.raises(parser.MojitoSyntaxError, match=r"quotation was not closed"):
+        list(parser.parse_stream("1 [2"))
+
+
+def test_locations_come_from_the_source_map():
+    seq = parser.parse("1 foo\n  [bar]")
+    assert seq[1].location == types.Location(line_number=1, start=2, end=4)
+    assert seq[2][0].location == types.Location(line_number=2, start=3, end=5)
+    assert seq[0].source_map is seq[2][0].source_map
@@ -0,0 +1,39 @@
+import pytest
+
+from mojito import Executor, ExecutorPool, stdlib, types
+
+
+def test_stdlib_is_frozen():
+    with pytest.raises(RuntimeError, match="frozen"):
+        stdlib.vocab.define("nope", types.Closure(types.Quotation(), None))
+
+
+def test_executors_do_not_share_definitions():
+    first = Executor(stdlib.vocab)
+    second = Executor(stdlib.vocab)
+    first.run(": answer 42 ; answer")
+    assert first.stack.data == [42]
+    assert stdlib.vocab.lookup("answer") is None
+    with pytest.raises(RuntimeError, match="answer"):
+        second.run("answer")
+
+
+def test_builtins_are_copied_on_write():
+    vocab = stdlib.vocab.offspring()
+    vocab.define("forty-two", lambda word, state, *_: state.push(42))
+    assert "forty-two" not in stdlib.vocab.builtins
+    ex = Executor(vocab)
+    ex.run("forty-two")
+    assert ex.stack.data == [42]
+
+
+@pytest.mark.parametrize("processes", [False, True])
+def test_pool_runs_programs_in_isolation(processes):
+    sources = [": f 1 ; f", ": f 2 ; f", "f", '"a" 1 +']
+    with ExecutorPool(workers=2, processes=processes) as pool:
+        results = pool.run(sources)
+
+    assert [result.stack for result in results[:2]] == [[1], [2]]
+    assert all(result.ok for result in results[:2])
+    assert "I don't know the word: f" in str(results[2].error)
+    assert not results[3].ok
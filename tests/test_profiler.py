@@ -0,0 +1,56 @@
+import pathlib
+
+import pytest
+
+from mojito import Executor, stdlib
+
+
+EXAMPLES = pathlib.Path(__file__).resolve().parent.parent / "examples"
+
+
+@pytest.fixture
+def ex():
+    ex = Executor(stdlib.vocab)
+    ex.run((EXAMPLES / "factorial.mojito").read_text())
+    return ex
+
+
+def test_counts_calls_and_edges(ex):
+    with ex.profile() as prof:
+        ex.run("5 fact")
+
+    assert ex.stack.data == [120]
+    assert prof.stats["fact"].calls == 5
+    assert prof.stats["*"].calls == 4
+    assert prof.stats["if"].calls == 5
+    assert prof.edges[("<root>", "fact")] == 1
+    assert prof.edges[("if", "fact")] == 4
+    assert prof.stats["fact"].total_ns >= prof.stats["fact"].self_ns
+
+
+def test_stops_recording_when_done(ex):
+    with ex.profile() as prof:
+        ex.run("2 fact drop")
+    ex.run("3 fact drop")
+
+    assert prof.stats["fact"].calls == 2
+
+
+def test_reports(ex):
+    with ex.profile() as prof:
+        ex.run("3 fact drop")
+
+    table = prof.table().splitlines()
+    assert table[0].split() == ["calls", "self", "ms", "total", "ms", "word"]
+    assert {line.split()[-1] for line in table[1:]} == set(prof.stats)
+    for line in prof.collapsed_stacks().splitlines():
+        stack, micros = line.rsplit(" ", 1)
+        assert stack.split(";")[0] in {"fact", "drop"}
+        assert int(micros) >= 0
+
+
+def test_deep_recursion(ex):
+    with ex.profile() as prof:
+        ex.run(": countdown dup 0 > [1 - countdown] [drop] if ; 20000 countdown")
+
+    assert prof.stats["countdown"].calls == 20001
@@ -0,0 +1,87 @@
+import array
+
+import pytest
+
+from mojito import effects
+from mojito.types import sequence
+
+from .conftest import values
+
+
+def test_range(ex):
+    ex.run("2 6 range")
+    assert values(ex) == [array.array("q", [2, 3, 4, 5])]
+
+
+def test_elementwise_arithmetic(ex):
+    ex.run("0 4 range dup v* 1 v+ 10 0 4 range v- [1 2 3 4] >seq v/")
+    assert values(ex) == [
+        array.array("q", [1, 2, 5, 10]),
+        array.array("d", [10, 4.5, 8 / 3, 1.75]),
+    ]
+
+
+def test_reductions(ex):
+    ex.run("1 6 range dup sum swap dup product swap dup minimum swap maximum")
+    assert values(ex) == [15, 120, 1, 5]
+
+
+def test_indexing(ex):
+    ex.run("10 20 range dup length swap dup 3 nth swap 2 5 slice")
+    assert values(ex) == [10, 13, array.array("q", [12, 13, 14])]
+
+
+def test_combinators_keep_sequences(ex):
+    ex.run("0 5 range [dup *] map [2 mod] filter")
+    assert values(ex) == [array.array("q", [1, 9])]
+
+
+def test_map_to_sequences(ex):
+    ex.run("[1 2] [0 swap range] map dup length swap [>seq sum] map")
+    count, sums = values(ex)
+    assert count == 2
+    assert [node.value for node in sums.body] == [0, 1]
+
+
+def test_print(ex, capsys):
+    ex.run("[1 2.5] >seq .")
+    assert capsys.readouterr().out == "{ 1 2.5 }\n"
+
+
+def test_errors(ex):
+    with pytest.raises(RuntimeError, match="different lengths"):
+        ex.run("0 3 range 0 4 range v+")
+    with pytest.raises(RuntimeError, match="division by zero"):
+        ex.run("0 3 range 0 v/")
+    with pytest.raises(RuntimeError, match="out of range"):
+        ex.run("0 3 range 3 nth")
+    with pytest.raises(RuntimeError, match="holds numbers"):
+        ex.run('["a"] >seq')
+    with pytest.raises(RuntimeError, match="'range': .* 64-bit range"):
+        ex.run(f"{2**63 - 1} {2**63 + 1} range")
+
+
+def test_numbers_only_words_reject_sequences(ex):
+    with pytest.raises(effects.StackEffectError, match="expected num, got seq"):
+        ex.run("0 3 range 1 +")
+
+
+def test_without_numpy(ex, monkeypatch):
+    monkeypatch.setattr(sequence, "numpy", None)
+    ex.run("0 4 range 2 v* 1 v/")
+    assert values(ex) == [array.array("d", [0, 2, 4, 6])]
+    with pytest.raises(RuntimeError, match="64-bit"):
+        ex.run(f"0 3 range {2**62} v*")
+
+
+@pytest.mark.parametrize("with_numpy", [True, False])
+def test_overflow_is_an_error(ex, monkeypatch, with_numpy):
+    if not with_numpy:
+        monkeypatch.setattr(sequence, "numpy", None)
+    with pytest.raises(RuntimeError, match="64-bit"):
+        ex.run(f"0 3 range {2**62} v*")
+    with pytest.raises(RuntimeError, match="64-bit"):
+        ex.run(f"0 3 range dup {2**63 - 2} v+ v+")
+    ex.stack.data.clear()
+    ex.run(f"0 3 range {2**62} v+")
+    assert values(ex) == [array.array("q", [2**62, 2**62 + 1, 2**62 + 2])]
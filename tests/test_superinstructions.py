@@ -0,0 +1,79 @@
+from mojito import compiler, optimizer, parser
+from mojito import superinstructions as si
+
+from .conftest import values
+
+
+def compiled(source, patterns=None):
+    code = compiler.compile_quotation(parser.parse(source))
+    si.fuse(code, patterns)
+    return code
+
+
+def test_fuses_default_sequences(ex):
+    code = compiled("5 dup 1 - swap drop")
+    assert code.ops[1] == compiler.FUSED
+    assert code.ops[4] == compiler.FUSED
+    ex.run_code(code)
+    assert values(ex) == [4]
+
+
+def test_prefers_longer_patterns():
+    code = compiled("dup 1 -", {("dup", si.CONST, "-"), (si.CONST, "-")})
+    assert code.ops[0] == compiler.FUSED
+    assert len(code.args[0].items) == 3
+
+
+def test_closure_returned_inside_a_fused_sequence(ex):
+    code = compiled("[5] apply 7 8", {("apply", si.CONST, si.CONST)})
+    assert code.ops[1] == compiler.FUSED
+    ex.run_code(code)
+    assert values(ex) == [5, 7, 8]
+
+
+def test_does_not_fuse_folded_instructions(ex):
+    code = compiler.compile_quotation(parser.parse("7 drop 2 3 +"))
+    optimizer.optimize(code)
+    assert code.ops[1] == compiler.CALL_WORD
+    ex.run_code(code)
+    assert values(ex) == [5]
+
+
+def test_drop_before_a_constant_expression(ex):
+    ex.run("7 drop 2 3 +")
+    assert values(ex) == [5]
+
+
+def test_unfuses_redefined_words(ex):
+    code = compiled("5 dup 1 -")
+    ex.run_code(code)
+    ex.run(": - + ;")
+    ex.run_code(code)
+    assert values(ex) == [5, 4, 5, 6]
+    assert code.ops[1] == compiler.CALL_WORD
+
+
+def test_fused_code_is_inlined(ex):
+    ex.run(": dec 1 - ; : f dec dec ;")
+    ex.run("5 f")
+    assert values(ex) == [3]
+
+
+def test_training_finds_hot_sequences(ex, tmp_path):
+    ex.run(": down dup 0 > [2 * 2 / 1 - down] when ;")
+    code = compiler.compile_quotation(parser.parse("200 down"))
+    optimizer.optimize(code)
+    with si.Trainer() as trainer:
+        ex.run_code(code)
+
+    patterns = trainer.patterns([code], ex.vocab, min_count=50)
+    assert ("*", si.CONST, "/") in patterns
+
+    path = tmp_path / "fusion.json"
+    si.save(patterns, path)
+    assert si.load(path) == set(patterns)
+
+
+def test_fusion_can_be_disabled(ex):
+    code = compiled("5 dup 1 -", set())
+    assert compiler.FUSED not in code.ops